@@ -1,6 +1,11 @@
 // Cuban Social - Modern Design Application JavaScript
 import { supabase } from './supabaseClient.js';
 
+// Bundle layout written by scripts/build_site_data.py (BUNDLE_VERSION)
+const BUNDLE_VERSION = 2;
+// Event bundles must cover recurring events at least this far ahead
+const BUNDLE_MIN_LOOKAHEAD_DAYS = 90;
+
 class CubanSocialApp {
     constructor() {
         this.events = [];
@@ -12,6 +17,9 @@ class CubanSocialApp {
         this.currentYear = new Date().getFullYear();
         this.displayedEventCount = 6; // Track how many events are currently displayed
         this.eventsPerPage = 6; // How many events to load at a time
+        this.bundleIndex = null; // Events index of data/bundles, when events come from bundles
+        this.loadedMonths = new Set(); // Bundle months merged into this.events
+        this.monthLoad = Promise.resolve(); // Serializes on-demand month fetches
         
         this.init();
     }
@@ -145,7 +153,167 @@ class CubanSocialApp {
         }
     }
 
+    // Fetch a compiled bundle from data/bundles (built by scripts/build_site_data.py)
+    async fetchBundle(path) {
+        try {
+            const response = await fetch(`data/bundles/${path}`);
+            return response.ok ? await response.json() : null;
+        } catch (error) {
+            console.warn(`Bundle ${path} not available:`, error);
+            return null;
+        }
+    }
+
+    // Hex SHA-256 of some bytes, or null where Web Crypto is unavailable (plain http)
+    async sha256(bytes) {
+        if (!globalThis.crypto?.subtle) {
+            return null;
+        }
+        const digest = await crypto.subtle.digest('SHA-256', bytes);
+        return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+    }
+
+    // Bundles are a snapshot of data/events: skip them once data/events/index.json
+    // no longer matches the one they were built from, or when recurring events
+    // were not expanded far enough. Edits to existing files are caught where the
+    // bundles are built (every deploy, and `make start` via --if-stale)
+    async isBundleCurrent(index) {
+        if (index.version !== BUNDLE_VERSION) {
+            return false;
+        }
+        const expandedUntil = Date.parse(index.expanded_until);
+        const lookahead = BUNDLE_MIN_LOOKAHEAD_DAYS * 24 * 60 * 60 * 1000;
+        if (!expandedUntil || expandedUntil < Date.now() + lookahead) {
+            return false;
+        }
+
+        try {
+            const response = await fetch('data/events/index.json', { cache: 'no-cache' });
+            if (!response.ok) {
+                return true; // Nothing to compare against
+            }
+            const bytes = await response.arrayBuffer();
+            const digest = await this.sha256(bytes);
+            if (digest && index.index_digest) {
+                return digest === index.index_digest;
+            }
+            const eventIndex = JSON.parse(new TextDecoder().decode(bytes));
+            return (eventIndex.files || []).length === index.source_files;
+        } catch (error) {
+            return true;
+        }
+    }
+
+    // YYYY-MM of a date in Pacific time, the month names of the bundles
+    pacificMonth(date = new Date()) {
+        const parts = new Intl.DateTimeFormat('en-CA', {
+            timeZone: 'America/Los_Angeles', year: 'numeric', month: '2-digit'
+        }).formatToParts(date);
+        const part = type => parts.find(item => item.type === type).value;
+        return `${part('year')}-${part('month')}`;
+    }
+
+    // Fetch month bundles not loaded yet; returns their events, or null if one is missing
+    async fetchMonths(months) {
+        const files = new Map(this.bundleIndex.months.map(month => [month.month, month.file]));
+        const wanted = months.filter(month => files.has(month) && !this.loadedMonths.has(month));
+        const bundles = await Promise.all(wanted.map(month => this.fetchBundle(`events/${files.get(month)}`)));
+        if (bundles.some(bundle => !bundle)) {
+            return null;
+        }
+        wanted.forEach(month => this.loadedMonths.add(month));
+        return bundles.flatMap(bundle => bundle.events);
+    }
+
+    // Run a month fetch after the ones already queued, so no month is fetched twice
+    queueMonthLoad(task) {
+        this.monthLoad = this.monthLoad.then(task).catch(error => console.warn('Error loading months:', error));
+        return this.monthLoad;
+    }
+
+    // Merge month bundles into this.events, ordered by their precomputed sort keys;
+    // only call from a queueMonthLoad() task. Returns false if a bundle is missing
+    async loadMonths(months) {
+        const events = await this.fetchMonths(months);
+        if (!events || events.length === 0) {
+            return events !== null;
+        }
+        this.events = this.events.concat(events)
+            .sort((a, b) => a.sort_key - b.sort_key || a.id.localeCompare(b.id));
+        console.log(`Loaded ${events.length} events from bundles for ${months.join(', ')}`);
+        return true;
+    }
+
+    // Bundle months still to fetch that can match the dance filter, in date order
+    pendingMonths() {
+        if (!this.bundleIndex) {
+            return [];
+        }
+        const danceFilter = document.getElementById('dance-filter')?.value || '';
+        const typeMonths = danceFilter ? new Set(this.bundleIndex.filters.type[danceFilter] || []) : null;
+        return this.bundleIndex.months
+            .map(month => month.month)
+            .filter(month => !this.loadedMonths.has(month) && (!typeMonths || typeMonths.has(month)));
+    }
+
+    // Months the upcoming list needs before it can show more: later months, plus
+    // every earlier one when past events are shown (they are listed first)
+    upcomingMonths() {
+        const showPastEvents = document.getElementById('past-events-filter')?.checked || false;
+        const currentMonth = this.pacificMonth();
+        return this.pendingMonths().filter(month => showPastEvents || month >= currentMonth);
+    }
+
+    // Fetch months one at a time until the list has more than it displays
+    fillUpcomingEvents() {
+        return this.queueMonthLoad(async () => {
+            let pending = this.upcomingMonths();
+            if (pending.length === 0 || this.filteredEvents.length > this.displayedEventCount) {
+                return;
+            }
+            const currentMonth = this.pacificMonth();
+            const past = pending.filter(month => month < currentMonth);
+            while (pending.length > 0 && this.filteredEvents.length <= this.displayedEventCount) {
+                const months = past.length > 0 ? past.splice(0) : [pending.find(month => month >= currentMonth)];
+                if (!(await this.loadMonths(months))) {
+                    break;
+                }
+                this.filteredEvents = this.filterEvents();
+                pending = this.upcomingMonths();
+            }
+            this.renderUpcomingEvents();
+        });
+    }
+
+    async loadEventsFromBundle() {
+        const index = await this.fetchBundle('events/index.json');
+        if (!index) {
+            return null;
+        }
+        if (!(await this.isBundleCurrent(index))) {
+            console.warn(`Event bundles from ${index.generated_at} are stale, loading event files`);
+            return null;
+        }
+
+        // Start with the current month; other months are fetched on demand
+        // (more of the list, another calendar month, past events)
+        this.bundleIndex = index;
+        this.loadedMonths = new Set();
+        const events = await this.fetchMonths([this.pacificMonth()]);
+        if (!events) {
+            this.bundleIndex = null;
+            return null;
+        }
+        return events;
+    }
+
     async loadEventsFromDirectory() {
+        const bundled = await this.loadEventsFromBundle();
+        if (bundled) {
+            console.log(`Loaded ${bundled.length} events from bundles`);
+            return bundled;
+        }
+
         const events = [];
         
         try {
@@ -230,6 +398,11 @@ class CubanSocialApp {
     }
 
     async loadCongressesFromDirectory() {
+        const bundle = await this.fetchBundle('congresses.json');
+        if (bundle) {
+            return bundle.congresses;
+        }
+
         const congresses = [];
         
         try {
@@ -291,6 +464,11 @@ class CubanSocialApp {
     }
 
     async loadPlaylistsFromDirectory() {
+        const bundle = await this.fetchBundle('playlists.json');
+        if (bundle) {
+            return bundle.playlists;
+        }
+
         const playlists = [];
         
         try {
@@ -633,7 +811,7 @@ class CubanSocialApp {
             document.getElementById('calendar-view').classList.add('active');
             document.getElementById('calendar-container').style.display = 'block';
             document.querySelector('.upcoming-section').style.display = 'none';
-            this.renderCalendar();
+            this.showCalendarMonth();
         } else {
             document.getElementById('list-view').classList.add('active');
             document.getElementById('calendar-container').style.display = 'none';
@@ -842,6 +1020,18 @@ class CubanSocialApp {
         }
     }
 
+    // Render the calendar, fetching the shown month's bundle first if needed
+    showCalendarMonth() {
+        this.renderCalendar();
+        const month = `${this.currentYear}-${String(this.currentMonth + 1).padStart(2, '0')}`;
+        return this.queueMonthLoad(async () => {
+            if (this.pendingMonths().includes(month) && await this.loadMonths([month])) {
+                this.filteredEvents = this.filterEvents();
+                this.renderCalendar();
+            }
+        });
+    }
+
     previousMonth() {
         if (this.currentMonth === 0) {
             this.currentMonth = 11;
@@ -849,7 +1039,7 @@ class CubanSocialApp {
         } else {
             this.currentMonth--;
         }
-        this.renderCalendar();
+        this.showCalendarMonth();
     }
 
     nextMonth() {
@@ -859,10 +1049,23 @@ class CubanSocialApp {
         } else {
             this.currentMonth++;
         }
-        this.renderCalendar();
+        this.showCalendarMonth();
     }
 
     applyFilters() {
+        this.filteredEvents = this.filterEvents();
+
+        // Reset displayed count when filters change
+        this.displayedEventCount = this.eventsPerPage;
+
+        this.renderUpcomingEvents();
+        if (this.currentView === 'calendar') {
+            this.showCalendarMonth();
+        }
+        this.fillUpcomingEvents();
+    }
+
+    filterEvents() {
         const danceFilter = document.getElementById('dance-filter')?.value || '';
         const musicFilter = document.getElementById('music-filter')?.value || '';
         const locationFilter = document.getElementById('location-filter')?.value.toLowerCase() || '';
@@ -875,7 +1078,7 @@ class CubanSocialApp {
         const nowPST = new Date(now.toLocaleString("en-US", {timeZone: "America/Los_Angeles"}));
         const todayPST = new Date(nowPST.getFullYear(), nowPST.getMonth(), nowPST.getDate());
 
-        this.filteredEvents = this.events.filter(event => {
+        return this.events.filter(event => {
             // Parse UTC date from database
             const eventDateUTC = new Date(event.date);
             // Convert to PST/PDT for comparison
@@ -902,22 +1105,15 @@ class CubanSocialApp {
             
             return matchesDance && matchesMusic && matchesLocation && matchesFeatured && matchesTimeFilter;
         });
-
-        // Reset displayed count when filters change
-        this.displayedEventCount = this.eventsPerPage;
-
-        this.renderUpcomingEvents();
-        if (this.currentView === 'calendar') {
-            this.renderCalendar();
-        }
     }
 
     loadMoreEvents() {
         // Increase the displayed event count
         this.displayedEventCount += this.eventsPerPage;
         
-        // Re-render the events with the new count
+        // Re-render the events with the new count, fetching later months if needed
         this.renderUpcomingEvents();
+        this.fillUpcomingEvents();
         
         // Add loading animation feedback
         const loadMoreBtn = document.getElementById('load-more');
@@ -938,14 +1134,16 @@ class CubanSocialApp {
         const loadMoreBtn = document.getElementById('load-more');
         if (!loadMoreBtn) return;
         
-        // Hide button if all events are displayed
-        const hasMoreEvents = this.displayedEventCount < this.filteredEvents.length;
+        // Hide button if all events are displayed and no bundle months are left to fetch
+        const moreMonths = this.upcomingMonths().length > 0;
+        const hasMoreEvents = this.displayedEventCount < this.filteredEvents.length || moreMonths;
         loadMoreBtn.style.display = hasMoreEvents ? 'block' : 'none';
         
-        // Update button text with remaining count
+        // Update button text with remaining count (unknown until every month is fetched)
         if (hasMoreEvents) {
             const remainingEvents = this.filteredEvents.length - this.displayedEventCount;
-            loadMoreBtn.textContent = `Load More Events (${remainingEvents} remaining)`;
+            loadMoreBtn.textContent = moreMonths ? 'Load More Events'
+                : `Load More Events (${remainingEvents} remaining)`;
         }
     }
 
@@ -24,63 +24,179 @@ Required packages:
 - pillow (PIL): For image manipulation
 """
 
+import base64
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from xml.sax.saxutils import escape
+
 import qrcode
 from PIL import Image, ImageDraw, ImageFont
-import os
 
-def create_qr_code_image(url, title, subtitle, filename_suffix="", logo_path=None):
-    """Generate a QR code image with branding and optional center logo"""
-    
-    # Create QR code with higher error correction for logo embedding
+import metrics
+import render_support
+from cli_options import get_int_option, get_option
+from json_to_csv import iter_event_results, list_event_files
+
+# Font files to try, in order, before falling back to PIL's default font
+FONT_PATHS = ["/System/Library/Fonts/Helvetica.ttc", "arial.ttf"]
+FONT_SIZES = {"title": 36, "url": 20, "subtitle": 18}
+
+# Site link for event QR codes without their own event_url
+SITE_URL = "https://cubansocial.com"
+
+# Output formats: (format, variant, filename suffix, extension)
+ARTIFACTS = {
+    "png": [("png", "full", "", ".png"), ("png", "web", "_web", ".png")],
+    "png8": [("png8", "full", "_opt", ".png"), ("png8", "web", "_web_opt", ".png")],
+    "webp": [("webp", "full", "", ".webp"), ("webp", "web", "_web", ".webp")],
+    "svg": [("svg", "vector", "", ".svg")],
+}
+DEFAULT_FORMATS = ("png",)
+
+# Palette size for the quantized PNG tier (black, white, gray text, logo)
+PNG8_COLORS = 64
+
+# Fonts and prepared logo, loaded once per process by init_worker()
+_assets = {}
+
+# Sidecar manifest of rendered images, kept in each output directory
+RENDER_CACHE_FILE = ".qr_cache.json"
+RENDER_CACHE_VERSION = 1
+
+# Everything besides the entry and logo that changes the rendered pixels;
+# bump or extend it whenever create_qr_code_image() changes its output
+RENDER_PARAMS = {
+    "box_size": 10,
+    "border": 4,
+    "error_correction": "H",
+    "canvas": [600, 700],
+    "qr_size": 400,
+    "web_size": [300, 350],
+    "fonts": FONT_PATHS,
+    "font_sizes": FONT_SIZES,
+    "url_display_length": 35,
+    "png": {"optimize": True},
+    "png8": {"colors": PNG8_COLORS, "optimize": True},
+    "webp": {"lossless": True, "method": 6},
+}
+
+
+def load_fonts():
+    """Load the title, URL and subtitle fonts, probing font files once."""
+    for font_path in FONT_PATHS:
+        try:
+            return {name: render_support.load_font(font_path, size) for name, size in FONT_SIZES.items()}
+        except OSError:
+            continue
+    default_font = ImageFont.load_default()
+    return {name: default_font for name in FONT_SIZES}
+
+
+def load_logo(logo_path):
+    """Open the logo and flatten it onto white, or return None if missing."""
+    if not logo_path or not os.path.exists(logo_path):
+        return None
+    logo = Image.open(logo_path)
+
+    # Convert logo to RGBA if it has transparency, otherwise RGB
+    if logo.mode == 'RGBA':
+        # Create a white background for transparent images
+        white_bg = Image.new('RGB', logo.size, (255, 255, 255))
+        white_bg.paste(logo, mask=logo.split()[-1])
+        return white_bg
+    return logo.convert('RGB')
+
+
+def prepare_logo(logo, logo_size, cache=None):
+    """Return the logo resized onto its white circular background.
+
+    Results are kept in ``cache`` (keyed by size), since every QR code of
+    the same version uses the same logo size.
+    """
+    if cache is not None and logo_size in cache:
+        return cache[logo_size]
+
+    # Resize logo
+    resized = logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
+
+    # Create a larger white circular background
+    circle_size = logo_size + 20
+    circle_background = Image.new('RGB', (circle_size, circle_size), (255, 255, 255))
+
+    # Create a circular mask for the white background
+    mask = Image.new('L', (circle_size, circle_size), 0)
+    draw_mask = ImageDraw.Draw(mask)
+    draw_mask.ellipse((0, 0, circle_size, circle_size), fill=255)
+
+    # Apply circular mask to create a white circle
+    circle_background.putalpha(mask)
+
+    # Paste the logo onto the white circular background
+    logo_pos = (10, 10)  # Center with 10px padding
+    circle_background.paste(resized, logo_pos)
+
+    if cache is not None:
+        cache[logo_size] = circle_background
+    return circle_background
+
+
+def init_worker(logo_path=None):
+    """Load fonts and the logo once for this process (pool initializer)."""
+    _assets['fonts'] = load_fonts()
+    _assets['logo'] = load_logo(logo_path)
+    _assets['logo_path'] = logo_path
+    _assets['logo_cache'] = {}
+
+
+def make_qr(url):
+    """Build the QR code for a URL, with high error correction for the logo."""
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_H,  # High error correction for logo
         box_size=10,
         border=4,
     )
-    
-    # Add the URL
     qr.add_data(url)
     qr.make(fit=True)
+    return qr
+
+
+def display_url(url):
+    """Shorten a URL for display under the QR code."""
+    if len(url) > 35:
+        return url[:32] + "..."
+    return url
+
+
+def create_qr_code_image(url, title, subtitle, filename_suffix="", logo_path=None, fonts=None, logo=None, logo_cache=None):
+    """Generate a QR code image with branding and optional center logo
+
+    ``fonts`` and ``logo`` (from load_fonts()/load_logo()) can be passed in
+    to reuse them across images; otherwise they are loaded for this call.
+    """
+    
+    # Create QR code with higher error correction for logo embedding
+    qr = make_qr(url)
     
     # Create QR code image
     qr_img = qr.make_image(fill_color="black", back_color="white")
     
     # Add logo to center of QR code if provided
-    if logo_path and os.path.exists(logo_path):
-        logo = Image.open(logo_path)
-        
+    if logo is None:
+        logo = load_logo(logo_path)
+    if logo is not None:
         # Calculate logo size (should be about 10-15% of QR code size)
         qr_width, qr_height = qr_img.size
         logo_size = min(qr_width, qr_height) // 5  # 20% of QR code size
-        
-        # Convert logo to RGBA if it has transparency, otherwise RGB
-        if logo.mode == 'RGBA':
-            # Create a white background for transparent images
-            white_bg = Image.new('RGB', logo.size, (255, 255, 255))
-            white_bg.paste(logo, mask=logo.split()[-1] if logo.mode == 'RGBA' else None)
-            logo = white_bg
-        elif logo.mode != 'RGB':
-            logo = logo.convert('RGB')
-        
-        # Resize logo
-        logo = logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
-        
-        # Create a larger white circular background
-        circle_size = logo_size + 20
-        circle_background = Image.new('RGB', (circle_size, circle_size), (255, 255, 255))
-        
-        # Create a circular mask for the white background
-        mask = Image.new('L', (circle_size, circle_size), 0)
-        draw_mask = ImageDraw.Draw(mask)
-        draw_mask.ellipse((0, 0, circle_size, circle_size), fill=255)
-        
-        # Apply circular mask to create a white circle
-        circle_background.putalpha(mask)
-        
-        # Paste the logo onto the white circular background
-        logo_pos = (10, 10)  # Center with 10px padding
-        circle_background.paste(logo, logo_pos)
+        circle_background = prepare_logo(logo, logo_size, logo_cache)
+        circle_size = circle_background.size[0]
         
         # Convert QR code to RGBA for transparency support
         qr_img = qr_img.convert('RGBA')
@@ -91,7 +207,8 @@ def create_qr_code_image(url, title, subtitle, filename_suffix="", logo_path=Non
         # Paste the logo with white background onto QR code
         qr_img.paste(circle_background, final_pos, circle_background)
         
-        print(f"✨ Added logo with solid white circular background to QR code: {os.path.basename(logo_path)}")
+        if logo_path:
+            print(f"✨ Added logo with solid white circular background to QR code: {os.path.basename(logo_path)}")
     
     # Create a larger canvas for the final image
     canvas_width = 600
@@ -111,44 +228,406 @@ def create_qr_code_image(url, title, subtitle, filename_suffix="", logo_path=Non
     draw = ImageDraw.Draw(canvas)
     
     # Try to use a nice font, fall back to default if not available
-    try:
-        title_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 36)
-        url_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 20)
-        subtitle_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 18)
-    except:
-        try:
-            title_font = ImageFont.truetype("arial.ttf", 36)
-            url_font = ImageFont.truetype("arial.ttf", 20)
-            subtitle_font = ImageFont.truetype("arial.ttf", 18)
-        except:
-            title_font = ImageFont.load_default()
-            url_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
-    
-    # Add title
-    title_bbox = draw.textbbox((0, 0), title, font=title_font)
-    title_width = title_bbox[2] - title_bbox[0]
+    if fonts is None:
+        fonts = load_fonts()
+    title_font = fonts["title"]
+    url_font = fonts["url"]
+    subtitle_font = fonts["subtitle"]
+    
+    # Add title (text measurements are cached across images)
+    title_width = render_support.text_width(title, title_font)
     title_x = (canvas_width - title_width) // 2
     draw.text((title_x, 30), title, fill="black", font=title_font)
     
     # Add URL below QR code (shortened for display)
-    display_url = url
-    if len(display_url) > 35:
-        display_url = display_url[:32] + "..."
-    
-    url_bbox = draw.textbbox((0, 0), display_url, font=url_font)
-    url_width = url_bbox[2] - url_bbox[0]
+    shown_url = display_url(url)
+    url_width = render_support.text_width(shown_url, url_font)
     url_x = (canvas_width - url_width) // 2
-    draw.text((url_x, qr_y + qr_size + 30), display_url, fill="black", font=url_font)
+    draw.text((url_x, qr_y + qr_size + 30), shown_url, fill="black", font=url_font)
     
     # Add subtitle
-    subtitle_bbox = draw.textbbox((0, 0), subtitle, font=subtitle_font)
-    subtitle_width = subtitle_bbox[2] - subtitle_bbox[0]
+    subtitle_width = render_support.text_width(subtitle, subtitle_font)
     subtitle_x = (canvas_width - subtitle_width) // 2
     draw.text((subtitle_x, qr_y + qr_size + 70), subtitle, fill="gray", font=subtitle_font)
     
     return canvas, filename_suffix
 
+
+def create_qr_code_svg(url, title, subtitle, logo=None, logo_cache=None):
+    """Generate the QR code poster as SVG text, with the same layout.
+
+    The QR modules are drawn as one path on a 600x700 canvas, so the file
+    stays small and sharp at any size. The logo, if any, is embedded as a
+    PNG data URI; text uses system sans-serif fonts.
+    """
+    canvas_width, canvas_height = RENDER_PARAMS["canvas"]
+    qr_size = RENDER_PARAMS["qr_size"]
+    qr_x = (canvas_width - qr_size) // 2
+    qr_y = 100
+
+    qr = make_qr(url)
+    matrix = qr.get_matrix()
+    modules = len(matrix)
+    scale = qr_size / modules
+
+    # One rectangle per horizontal run of dark modules, in module units
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < modules:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < modules and row[x]:
+                x += 1
+            runs.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+    path = "".join(runs)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{canvas_width}" height="{canvas_height}" '
+        f'viewBox="0 0 {canvas_width} {canvas_height}">',
+        f'<rect width="{canvas_width}" height="{canvas_height}" fill="#fff"/>',
+        f'<path transform="translate({qr_x} {qr_y}) scale({scale:.6g})" d="{path}" fill="#000" shape-rendering="crispEdges"/>',
+    ]
+
+    if logo is not None:
+        # Same proportions as the raster version, in QR image pixels
+        qr_pixels = modules * RENDER_PARAMS["box_size"]
+        circle_background = prepare_logo(logo, qr_pixels // 5, logo_cache)
+        circle_size = circle_background.size[0] * qr_size / qr_pixels
+        buffer = io.BytesIO()
+        circle_background.save(buffer, "PNG", optimize=True)
+        data = base64.b64encode(buffer.getvalue()).decode('ascii')
+        position = (qr_size - circle_size) / 2
+        parts.append(
+            f'<image x="{qr_x + position:.2f}" y="{qr_y + position:.2f}" '
+            f'width="{circle_size:.2f}" height="{circle_size:.2f}" href="data:image/png;base64,{data}"/>'
+        )
+
+    font = 'font-family="Helvetica, Arial, sans-serif" text-anchor="middle" dominant-baseline="hanging"'
+    center = canvas_width // 2
+    parts.append(f'<text x="{center}" y="30" font-size="36" {font}>{escape(title)}</text>')
+    parts.append(f'<text x="{center}" y="{qr_y + qr_size + 30}" font-size="20" {font}>{escape(display_url(url))}</text>')
+    parts.append(f'<text x="{center}" y="{qr_y + qr_size + 70}" font-size="18" fill="gray" {font}>{escape(subtitle)}</text>')
+    parts.append('</svg>')
+    return "\n".join(parts) + "\n"
+
+
+def save_raster(image, path, image_format):
+    """Save a raster variant in one of the PNG/WebP output formats."""
+    if image_format == "png":
+        image.save(path, "PNG", **RENDER_PARAMS["png"])
+    elif image_format == "png8":
+        paletted = image.quantize(colors=PNG8_COLORS, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+        paletted.save(path, "PNG", optimize=True)
+    else:
+        image.save(path, "WEBP", **RENDER_PARAMS["webp"])
+
+
+def render_entry(entry, output_dir, formats=DEFAULT_FORMATS):
+    """Render one manifest entry and save it in every requested format.
+
+    Uses the fonts and logo loaded by init_worker(). Returns a summary dict
+    with the saved files, so the images themselves never leave the worker.
+    """
+    if not _assets:
+        init_worker()
+
+    images = {}
+    files = []
+    for artifact in entry_artifacts(entry, output_dir, formats):
+        image_format, variant, path = artifact["format"], artifact["variant"], artifact["path"]
+        if image_format == "svg":
+            svg = create_qr_code_svg(
+                entry["url"], entry["title"], entry.get("subtitle", ""),
+                logo=_assets['logo'], logo_cache=_assets['logo_cache']
+            )
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(svg)
+            size = tuple(RENDER_PARAMS["canvas"])
+        else:
+            if "full" not in images:
+                images["full"], _ = create_qr_code_image(
+                    entry["url"],
+                    entry["title"],
+                    entry.get("subtitle", ""),
+                    fonts=_assets['fonts'],
+                    logo=_assets['logo'],
+                    logo_cache=_assets['logo_cache']
+                )
+            if variant not in images:
+                # Create smaller version for web use
+                images[variant] = images["full"].resize(tuple(RENDER_PARAMS["web_size"]), Image.Resampling.LANCZOS)
+            save_raster(images[variant], path, image_format)
+            size = images[variant].size
+        files.append(dict(artifact, size=size, bytes=os.path.getsize(path)))
+
+    return {"url": entry["url"], "title": entry["title"], "files": files}
+
+
+def _render_all(entries, output_dir, logo_path=None, jobs=1, formats=DEFAULT_FORMATS):
+    """Render entries, in a process pool when ``jobs`` > 1, in order."""
+    if jobs <= 1 or len(entries) <= 1:
+        init_worker(logo_path)
+        for entry in entries:
+            yield render_entry(entry, output_dir, formats)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(logo_path,)) as pool:
+        chunksize = max(1, len(entries) // (jobs * 4))
+        yield from pool.map(render_entry, entries, [output_dir] * len(entries), [formats] * len(entries), chunksize=chunksize)
+
+
+def file_digest(path):
+    """Return the sha256 of a file's bytes, or None if there is no file."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def font_fingerprints():
+    """Return the file and bytes digest of each font that actually loaded.
+
+    FONT_PATHS are only candidates: the same list resolves to Helvetica on
+    one machine and to PIL's default font on another.
+    """
+    return {name: render_support.font_fingerprint(font) for name, font in load_fonts().items()}
+
+
+def artifact_key(entry, logo_digest, variant, fonts=None):
+    """Return the content address of one rendered image.
+
+    The key covers everything the output depends on: the entry's text, the
+    logo bytes, the loaded fonts (see font_fingerprints()), the render
+    parameters and the variant (format and size).
+    """
+    payload = json.dumps({
+        "url": entry["url"],
+        "title": entry["title"],
+        "subtitle": entry.get("subtitle", ""),
+        "logo": logo_digest,
+        "fonts": fonts,
+        "params": RENDER_PARAMS,
+        "variant": variant
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_render_cache(output_dir):
+    """Load the sidecar manifest of rendered images, or an empty one."""
+    cache_file = os.path.join(output_dir, RENDER_CACHE_FILE)
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != RENDER_CACHE_VERSION:
+        return {}
+    return cache.get('artifacts', {})
+
+
+def save_render_cache(output_dir, artifacts):
+    """Atomically write the sidecar manifest of rendered images."""
+    cache_file = os.path.join(output_dir, RENDER_CACHE_FILE)
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': RENDER_CACHE_VERSION, 'artifacts': artifacts}, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, cache_file)
+
+
+def entry_artifacts(entry, output_dir, formats):
+    """Return the files to produce for one entry, one dict per artifact.
+
+    Each dict has the ``format``, ``variant`` and ``path`` of the file.
+    """
+    artifacts = []
+    for image_format in formats:
+        for _, variant, suffix, extension in ARTIFACTS[image_format]:
+            artifacts.append({
+                "format": image_format,
+                "variant": variant,
+                "path": os.path.join(output_dir, f"{entry['filename']}{suffix}{extension}")
+            })
+    return artifacts
+
+
+def cached_result(entry, artifacts, cache):
+    """Return a render summary from the cache if every file is current."""
+    files = []
+    for artifact in artifacts:
+        record = cache.get(os.path.basename(artifact["path"]))
+        if not record or record.get('key') != artifact["key"] or not os.path.exists(artifact["path"]):
+            return None
+        files.append(dict(artifact, size=tuple(record['size']), bytes=record['bytes']))
+    return {"url": entry["url"], "title": entry["title"], "files": files, "cached": True}
+
+
+def render_entries(entries, output_dir, logo_path=None, jobs=1, use_cache=True, formats=DEFAULT_FORMATS):
+    """Render manifest entries, skipping images that are already current.
+
+    Each image is content-addressed (see artifact_key()) and recorded in a
+    sidecar manifest in ``output_dir``; entries whose images exist with a
+    matching key are neither rendered nor re-encoded. Yields one summary
+    per entry, in manifest order, with ``cached`` set for skipped entries.
+    """
+    logo_digest = file_digest(logo_path)
+    fonts = font_fingerprints()
+    cache = load_render_cache(output_dir) if use_cache else {}
+
+    planned = []
+    for entry in entries:
+        artifacts = [
+            dict(artifact, key=artifact_key(entry, logo_digest, f"{artifact['format']}:{artifact['variant']}", fonts))
+            for artifact in entry_artifacts(entry, output_dir, formats)
+        ]
+        planned.append((entry, artifacts, cached_result(entry, artifacts, cache)))
+
+    stale = [entry for entry, _, result in planned if result is None]
+    rendered = _render_all(stale, output_dir, logo_path, jobs, formats)
+    try:
+        for entry, artifacts, result in planned:
+            if result is None:
+                metrics.count('entries_rendered')
+                result = dict(next(rendered), cached=False)
+                for artifact, saved in zip(artifacts, result["files"]):
+                    saved["key"] = artifact["key"]
+                    cache[os.path.basename(saved["path"])] = {
+                        "key": artifact["key"], "size": list(saved["size"]), "bytes": saved["bytes"]
+                    }
+            else:
+                metrics.count('entries_cached')
+            yield result
+    finally:
+        rendered.close()
+        if stale:
+            save_render_cache(output_dir, cache)
+
+
+def load_manifest(manifest_path):
+    """Load QR entries (url, title, subtitle, filename) from JSON or CSV.
+
+    JSON manifests are a list of entries or an object with an "entries"
+    list. Entries without a filename are named after their title.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        if manifest_path.lower().endswith('.csv'):
+            entries = list(csv.DictReader(f))
+        else:
+            data = json.load(f)
+            entries = data.get("entries", []) if isinstance(data, dict) else data
+
+    for i, entry in enumerate(entries, 1):
+        if not entry.get("url") or not entry.get("title"):
+            raise ValueError(f"Entry {i} in {manifest_path} needs a url and a title")
+        if not entry.get("filename"):
+            slug = "".join(c if c.isalnum() else "_" for c in entry["title"].lower()).strip("_")
+            entry["filename"] = f"{slug}_qr_code"
+    return entries
+
+
+def format_event_subtitle(event):
+    """Return the date (and time) line shown under an event QR code."""
+    try:
+        date = datetime.fromisoformat(event.get("date") or "")
+    except (TypeError, ValueError):
+        return event.get("location", "")
+    # Day and hour without leading zeros (strftime's %-d/%-I are glibc-only)
+    hour = date.hour % 12 or 12
+    return f"{date:%a, %b} {date.day} · {hour}:{date:%M %p}"
+
+
+def event_manifest(events_dir):
+    """Build one QR entry per event file listed in the events index.
+
+    Missing or unreadable files are reported and skipped; events without an
+    id are named after their file.
+    """
+    events_dir = Path(events_dir)
+    entries = []
+    for filename, event, error in iter_event_results(events_dir, list_event_files(events_dir)):
+        if error:
+            print(f"⚠️  {error}")
+            continue
+        event_id = event.get("id") or Path(filename).stem
+        entries.append({
+            "url": event.get("event_url") or f"{SITE_URL}/#events",
+            "title": event.get("name") or event_id,
+            "subtitle": format_event_subtitle(event),
+            "filename": f"{event_id}_qr_code"
+        })
+    return entries
+
+
+def find_logo(image_dir):
+    """Return the dancing couple logo in ``image_dir``, or None."""
+    logo_path = os.path.join(image_dir, "dancing_couple.png")
+    if os.path.exists(logo_path):
+        print(f"🕺 Found dancing couple image: {logo_path}")
+        return logo_path
+
+    # Try alternative names
+    alternative_names = ["dancing.png", "dance.png", "couple.png", "logo.png"]
+    for name in alternative_names:
+        alt_path = os.path.join(image_dir, name)
+        if os.path.exists(alt_path):
+            return alt_path
+
+    print("⚠️  No dancing couple image found. Create 'image/dancing_couple.png' to add it to QR codes.")
+    print("   Suggested names: dancing_couple.png, dancing.png, dance.png")
+    return None
+
+
+def parse_formats(value):
+    """Parse a comma separated --formats value into known output formats."""
+    formats = tuple(dict.fromkeys(f.strip().lower() for f in value.split(',') if f.strip()))
+    unknown = [f for f in formats if f not in ARTIFACTS]
+    if unknown or not formats:
+        raise ValueError(f"Unknown format(s): {', '.join(unknown) or value}, expected: {', '.join(ARTIFACTS)}")
+    return formats
+
+
+def format_bytes(size):
+    """Format a byte count for the size report."""
+    return f"{size / 1024:.1f} KB" if size >= 1024 else f"{size} B"
+
+
+def print_size_report(results):
+    """Print file sizes per format and variant across rendered results."""
+    totals = {}
+    for result in results:
+        for saved in result["files"]:
+            count, total = totals.get((saved["format"], saved["variant"]), (0, 0))
+            totals[(saved["format"], saved["variant"])] = (count + 1, total + saved["bytes"])
+
+    print("\n📊 Size report:")
+    print(f"  {'Format':<8} {'Variant':<8} {'Files':>5} {'Average':>10} {'Total':>10}")
+    for (image_format, variant), (count, total) in totals.items():
+        print(f"  {image_format:<8} {variant:<8} {count:>5} {format_bytes(total // count):>10} {format_bytes(total):>10}")
+
+
+def run_batch(entries, output_dir, logo_path, jobs, use_cache=True, formats=DEFAULT_FORMATS, size_report=False):
+    """Render a batch of QR codes and print a one-line summary per entry."""
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"📁 Output directory: {output_dir}")
+    print(f"🎯 Rendering {len(entries)} QR codes as {', '.join(formats)} with {jobs} process{'es' if jobs > 1 else ''}...")
+
+    start = datetime.now()
+    results = []
+    with metrics.stage('render'):
+        for result in render_entries(entries, output_dir, logo_path, jobs, use_cache, formats):
+            results.append(result)
+            icon = "♻️ " if result['cached'] else "✅"
+            print(f"  {icon} {os.path.basename(result['files'][0]['path'])} → {result['url']}")
+    elapsed = (datetime.now() - start).total_seconds()
+    cached = sum(1 for result in results if result['cached'])
+    print(f"\n🎉 Generated {len(results) - cached} QR codes, {cached} unchanged, in {elapsed:.2f}s")
+
+    if size_report:
+        print_size_report(results)
+
+
 def main():
     """Generate and save QR code images for both website and app"""
     print("🎨 Generating QR codes for Cuban Social...")
@@ -156,29 +635,45 @@ def main():
     # Get the script directory and construct path to image directory
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)  # Go up one level from scripts/
-    output_dir = os.path.join(project_root, "image")
+    image_dir = os.path.join(project_root, "image")
+    metrics.start('QR_code', project_root)
+    
+    # Parse command line arguments
+    manifest_path = get_option(sys.argv, ('--manifest', '-m'))
+    from_events = '--events' in sys.argv
+    jobs = get_int_option(sys.argv, ('--jobs', '-j'), os.cpu_count() or 1, minimum=1)
+    use_cache = '--force' not in sys.argv and '-f' not in sys.argv
+    size_report = '--size-report' in sys.argv
+    try:
+        formats = parse_formats(get_option(sys.argv, ('--formats',), ','.join(DEFAULT_FORMATS)))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    # Look for dancing couple logo in image directory
+    logo_path = find_logo(image_dir)
+    
+    # Batch mode: many QR codes from a manifest or from the event files
+    if manifest_path or from_events:
+        default_dir = os.path.join(image_dir, "qr") if from_events else image_dir
+        output_dir = get_option(sys.argv, ('--output-dir', '-o'), default_dir)
+        try:
+            if from_events:
+                entries = event_manifest(os.path.join(project_root, "data", "events"))
+            else:
+                entries = load_manifest(manifest_path)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error reading QR entries: {e}")
+            sys.exit(1)
+        run_batch(entries, output_dir, logo_path, jobs, use_cache, formats, size_report)
+        return
+    
+    output_dir = get_option(sys.argv, ('--output-dir', '-o'), image_dir)
     
     # Create the output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     print(f"📁 Output directory: {output_dir}")
     
-    # Look for dancing couple logo in image directory
-    logo_path = os.path.join(output_dir, "dancing_couple.png")
-    if not os.path.exists(logo_path):
-        # Try alternative names
-        alternative_names = ["dancing.png", "dance.png", "couple.png", "logo.png"]
-        for name in alternative_names:
-            alt_path = os.path.join(output_dir, name)
-            if os.path.exists(alt_path):
-                logo_path = alt_path
-                break
-        else:
-            logo_path = None
-            print("⚠️  No dancing couple image found. Create 'image/dancing_couple.png' to add it to QR codes.")
-            print("   Suggested names: dancing_couple.png, dancing.png, dance.png")
-    else:
-        print(f"🕺 Found dancing couple image: {logo_path}")
-    
     # QR code configurations
     qr_configs = [
         {
@@ -195,34 +690,21 @@ def main():
         }
     ]
     
-    # Generate QR codes
-    for config in qr_configs:
-        print(f"\n🎯 Creating QR code for: {config['title']}")
-        
-        # Create the image
-        qr_image, _ = create_qr_code_image(
-            config["url"], 
-            config["title"], 
-            config["subtitle"],
-            logo_path=logo_path
-        )
-        
-        # Save full size image
-        output_path = os.path.join(output_dir, f"{config['filename']}.png")
-        qr_image.save(output_path, "PNG", quality=95)
-        
-        print(f"✅ QR code image saved to: {output_path}")
-        print(f"📱 Image size: {qr_image.size[0]}x{qr_image.size[1]} pixels")
+    # Generate QR codes (fonts and logo are loaded once for all of them)
+    results = []
+    for config, result in zip(qr_configs, render_entries(qr_configs, output_dir, logo_path, use_cache=use_cache, formats=formats)):
+        results.append(result)
+        if result['cached']:
+            print(f"\n♻️  Unchanged, skipped rendering: {config['title']}")
+            continue
+        print(f"\n🎯 Created QR code for: {config['title']}")
+        for saved in result['files']:
+            print(f"✅ {saved['format'].upper()} ({saved['variant']}) saved to: {saved['path']}")
+            print(f"📱 Image size: {saved['size'][0]}x{saved['size'][1]} pixels, {format_bytes(saved['bytes'])}")
         print(f"🔗 QR code links to: {config['url']}")
-        
-        # Create smaller version for web use
-        web_size = (300, 350)
-        web_image = qr_image.resize(web_size, Image.Resampling.LANCZOS)
-        web_path = os.path.join(output_dir, f"{config['filename']}_web.png")
-        web_image.save(web_path, "PNG", quality=95)
-        
-        print(f"🌐 Web version saved to: {web_path}")
-        print(f"📱 Web image size: {web_image.size[0]}x{web_image.size[1]} pixels")
+    
+    if size_report:
+        print_size_report(results)
     
     # Print usage information
     print("\n📋 Usage:")
@@ -243,4 +725,21 @@ def main():
     print("  <img src='image/cubansocial_app_qr_code_web.png' alt='Cuban Social App'>")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python QR_code.py [OPTIONS]")
+        print("")
+        print("Options:")
+        print("  --manifest, -m PATH   Render one QR code per entry of a JSON/CSV manifest")
+        print("                        (columns/keys: url, title, subtitle, filename)")
+        print("  --events              Render one QR code per event in data/events")
+        print("  --output-dir, -o DIR  Where to save images (default: image/, image/qr/ for --events)")
+        print("  --jobs, -j N          Render with N processes (default: CPU count)")
+        print("  --force, -f           Re-render images even if they are unchanged")
+        print(f"  --formats LIST        Comma separated output formats: {', '.join(ARTIFACTS)} (default: png)")
+        print("                        png8 = palette-quantized PNG (*_opt.png), webp = lossless WebP")
+        print("  --size-report         Print file sizes per format and variant")
+        print("  --help, -h            Show this help message")
+        print("")
+        print("Without --manifest or --events, the website and App Store QR codes are generated.")
+    else:
+        main()
\ No newline at end of file
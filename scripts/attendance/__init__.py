@@ -0,0 +1,23 @@
+"""
+Python implementation of the attendance model (see attendance/MODEL.md).
+
+``model`` evaluates the model over NumPy arrays; ``distribution`` gives
+the exact attendance distribution of a poll; ``history`` fits the
+probabilities from past event outcomes; ``batch`` reads polls from
+CSV/JSON Lines files or the event files and writes the estimates.
+``distribution`` and ``history`` also run as modules, so they are imported
+from ``attendance.distribution`` and ``attendance.history`` rather than
+re-exported here.
+Run ``python3 -m attendance --help`` (with scripts/ on PYTHONPATH) for the
+batch command line.
+"""
+
+from .model import (
+    DEFAULT_PROBABILITIES, PROBABILITY_KEYS, estimate_attendance, estimate_grid,
+    normal_range, p_over_capacity_normal, validate_polls
+)
+
+__all__ = [
+    'DEFAULT_PROBABILITIES', 'PROBABILITY_KEYS', 'estimate_attendance', 'estimate_grid',
+    'normal_range', 'p_over_capacity_normal', 'validate_polls'
+]
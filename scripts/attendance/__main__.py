@@ -0,0 +1,148 @@
+"""
+Score polls with the attendance model from the command line.
+
+Usage (from the project root):
+    PYTHONPATH=scripts python3 -m attendance polls.csv -o estimates.csv
+    PYTHONPATH=scripts python3 -m attendance --events --capacity 80
+    PYTHONPATH=scripts python3 -m attendance polls.jsonl --probabilities sets.csv -o grid.jsonl
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from cli_options import get_float_option, get_option
+
+from .batch import event_poll_rows, polls_from_rows, read_rows, result_rows, score_polls, write_rows
+from .history import ALL_SEGMENT, HistoryStore
+from .model import DEFAULT_PROBABILITIES, DEFAULT_Z, PROBABILITY_KEYS
+
+# Rows printed to the console when no output file is given
+PREVIEW_ROWS = 20
+
+
+def input_path(argv):
+    """Return the first positional argument (the polls file), if any."""
+    skip = False
+    for arg in argv[1:]:
+        if skip:
+            skip = False
+            continue
+        if arg.startswith('-'):
+            skip = '=' not in arg and arg not in ('--events', '--exact')
+            continue
+        return arg
+    return None
+
+
+def probability_sets(argv):
+    """Return ``[(name, {'pY': ...})]`` from --probabilities or the flags.
+
+    With --history the fitted probabilities of a segment of the history
+    store replace the defaults; --pY..--pU still override them.
+    """
+    path = get_option(argv, ('--probabilities', '-p'))
+    if path:
+        sets = []
+        for i, row in enumerate(read_rows(path), 1):
+            values = {key: float(row[key]) for key in PROBABILITY_KEYS if row.get(key) not in (None, '')}
+            sets.append((str(row.get('set') or row.get('name') or f"set{i}"), values))
+        return sets
+    name, base = '', DEFAULT_PROBABILITIES
+    history = get_option(argv, ('--history',))
+    if history:
+        name = get_option(argv, ('--segment',), ALL_SEGMENT)
+        base = HistoryStore(history).probabilities(name)
+        print(f"📈 Probabilities from {history} [{name}]: "
+              + ", ".join(f"{key}={base[key]:.3f}" for key in PROBABILITY_KEYS))
+    overrides = {key: get_float_option(argv, (f"--{key}",), base[key]) for key in PROBABILITY_KEYS}
+    return [(name, overrides)]
+
+
+def main():
+    """Read polls, score them under each probability set and write the results."""
+    project_root = Path(__file__).resolve().parent.parent.parent
+    path = input_path(sys.argv)
+    output = get_option(sys.argv, ('--output', '-o'))
+    capacity = get_option(sys.argv, ('--capacity', '-c'))
+    capacity = float(capacity) if capacity else None
+    z = get_float_option(sys.argv, ('--z',), DEFAULT_Z)
+    exact = '--exact' in sys.argv
+
+    if '--events' in sys.argv:
+        events_dir = Path(get_option(sys.argv, ('--events-dir',), project_root / "data" / "events"))
+        rows = event_poll_rows(events_dir)
+        print(f"📊 {len(rows)} events with a poll in {events_dir}")
+    elif path:
+        rows = read_rows(path)
+        print(f"📊 {len(rows)} polls from {path}")
+    else:
+        print("❌ Give a polls file (CSV or JSON Lines) or --events")
+        sys.exit(1)
+    if not rows:
+        print("ℹ️  Nothing to score")
+        return
+
+    polls = polls_from_rows(rows)
+    started = time.perf_counter()
+    results = []
+    for name, probabilities in probability_sets(sys.argv):
+        results.append(score_polls(polls, probabilities, capacity, z, name, exact))
+    elapsed = time.perf_counter() - started
+    scored = len(rows) * len(results)
+    print(f"⏱️  Scored {scored} poll estimates{' with exact distributions' if exact else ''} in {elapsed * 1000:.1f}ms")
+
+    invalid = int(sum((result['error'] != '').sum() for result in results))
+    if invalid:
+        print(f"⚠️  {invalid} invalid polls (see the error column)")
+
+    def all_rows():
+        for result in results:
+            yield from result_rows(polls, result)
+
+    if output:
+        write_rows(output, all_rows())
+        print(f"✅ Estimates written to {output}")
+        return
+
+    for i, row in enumerate(all_rows()):
+        if i == PREVIEW_ROWS:
+            print(f"  … {scored - PREVIEW_ROWS} more (use --output FILE)")
+            break
+        label = row.get('id') or f"#{i + 1}"
+        if row.get('set'):
+            label += f" [{row['set']}]"
+        if row.get('error'):
+            print(f"  ❌ {label}: {row['error']}")
+            continue
+        line = (f"  • {label}: {row['estimate']:.1f} expected ({row['rate']:.1%}), "
+                f"±{row['std_dev']:.1f}, range {row['low']:.1f}–{row['high']:.1f}")
+        if row.get('p50') is not None:
+            line += f", exact 5/50/95%: {row['p5']}/{row['p50']}/{row['p95']}"
+        if row.get('capacity') is not None:
+            line += f", P(> {row['capacity']:g}) = {row['p_over_capacity']:.1%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python -m attendance [POLLS_FILE] [OPTIONS]")
+        print("")
+        print("POLLS_FILE is a CSV or JSON Lines file with T/Y/M/N (or total/yes/maybe/no)")
+        print("columns and optional id, name, pY, pM, pN, pU and capacity columns.")
+        print("")
+        print("Options:")
+        print("  --events              Score the 'poll' field of every event in data/events")
+        print("  --events-dir DIR      Events directory for --events")
+        print("  --output, -o FILE     Write results to FILE (.csv or .jsonl) instead of a preview")
+        print("  --pY/--pM/--pN/--pU P Override the default probabilities")
+        print("  --probabilities, -p FILE  Score every poll under each probability set in FILE")
+        print("                        (CSV/JSON Lines with set, pY, pM, pN, pU columns)")
+        print("  --history FILE        Use probabilities fitted from an attendance history store")
+        print("  --segment NAME        History segment for --history (default: all)")
+        print("  --capacity, -c N      Venue capacity for polls without their own")
+        print("  --exact               Use the exact attendance distribution for P(> capacity) and percentiles")
+        print(f"  --z Z                 Width of the low/high range in standard deviations (default: {DEFAULT_Z:g})")
+        print("  --help, -h            Show this help message")
+    else:
+        main()
@@ -0,0 +1,191 @@
+"""
+Batch scoring of polls with the attendance model.
+
+Polls come from CSV or JSON Lines files (one poll per row/line) or from the
+``poll`` field of the event files in data/events:
+
+    "poll": {"total": 120, "yes": 45, "maybe": 20, "no": 10, "capacity": 80}
+
+Column names follow MODEL.md (``T``, ``Y``, ``M``, ``N``) or their long
+forms (``total``, ``yes``, ``maybe``, ``no``). Rows may also carry their own
+``pY``/``pM``/``pN``/``pU`` and ``capacity``; blank values use the defaults.
+"""
+
+import csv
+import json
+from pathlib import Path
+
+import numpy as np
+
+import json_codec
+from json_to_csv import iter_events
+
+from .distribution import AttendanceDistribution
+from .model import (
+    DEFAULT_PROBABILITIES, DEFAULT_Z, PROBABILITY_KEYS, estimate_attendance,
+    normal_range, p_over_capacity_normal, validate_polls
+)
+
+# Accepted column names for each poll count
+COUNT_COLUMNS = {
+    'T': ('T', 'total'),
+    'Y': ('Y', 'yes'),
+    'M': ('M', 'maybe'),
+    'N': ('N', 'no'),
+}
+
+RESULT_FIELDS = [
+    'id', 'name', 'date', 'set', 'T', 'Y', 'M', 'N', 'U', 'pY', 'pM', 'pN', 'pU',
+    'estimate', 'rate', 'std_dev', 'low', 'high', 'p5', 'p50', 'p95', 'capacity', 'p_over_capacity', 'error'
+]
+
+
+def read_rows(path):
+    """Read rows from a CSV, JSON Lines or JSON (list) file."""
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    if path.suffix.lower() == '.json':
+        data = json_codec.load_file(path)
+        return data if isinstance(data, list) else data.get('polls', [])
+    with open(path, 'rb') as f:
+        return [json_codec.loads(line) for line in f if line.strip()]
+
+
+def _number(value):
+    """Parse a count or probability; blanks and None become NaN."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return np.nan
+    return float(value)
+
+
+def _column(rows, names):
+    """Return the first present column among ``names`` as a float array."""
+    values = []
+    for row in rows:
+        value = None
+        for name in names:
+            if row.get(name) not in (None, ''):
+                value = row[name]
+                break
+        values.append(_number(value))
+    return np.array(values, dtype=float)
+
+
+def polls_from_rows(rows):
+    """Turn poll rows into column arrays (counts, probabilities, capacity).
+
+    Missing probabilities are NaN here and replaced by the defaults when
+    scoring; missing counts are NaN and reported as invalid polls.
+    """
+    polls = {key: _column(rows, names) for key, names in COUNT_COLUMNS.items()}
+    for key in PROBABILITY_KEYS:
+        polls[key] = _column(rows, (key,))
+    polls['capacity'] = _column(rows, ('capacity',))
+    polls['meta'] = [
+        {'id': row.get('id', ''), 'name': row.get('name', ''), 'date': row.get('date', '')}
+        for row in rows
+    ]
+    return polls
+
+
+def event_poll_rows(events_dir):
+    """Return poll rows for the events in ``events_dir`` that have a poll."""
+    rows = []
+    for event in iter_events(Path(events_dir), quiet=True):
+        poll = event.get('poll')
+        if isinstance(poll, dict):
+            rows.append(dict(poll, id=event.get('id', ''), name=event.get('name', ''),
+                             date=event.get('date', '')))
+    return rows
+
+
+def exact_columns(counts, probabilities, capacities, valid):
+    """Return exact percentiles and P(> capacity) for each valid poll.
+
+    Each poll gets its own exact distribution (see distribution.py); the
+    arrays are NaN for invalid polls.
+    """
+    size = len(valid)
+    columns = {key: np.full(size, np.nan) for key in ('p5', 'p50', 'p95', 'p_over_capacity')}
+    for i in np.flatnonzero(valid):
+        distribution = AttendanceDistribution(
+            *(counts[key][i] for key in ('T', 'Y', 'M', 'N')),
+            *(probabilities[key][i] for key in PROBABILITY_KEYS))
+        columns['p5'][i], columns['p50'][i], columns['p95'][i] = distribution.percentile([5, 50, 95])
+        if not np.isnan(capacities[i]):
+            columns['p_over_capacity'][i] = distribution.p_over(capacities[i])
+    return columns
+
+
+def score_polls(polls, probabilities=None, capacity=None, z=DEFAULT_Z, set_name='', exact=False):
+    """Score every poll; return a dictionary of result arrays.
+
+    Probabilities are taken from each poll when given, then from
+    ``probabilities`` (a ``{'pY': ...}`` override), then the defaults.
+    ``capacity`` is used for polls without their own. With ``exact``, the
+    capacity risk comes from the exact distribution instead of the normal
+    approximation, and its 5th/50th/95th percentiles are added.
+    """
+    probabilities = probabilities or {}
+    used = {}
+    for key in PROBABILITY_KEYS:
+        fallback = probabilities.get(key, DEFAULT_PROBABILITIES[key])
+        used[key] = np.where(np.isnan(polls[key]), fallback, polls[key])
+
+    counts = {key: polls[key] for key in COUNT_COLUMNS}
+    with np.errstate(invalid='ignore'):  # Out-of-range probabilities; reported by validate_polls
+        result = estimate_attendance(**counts, **used)
+    low, high = normal_range(result['estimate'], result['std_dev'], z)
+    capacities = polls['capacity']
+    if capacity is not None:
+        capacities = np.where(np.isnan(capacities), capacity, capacities)
+
+    result.update(counts)
+    result.update(used)
+    result.update(low=low, high=high, capacity=capacities,
+                  p_over_capacity=p_over_capacity_normal(result['estimate'], result['std_dev'], capacities),
+                  error=validate_polls(**counts, **used))
+    if exact:
+        result.update(exact_columns(counts, used, capacities, result['error'] == ''))
+    result['set'] = np.full(len(polls['T']), set_name, dtype=object)
+    return result
+
+
+def _cell(value):
+    """Convert a NumPy value for output: NaN becomes blank, floats are rounded."""
+    if isinstance(value, (float, np.floating)):
+        if np.isnan(value):
+            return None
+        return int(value) if float(value).is_integer() else round(float(value), 4)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def result_rows(polls, result):
+    """Yield one output row per poll; invalid polls only carry their error."""
+    for i, meta in enumerate(polls['meta']):
+        row = dict(meta)
+        if result['error'][i]:
+            row.update({key: _cell(result[key][i]) for key in ('set', 'T', 'Y', 'M', 'N', *PROBABILITY_KEYS, 'error')})
+            yield row
+            continue
+        for field in RESULT_FIELDS:
+            if field in result:
+                row[field] = _cell(result[field][i])
+        row['error'] = None
+        yield row
+
+
+def write_rows(path, rows):
+    """Write result rows to a CSV or JSON Lines file (by extension)."""
+    path = Path(path)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if path.suffix.lower() == '.csv':
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({key: '' if value is None else value for key, value in row.items()})
+        else:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
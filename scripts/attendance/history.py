@@ -0,0 +1,290 @@
+"""
+Historical attendance store for fitting pY/pM/pN/pU from past events.
+
+The attendance page computes each probability from hand-typed historical
+totals (``calculateProbability`` in attendance.js: attended / total). This
+store keeps those totals for you: every event outcome is appended to a
+compact binary file as fixed-size records of counts (how many of each
+response class there were and how many of them came), and the running sums
+are kept in memory. Recording an outcome is O(1) and estimates are served
+straight from the sums, with no rescan of history.
+
+Sums are kept for the whole history (``all``) and, optionally, per venue
+(``venue:<name>``) and per event type (``type:<tag>``). Estimates are
+Beta-posterior means: the defaults act as a prior worth
+``prior_strength`` responses, and venue/type segments are shrunk toward the
+whole history, so a venue with three past events gets sensible numbers.
+
+Usage (from the project root):
+    PYTHONPATH=scripts python3 -m attendance.history --yes 40:33 --maybe 20:7 --no 10:0 --unknown 30:4 --venue "Salsa Club" --type salsa
+    PYTHONPATH=scripts python3 -m attendance.history --import outcomes.csv
+    PYTHONPATH=scripts python3 -m attendance.history --compact
+"""
+
+import math
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+from cli_options import get_float_option, get_option
+
+from .batch import read_rows
+from .model import DEFAULT_PROBABILITIES, PROBABILITY_KEYS
+
+MAGIC = b'ATTHIST1'
+HEADER = struct.Struct('<8sI')
+# Segment name, time recorded, then total and attended for Y, M, N and U
+RECORD = struct.Struct('<64sd8I')
+GROUPS = ('Y', 'M', 'N', 'U')
+ALL_SEGMENT = 'all'
+
+# Pseudo-responses the prior (defaults or the whole history) is worth
+DEFAULT_PRIOR_STRENGTH = 10.0
+
+
+def venue_name(location):
+    """Return the venue part of an event location (the text before the first comma)."""
+    return (location or '').split(',')[0].strip()
+
+
+def outcome_segments(venue=None, types=()):
+    """Return the segment names an outcome at ``venue`` with ``types`` counts toward."""
+    segments = [ALL_SEGMENT]
+    if venue:
+        segments.append(f"venue:{venue.strip().lower()}")
+    segments.extend(f"type:{tag.strip().lower()}" for tag in types if tag and tag.strip())
+    return list(dict.fromkeys(segments))  # A repeated tag counts once
+
+
+def outcome_counts(outcome):
+    """Return the 8 counts of an outcome as a list, validating them.
+
+    ``outcome`` maps ``Y_total``, ``Y_attended``... (the ``hist_*`` fields of
+    the attendance page) to counts; missing classes count as zero.
+    """
+    counts = []
+    for group in GROUPS:
+        total = int(outcome.get(f"{group}_total") or 0)
+        attended = int(outcome.get(f"{group}_attended") or 0)
+        if total < 0 or attended < 0:
+            raise ValueError(f"{group} counts cannot be negative")
+        if attended > total:
+            raise ValueError(f"{group}: attended ({attended}) cannot be greater than the total ({total})")
+        counts.extend((total, attended))
+    return counts
+
+
+class HistoryStore:
+    """Append-only store of attendance outcomes with running sums per segment."""
+
+    def __init__(self, path, prior_strength=DEFAULT_PRIOR_STRENGTH):
+        self.path = Path(path)
+        self.prior_strength = float(prior_strength)
+        self.totals = {}
+        self.records = 0
+        self._load()
+
+    def _load(self):
+        """Read the file once and sum its records."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        data = self.path.read_bytes()
+        if len(data) < HEADER.size or HEADER.unpack_from(data) != (MAGIC, RECORD.size):
+            raise ValueError(f"{self.path} is not an attendance history file")
+
+        body = memoryview(data)[HEADER.size:]
+        complete = len(body) - len(body) % RECORD.size
+        if complete != len(body):
+            # An interrupted append left part of a record; the next append drops it
+            print(f"⚠️  Ignoring {len(body) - complete} bytes of a partial record in {self.path}")
+        for segment, _, *counts in RECORD.iter_unpack(body[:complete]):
+            self._add(segment.rstrip(b'\0').decode('utf-8'), counts)
+            self.records += 1
+
+    def _add(self, segment, counts):
+        sums = self.totals.setdefault(segment, [0] * len(counts))
+        for i, value in enumerate(counts):
+            sums[i] += value
+
+    def _append(self, records):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'ab') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                f.write(HEADER.pack(MAGIC, RECORD.size))
+            elif (size - HEADER.size) % RECORD.size:
+                # Drop a partial record left by an interrupted append
+                f.truncate(size - (size - HEADER.size) % RECORD.size)
+            f.write(b''.join(records))
+
+    def record(self, outcome, venue=None, types=(), recorded=None):
+        """Add one event outcome to the whole history and its venue/type segments."""
+        counts = outcome_counts(outcome)
+        recorded = time.time() if recorded is None else recorded
+        records = []
+        segments = outcome_segments(venue, types)
+        for segment in segments:
+            key = segment.encode('utf-8')
+            if len(key) > 64:
+                raise ValueError(f"Segment name too long (64 bytes at most): {segment}")
+            records.append(RECORD.pack(key, recorded, *counts))
+        self._append(records)
+        for segment in segments:
+            self._add(segment, counts)
+        self.records += len(records)
+
+    def segments(self):
+        """Return the segment names with recorded outcomes."""
+        return sorted(self.totals, key=lambda segment: (segment != ALL_SEGMENT, segment))
+
+    def stats(self, segment=ALL_SEGMENT):
+        """Return ``{'Y_total': ..., 'Y_attended': ...}`` for a segment (zeros if unknown)."""
+        sums = self.totals.get(segment, [0] * 2 * len(GROUPS))
+        stats = {}
+        for i, group in enumerate(GROUPS):
+            stats[f"{group}_total"], stats[f"{group}_attended"] = sums[2 * i], sums[2 * i + 1]
+        return stats
+
+    def posterior(self, segment=ALL_SEGMENT):
+        """Return ``{'pY': (alpha, beta), ...}``, the Beta posterior of each probability.
+
+        The prior mean is the default probability for ``all`` and the
+        whole-history estimate for other segments.
+        """
+        prior = DEFAULT_PROBABILITIES if segment == ALL_SEGMENT else self.probabilities(ALL_SEGMENT)
+        stats = self.stats(segment)
+        posterior = {}
+        for key, group in zip(PROBABILITY_KEYS, GROUPS):
+            total, attended = stats[f"{group}_total"], stats[f"{group}_attended"]
+            posterior[key] = (self.prior_strength * prior[key] + attended,
+                              self.prior_strength * (1 - prior[key]) + total - attended)
+        return posterior
+
+    def probabilities(self, segment=ALL_SEGMENT):
+        """Return the posterior mean of pY, pM, pN and pU for a segment."""
+        return {key: alpha / (alpha + beta) if alpha + beta > 0 else DEFAULT_PROBABILITIES[key]
+                for key, (alpha, beta) in self.posterior(segment).items()}
+
+    def std_devs(self, segment=ALL_SEGMENT):
+        """Return the posterior standard deviation of each probability."""
+        return {key: math.sqrt(alpha * beta / ((alpha + beta) ** 2 * (alpha + beta + 1)))
+                if alpha + beta > 0 else 0.0
+                for key, (alpha, beta) in self.posterior(segment).items()}
+
+    def compact(self):
+        """Rewrite the file with one record per segment; return the records removed."""
+        before = self.records
+        recorded = time.time()
+        records = [RECORD.pack(segment.encode('utf-8'), recorded, *self.totals[segment])
+                   for segment in self.segments()]
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, RECORD.size) + b''.join(records))
+        os.replace(temp_path, self.path)
+        self.records = len(records)
+        return before - self.records
+
+
+def parse_class(value, name):
+    """Parse a ``TOTAL:ATTENDED`` command line value."""
+    try:
+        total, attended = (int(part) for part in value.split(':'))
+    except ValueError:
+        raise ValueError(f"{name} expects TOTAL:ATTENDED, got {value}") from None
+    return total, attended
+
+
+def import_outcomes(store, rows):
+    """Record outcome rows (CSV/JSON Lines) with Y_total..U_attended columns.
+
+    Rows may carry a ``venue`` (or a ``location``, whose venue part is used)
+    and a ``type`` (tags separated by commas). Returns the rows recorded.
+    """
+    imported = 0
+    for i, row in enumerate(rows, 1):
+        venue = row.get('venue') or venue_name(row.get('location'))
+        types = row.get('type') or []
+        if isinstance(types, str):
+            types = types.split(',')
+        try:
+            store.record(row, venue, types)
+        except ValueError as e:
+            print(f"⚠️  Skipping row {i}: {e}")
+            continue
+        imported += 1
+    return imported
+
+
+def print_segments(store, segment=None):
+    """Print the counts and estimates of every segment (or one)."""
+    segments = [segment] if segment else store.segments()
+    print(f"  {'segment':<32} {'responses':>9}  " + "  ".join(f"{key:>13}" for key in PROBABILITY_KEYS))
+    for name in segments:
+        stats = store.stats(name)
+        responses = sum(stats[f"{group}_total"] for group in GROUPS)
+        probabilities, std_devs = store.probabilities(name), store.std_devs(name)
+        estimates = "  ".join(f"{probabilities[key]:>7.3f} ±{std_devs[key]:.3f}" for key in PROBABILITY_KEYS)
+        print(f"  {name:<32} {responses:>9,}  {estimates}")
+
+
+def main():
+    """Record, import, compact or show the attendance history."""
+    project_root = Path(__file__).resolve().parent.parent.parent
+    path = Path(get_option(sys.argv, ('--store',), project_root / "data" / "attendance_history.bin"))
+    store = HistoryStore(path, get_float_option(sys.argv, ('--prior-strength',), DEFAULT_PRIOR_STRENGTH))
+
+    import_path = get_option(sys.argv, ('--import',))
+    flags = dict(zip(GROUPS, ('--yes', '--maybe', '--no', '--unknown')))
+    classes = {group: get_option(sys.argv, (flag,)) for group, flag in flags.items()}
+    if import_path:
+        imported = import_outcomes(store, read_rows(import_path))
+        print(f"✅ Recorded {imported} outcomes from {import_path}")
+    elif any(classes.values()):
+        outcome = {}
+        try:
+            for group, value in classes.items():
+                if value:
+                    outcome[f"{group}_total"], outcome[f"{group}_attended"] = parse_class(value, flags[group])
+            types = (get_option(sys.argv, ('--type',)) or '').split(',')
+            store.record(outcome, get_option(sys.argv, ('--venue',)), types)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ Outcome recorded in {path}")
+
+    if '--compact' in sys.argv:
+        if not store.totals:
+            print("ℹ️  Nothing to compact")
+        else:
+            removed = store.compact()
+            print(f"🗜️  Compacted {path}: {removed} records merged, {store.records} left")
+
+    if not store.totals:
+        print(f"ℹ️  No outcomes recorded in {path} yet")
+        return
+    print(f"📊 {store.records} records, {len(store.totals)} segments in {path}")
+    print_segments(store, get_option(sys.argv, ('--segment',)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python -m attendance.history [OPTIONS]")
+        print("")
+        print("Without options, show the fitted probabilities of every segment.")
+        print("")
+        print("Options:")
+        print("  --store FILE                 History file (default: data/attendance_history.bin)")
+        print("  --yes/--maybe/--no/--unknown TOTAL:ATTENDED")
+        print("                               Record one event outcome (how many answered, how many came)")
+        print("  --venue NAME                 Also count the outcome toward this venue")
+        print("  --type TAGS                  Also count it toward these event types (comma separated)")
+        print("  --import FILE                Record outcomes from a CSV/JSON Lines file with Y_total,")
+        print("                               Y_attended, ... U_attended and optional venue/location, type")
+        print("  --compact                    Merge the file into one record per segment")
+        print("  --segment NAME               Only show this segment (e.g. all, venue:NAME, type:salsa)")
+        print(f"  --prior-strength N           Responses the prior is worth (default: {DEFAULT_PRIOR_STRENGTH:g})")
+        print("  --help, -h                   Show this help message")
+    else:
+        main()
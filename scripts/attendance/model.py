@@ -0,0 +1,114 @@
+"""
+Attendance model from attendance/MODEL.md, vectorized with NumPy.
+
+``estimate_attendance`` mirrors ``estimateAttendance`` in
+attendance/attendance.js, but every argument may be an array: polls
+(``T``, ``Y``, ``M``, ``N``) and probabilities (``pY``, ``pM``, ``pN``,
+``pU``) broadcast against each other, so thousands of polls, or every poll
+under several probability sets, are evaluated in one call.
+"""
+
+import math
+
+import numpy as np
+
+# Same defaults as DEFAULT_PROBABILITIES in attendance.js
+DEFAULT_PROBABILITIES = {'pY': 0.8, 'pM': 0.4, 'pN': 0.05, 'pU': 0.15}
+PROBABILITY_KEYS = ('pY', 'pM', 'pN', 'pU')
+
+# MODEL.md plans for E ± 2σ as the 95% range
+DEFAULT_Z = 2.0
+
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+
+def estimate_attendance(T, Y, M, N, pY=None, pM=None, pN=None, pU=None):
+    """Return the expected attendance and its spread for each poll.
+
+    Arguments are scalars or arrays that broadcast together; missing
+    probabilities use ``DEFAULT_PROBABILITIES``. Returns a dictionary of
+    arrays: ``U`` (non-responders, ``max(T - (Y + M + N), 0)``),
+    ``estimate`` (E), ``rate`` (E / T), ``variance`` and ``std_dev``.
+    """
+    T, Y, M, N = (np.asarray(value, dtype=float) for value in (T, Y, M, N))
+    given = {'pY': pY, 'pM': pM, 'pN': pN, 'pU': pU}
+    pY, pM, pN, pU = (
+        np.asarray(DEFAULT_PROBABILITIES[key] if given[key] is None else given[key], dtype=float)
+        for key in PROBABILITY_KEYS
+    )
+
+    U = np.maximum(T - (Y + M + N), 0)
+    estimate = pY * Y + pM * M + pN * N + pU * U
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = estimate / T  # Like the JS version, T = 0 gives inf/nan
+    variance = (Y * pY * (1 - pY) + M * pM * (1 - pM)
+                + N * pN * (1 - pN) + U * pU * (1 - pU))
+
+    return {
+        'U': U,
+        'estimate': estimate,
+        'rate': rate,
+        'variance': variance,
+        'std_dev': np.sqrt(variance)
+    }
+
+
+def validate_polls(T, Y, M, N, pY=None, pM=None, pN=None, pU=None):
+    """Return an error message per poll ('' when valid), like ``validateInputs``.
+
+    Probabilities that are given must lie in [0, 1]; the message names the
+    ones that don't.
+    """
+    given = {'pY': pY, 'pM': pM, 'pN': pN, 'pU': pU}
+    keys = [key for key in PROBABILITY_KEYS if given[key] is not None]
+    T, Y, M, N, *probabilities = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (T, Y, M, N, *(given[key] for key in keys))))
+    bad_keys = np.full(T.shape, '', dtype=object)
+    for key, p in zip(keys, probabilities):
+        bad_keys = np.where((p >= 0) & (p <= 1), bad_keys, bad_keys + ' ' + key)
+    return np.select(
+        [~(T > 0), (Y < 0) | (M < 0) | (N < 0), Y + M + N > T, bad_keys != ''],
+        ['Please enter a valid total number (greater than 0)',
+         'Values cannot be negative',
+         'The sum of responses cannot be greater than the total',
+         'Probabilities must be between 0 and 1:' + bad_keys],
+        default=''
+    )
+
+
+def normal_range(estimate, std_dev, z=DEFAULT_Z):
+    """Return ``(low, high)`` = E ∓ zσ, with the low end clipped at zero."""
+    estimate = np.asarray(estimate, dtype=float)
+    spread = z * np.asarray(std_dev, dtype=float)
+    return np.maximum(estimate - spread, 0), estimate + spread
+
+
+def p_over_capacity_normal(estimate, std_dev, capacity):
+    """Return P(attendance > capacity) from the normal approximation.
+
+    Uses a continuity correction (attendance is a count). With no spread the
+    answer is 0 or 1; a NaN capacity gives NaN.
+    """
+    estimate, std_dev, capacity = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (estimate, std_dev, capacity)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (capacity + 0.5 - estimate) / (std_dev * math.sqrt(2))
+        probability = 0.5 * _erfc(np.nan_to_num(z, nan=0.0, posinf=40.0, neginf=-40.0))
+    probability = np.where(std_dev > 0, probability, (estimate > capacity).astype(float))
+    return np.where(np.isnan(capacity), np.nan, probability)
+
+
+def estimate_grid(polls, probability_sets):
+    """Evaluate every poll under every probability set.
+
+    ``polls`` maps ``T``/``Y``/``M``/``N`` to arrays of length n and
+    ``probability_sets`` maps ``pY``... to arrays of length k (missing keys
+    use the defaults). Returns ``estimate_attendance`` results of shape
+    ``(n, k)``.
+    """
+    counts = {key: np.asarray(polls[key], dtype=float)[:, None] for key in ('T', 'Y', 'M', 'N')}
+    probabilities = {
+        key: np.asarray(probability_sets[key], dtype=float)[None, :]
+        for key in PROBABILITY_KEYS if key in probability_sets
+    }
+    return estimate_attendance(**counts, **probabilities)
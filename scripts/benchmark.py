@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Benchmark the data scripts on synthetic event archives.
+
+For each scale (number of events) a synthetic project tree is generated
+with synthetic_events.py, the current scripts are copied into it, and each
+pipeline stage runs as its own subprocess so it is measured like a real
+run: wall time, peak RSS (from ``os.wait4``) and events per second.
+
+Results are written to a JSON file that can be compared with the results
+of another revision:
+
+    python3 scripts/benchmark.py --scales 10000,100000
+    git checkout my-branch
+    python3 scripts/benchmark.py --scales 10000,100000 --compare benchmark_results_<base>.json
+
+``--compare`` prints the change per stage and exits with status 1 when a
+stage got slower, or used more memory, than ``--threshold`` allows.
+"""
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from cli_options import get_float_option, get_int_option, get_option
+from synthetic_events import DEFAULT_SEED, write_archive
+
+# Bump when the results layout changes
+RESULTS_VERSION = 1
+
+DEFAULT_SCALES = (1000, 10000)
+DEFAULT_THRESHOLD = 0.2
+
+# (name, script, arguments); stages run in this order in one project tree.
+# "{root}" is replaced with the synthetic project root.
+STAGES = [
+    ('json_to_csv', 'json_to_csv.py', []),
+    ('json_to_csv_jobs4', 'json_to_csv.py', ['--jobs', '4']),
+    ('compare_csv', 'compare-csv.py', []),
+    ('compare_csv_stream', 'compare-csv.py', ['--stream']),
+    ('insert_missing', 'insert-missing-events.py',
+     ['--force', '--backend', 'sqlite', '--sqlite-path', '{root}/bench.sqlite3']),
+    ('insert_missing_stream', 'insert-missing-events.py',
+     ['--force', '--stream', '--backend', 'sqlite', '--sqlite-path', '{root}/bench.sqlite3']),
+    ('sync_events', 'sync-events.py',
+     ['--force', '--backend', 'sqlite', '--sqlite-path', '{root}/bench.sqlite3']),
+]
+STAGE_NAMES = [name for name, _, _ in STAGES]
+
+# Stages that read the events_json.csv written by json_to_csv.py
+NEEDS_JSON_CSV = ('compare-csv.py', 'insert-missing-events.py')
+
+
+def git_revision(project_root):
+    """Return the short git revision (with ``+dirty`` for local changes)."""
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root,
+            capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=project_root,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return revision + ('+dirty' if dirty else '')
+
+
+def prepare_tree(root, count, seed, scripts_dir):
+    """Create (or reuse) a synthetic project tree and refresh its scripts."""
+    marker = root / "synthetic.json"
+    summary = None
+    if marker.exists():
+        with open(marker, 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+        if summary.get('count') != count or summary.get('seed') != seed:
+            summary = None
+    if summary is None:
+        if root.exists():
+            shutil.rmtree(root)
+        started = time.perf_counter()
+        summary = write_archive(root, count, seed)
+        print(f"  🧪 Generated {count} events in {time.perf_counter() - started:.1f}s")
+        with open(marker, 'w', encoding='utf-8') as f:
+            json.dump(summary, f)
+    else:
+        print(f"  ♻️  Reusing synthetic archive in {root}")
+
+    # Always benchmark the scripts of the current checkout
+    target = root / "scripts"
+    target.mkdir(exist_ok=True)
+    for script in scripts_dir.glob("*.py"):
+        shutil.copy2(script, target / script.name)
+    return summary
+
+
+def peak_rss_mb(usage):
+    """Return ``ru_maxrss`` in MiB (Linux reports KiB, macOS bytes)."""
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return usage.ru_maxrss * scale / (1024 * 1024)
+
+
+def run_stage(root, script, args, log_path):
+    """Run one script in the synthetic tree; return time, peak RSS and status.
+
+    The script's own stage timers and counters (see metrics.py) are
+    collected through a METRICS file next to the log.
+    """
+    command = [sys.executable, str(root / "scripts" / script)]
+    command += [arg.replace('{root}', str(root)) for arg in args]
+    metrics_path = log_path.with_suffix(".metrics.json")
+    metrics_path.unlink(missing_ok=True)
+    env = dict(os.environ, METRICS=str(metrics_path))
+    with open(log_path, 'w', encoding='utf-8') as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=root, stdin=subprocess.DEVNULL,
+                                   stdout=log, stderr=subprocess.STDOUT, env=env)
+        # wait4 reaps the child and returns its own resource usage
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    run = {'seconds': seconds, 'peak_rss_mb': peak_rss_mb(usage), 'returncode': process.returncode}
+    try:
+        with open(metrics_path, 'r', encoding='utf-8') as f:
+            script_metrics = json.load(f)
+        run['stages'] = {name: stage['seconds'] for name, stage in script_metrics['stages'].items()}
+        run['counters'] = script_metrics['counters']
+    except (OSError, ValueError, KeyError):
+        pass  # Older revisions of the scripts don't write metrics
+    return run
+
+
+def benchmark_scale(root, count, seed, stages, repeat, scripts_dir):
+    """Benchmark the selected stages on one synthetic archive."""
+    prepare_tree(root, count, seed, scripts_dir)
+    log_dir = root / "logs"
+    log_dir.mkdir(exist_ok=True)
+
+    results = []
+    for name, script, args in STAGES:
+        if name not in stages:
+            continue
+        if script in NEEDS_JSON_CSV and not (root / "events_json.csv").exists():
+            # Untimed: the stage needs json_to_csv.py output to exist
+            run_stage(root, 'json_to_csv.py', [], log_dir / "prepare.log")
+
+        runs = []
+        for _ in range(repeat):
+            (root / "bench.sqlite3").unlink(missing_ok=True)
+            runs.append(run_stage(root, script, args, log_dir / f"{name}.log"))
+        best = min(runs, key=lambda run: run['seconds'])
+        result = {
+            'stage': name,
+            'events': count,
+            'seconds': round(best['seconds'], 4),
+            'runs': [round(run['seconds'], 4) for run in runs],
+            'peak_rss_mb': round(max(run['peak_rss_mb'] for run in runs), 1),
+            'rows_per_sec': round(count / best['seconds'], 1) if best['seconds'] else None,
+            'returncode': max((run['returncode'] for run in runs), key=abs),
+            'stages': best.get('stages', {}),
+            'counters': best.get('counters', {})
+        }
+        results.append(result)
+        status = "✅" if result['returncode'] == 0 else f"❌ exit {result['returncode']}, see {log_dir / (name + '.log')}"
+        print(f"  {name:<24} {result['seconds']:>9.3f}s  {result['peak_rss_mb']:>8.1f} MiB  "
+              f"{result['rows_per_sec'] or 0:>12,.0f} events/s  {status}")
+    return results
+
+
+def compare_results(base, current, threshold):
+    """Print per-stage changes against ``base``; return the regressions."""
+    base_results = {(result['stage'], result['events']): result for result in base['results']}
+    regressions = []
+    print(f"\n📊 Compared with {base.get('revision', '?')} ({base.get('generated_at', '?')})")
+    print(f"  {'stage':<24} {'events':>9} {'time':>9} {'Δ time':>9} {'RSS':>9} {'Δ RSS':>9}")
+    for result in current['results']:
+        key = (result['stage'], result['events'])
+        previous = base_results.get(key)
+        if previous is None or not previous['seconds']:
+            print(f"  {result['stage']:<24} {result['events']:>9,} {result['seconds']:>8.3f}s {'new':>9}")
+            continue
+        time_change = result['seconds'] / previous['seconds'] - 1
+        rss_change = result['peak_rss_mb'] / previous['peak_rss_mb'] - 1 if previous['peak_rss_mb'] else 0
+        regressed = time_change > threshold or rss_change > threshold
+        if regressed:
+            regressions.append(key)
+        print(f"  {result['stage']:<24} {result['events']:>9,} {result['seconds']:>8.3f}s {time_change:>+9.1%} "
+              f"{result['peak_rss_mb']:>6.1f}MiB {rss_change:>+9.1%}{'  ⚠️  regression' if regressed else ''}")
+    return regressions
+
+
+def parse_scales(value):
+    """Parse a comma-separated list of event counts (``k``/``m`` suffixes allowed)."""
+    scales = []
+    for part in value.split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        multiplier = {'k': 1000, 'm': 1000000}.get(part[-1], 1)
+        number = part[:-1] if multiplier > 1 else part
+        scales.append(int(float(number) * multiplier))
+    if not scales or min(scales) < 1:
+        raise ValueError(f"no valid scales in {value!r}")
+    return scales
+
+
+def main():
+    """Run the benchmark suite and write (and optionally compare) the results."""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+
+    try:
+        scales = parse_scales(get_option(sys.argv, ('--scales',), ",".join(map(str, DEFAULT_SCALES))))
+    except ValueError as e:
+        print(f"❌ Invalid --scales: {e}")
+        sys.exit(2)
+    stages = get_option(sys.argv, ('--stages',))
+    stages = [name.strip() for name in stages.split(',')] if stages else STAGE_NAMES
+    unknown = [name for name in stages if name not in STAGE_NAMES]
+    if unknown:
+        print(f"❌ Unknown stages: {', '.join(unknown)} (choose from {', '.join(STAGE_NAMES)})")
+        sys.exit(2)
+    repeat = get_int_option(sys.argv, ('--repeat', '-r'), 1, minimum=1)
+    seed = get_int_option(sys.argv, ('--seed',), DEFAULT_SEED)
+    threshold = get_float_option(sys.argv, ('--threshold',), DEFAULT_THRESHOLD)
+    compare = get_option(sys.argv, ('--compare',))
+    workdir = get_option(sys.argv, ('--workdir',))
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output = Path(get_option(sys.argv, ('--output', '-o'), project_root / f"benchmark_results_{timestamp}.json"))
+
+    base = None
+    if compare:
+        try:
+            with open(compare, 'r', encoding='utf-8') as f:
+                base = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot read {compare}: {e}")
+            sys.exit(2)
+
+    keep = workdir is not None
+    workdir = Path(workdir) if keep else Path(tempfile.mkdtemp(prefix="cuban-social-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    revision = git_revision(project_root)
+    print(f"⏱️  Benchmarking {revision} at {', '.join(f'{count:,}' for count in scales)} events")
+    print(f"📁 Work directory: {workdir}{'' if keep else ' (removed afterwards)'}")
+
+    results = []
+    try:
+        for count in scales:
+            print(f"\n📦 {count:,} events")
+            root = workdir / f"events-{count}-seed{seed}"
+            results.extend(benchmark_scale(root, count, seed, stages, repeat, script_dir))
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'version': RESULTS_VERSION,
+        'revision': revision,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'seed': seed,
+        'repeat': repeat,
+        'results': results
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    failed = [result['stage'] for result in results if result['returncode'] != 0]
+    if failed:
+        print(f"❌ Stages failed: {', '.join(sorted(set(failed)))}")
+
+    if base is not None:
+        regressions = compare_results(base, report, threshold)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} regressions above {threshold:.0%}")
+            sys.exit(1)
+        print(f"\n✅ No regressions above {threshold:.0%}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python benchmark.py [OPTIONS]")
+        print("")
+        print("Options:")
+        print(f"  --scales N,N,...     Event counts to benchmark, e.g. 10k,100k,1m (default: {','.join(map(str, DEFAULT_SCALES))})")
+        print(f"  --stages A,B,...     Stages to run (default: all): {', '.join(STAGE_NAMES)}")
+        print("  --repeat, -r N       Run each stage N times and keep the fastest run")
+        print(f"  --seed N             Seed of the synthetic archive (default: {DEFAULT_SEED})")
+        print("  --workdir DIR        Keep synthetic archives in DIR and reuse them across runs")
+        print("  --output, -o FILE    Results file (default: benchmark_results_YYYYMMDD_HHMMSS.json)")
+        print("  --compare FILE       Compare with earlier results; exit 1 on regressions")
+        print(f"  --threshold R        Allowed slowdown/memory growth before a regression (default: {DEFAULT_THRESHOLD})")
+        print("  --help, -h           Show this help message")
+    else:
+        main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Script to compile the static site data into bundles for the front end.
+
+The site used to fetch every collection as an index.json manifest followed
+by one request per file. This script writes one bundle per collection to
+data/bundles/ instead:
+
+    events/index.json         months with counts, date ranges and filters
+    events/events-YYYY-MM.json the month's events, sorted, with sort keys
+    congresses.json           all congresses, sorted by date
+    playlists.json            all playlists, in index order
+
+so a page load needs the events index plus the current month; the front end
+fetches other months when they are shown, skipping months the index's
+type filter rules out, and merges them by sort key. The index
+records what it was built from: a signature of the event files (names,
+mtimes and sizes, checked by ``--if-stale``), a digest of
+data/events/index.json (checked by the front end, which falls back to the
+event files when it differs) and how far recurring events were expanded.
+The deploy workflow rebuilds the bundles on every deploy and daily.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import metrics
+from cli_options import get_int_option, get_option
+from event_dates import event_month
+from json_to_csv import iter_event_results, iter_events, list_event_files, source_signature
+from recurrence import expand_events, parse_window_date
+
+# Bump when the bundle layout changes so the front end can detect it
+BUNDLE_VERSION = 2
+
+# How far ahead recurring events are expanded by default
+DEFAULT_EXPAND_DAYS = 180
+
+
+def is_published(event):
+    """Return True for events the site shows (approved or legacy, no status)."""
+    return event.get('status') == 'approved' or 'status' not in event
+
+
+def sort_key(event):
+    """Return the event's precomputed sort key: minutes since the epoch.
+
+    Dates are Pacific local times without a zone; they are read as naive
+    times so the key orders events exactly like their date strings.
+    """
+    try:
+        dt = datetime.fromisoformat(event['date'])
+    except (KeyError, TypeError, ValueError):
+        return 0
+    return int(dt.replace(tzinfo=timezone.utc).timestamp()) // 60
+
+
+def build_month_bundle(month, events):
+    """Build one month's bundle with events sorted by their sort key."""
+    events = sorted(events, key=lambda event: (sort_key(event), event.get('id', '')))
+    for event in events:
+        event['sort_key'] = sort_key(event)
+
+    return {
+        'version': BUNDLE_VERSION,
+        'month': month,
+        'count': len(events),
+        'events': events
+    }
+
+
+def month_summary(bundle, filename):
+    """Summarize a month bundle for the events index."""
+    events = bundle['events']
+    end_dates = [event.get('end_date') or event['date'] for event in events]
+    types = {}
+    for event in events:
+        for dance_type in event.get('type') or []:
+            types[dance_type] = types.get(dance_type, 0) + 1
+    return {
+        'month': bundle['month'],
+        'file': filename,
+        'count': bundle['count'],
+        'first_date': events[0]['date'],
+        'last_date': max(end_dates),
+        'types': dict(sorted(types.items())),
+        'featured': sum(1 for event in events if event.get('featured'))
+    }
+
+
+def write_json(path, data):
+    """Write compact JSON atomically."""
+    tmp_path = Path(str(path) + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def build_events_bundle(events_dir, output_dir, jobs=1, expand_until=None):
+    """Write the month bundles and the events index; return the index.
+
+    Recurring events are expanded into their occurrences up to
+    ``expand_until`` (a datetime), each occurrence bundled in its own month.
+    """
+    months = {}
+    skipped = 0
+    events = expand_events(iter_events(events_dir, quiet=True, jobs=jobs), None, expand_until)
+    for event in events:
+        if not is_published(event):
+            continue
+        month = event_month(event)
+        if month is None:
+            skipped += 1
+            print(f"⚠️  Skipping event without a valid date: {event.get('id', '?')}")
+            continue
+        months.setdefault(month, []).append(event)
+
+    bundle_dir = output_dir / "events"
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+
+    summaries = []
+    types = {}
+    featured_months = []
+    for month in sorted(months):
+        filename = f"events-{month}.json"
+        bundle = build_month_bundle(month, months[month])
+        write_json(bundle_dir / filename, bundle)
+        summary = month_summary(bundle, filename)
+        summaries.append(summary)
+        for dance_type in summary['types']:
+            types.setdefault(dance_type, []).append(month)
+        if summary['featured']:
+            featured_months.append(month)
+        print(f"  📅 {filename}: {summary['count']} events")
+
+    # Remove month bundles that no longer have events
+    current = {summary['file'] for summary in summaries}
+    for stale in bundle_dir.glob("events-*.json"):
+        if stale.name not in current:
+            stale.unlink()
+            print(f"  🗑️  Removed {stale.name}")
+
+    index_file = events_dir / "index.json"
+    index = {
+        'version': BUNDLE_VERSION,
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'source_signature': source_signature(events_dir),
+        'index_digest': hashlib.sha256(index_file.read_bytes()).hexdigest() if index_file.exists() else None,
+        'source_files': len(list_event_files(events_dir)),
+        'expanded_until': expand_until.date().isoformat() if expand_until else None,
+        'count': sum(summary['count'] for summary in summaries),
+        'months': summaries,
+        'filters': {'type': dict(sorted(types.items())), 'featured': featured_months}
+    }
+    write_json(bundle_dir / "index.json", index)
+    if skipped:
+        print(f"⚠️  {skipped} events without a date were left out")
+    return index
+
+
+def events_bundle_current(events_dir, output_dir, expand_until):
+    """Return True if the events bundle matches the event files and covers ``expand_until``."""
+    try:
+        with open(output_dir / "events" / "index.json", 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (index.get('version') == BUNDLE_VERSION
+            and index.get('source_signature') == source_signature(events_dir)
+            and (index.get('expanded_until') or '') >= expand_until.date().isoformat())
+
+
+def load_collection(collection_dir, index_key='files', jobs=1):
+    """Load the files listed under ``index_key`` in a collection's index.json."""
+    index_file = collection_dir / "index.json"
+    if not index_file.exists():
+        return []
+    with open(index_file, 'r', encoding='utf-8') as f:
+        filenames = json.load(f).get(index_key, [])
+
+    items = []
+    for filename, item, error in iter_event_results(collection_dir, filenames, jobs):
+        if error:
+            print(error)
+            continue
+        items.append(item)
+    return items
+
+
+def main():
+    """Main function to build the site data bundles."""
+    jobs = get_int_option(sys.argv[1:], ('--jobs', '-j'), 1, minimum=1)
+    if_stale = '--if-stale' in sys.argv
+    default_until = (datetime.now() + timedelta(days=DEFAULT_EXPAND_DAYS)).date().isoformat()
+    try:
+        expand_until = parse_window_date(get_option(sys.argv, ('--expand-until',), default_until), end=True)
+    except ValueError as e:
+        print(f"❌ Invalid --expand-until date: {e}")
+        return
+
+    # Get the script directory and navigate to the project root
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    data_dir = project_root / "data"
+    output_dir = data_dir / "bundles"
+    metrics.start('build_site_data', project_root)
+
+    print("📦 Building site data bundles...")
+    print(f"📁 Output directory: {output_dir}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    events_dir = data_dir / "events"
+    if events_dir.exists() and if_stale and events_bundle_current(events_dir, output_dir, expand_until):
+        print("\n✅ Events bundle is up to date")
+    elif events_dir.exists():
+        print(f"\n🎉 Events ({len(list_event_files(events_dir))} files)")
+        print(f"🔁 Recurring events expanded until {expand_until.date()}")
+        with metrics.stage('events'):
+            index = build_events_bundle(events_dir, output_dir, jobs, expand_until)
+        print(f"✅ {index['count']} published events in {len(index['months'])} months")
+
+    with metrics.stage('congresses'):
+        congresses = load_collection(data_dir / "congresses", 'files', jobs)
+        congresses.sort(key=lambda congress: congress.get('date', ''))
+        write_json(output_dir / "congresses.json", {'version': BUNDLE_VERSION, 'congresses': congresses})
+    print(f"✅ {len(congresses)} congresses → congresses.json")
+
+    with metrics.stage('playlists'):
+        playlists = load_collection(data_dir / "playlists", 'playlists', jobs)
+        write_json(output_dir / "playlists.json", {'version': BUNDLE_VERSION, 'playlists': playlists})
+    print(f"✅ {len(playlists)} playlists → playlists.json")
+
+    print("\n🎉 Site data bundles built!")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python build_site_data.py [OPTIONS]")
+        print("")
+        print("Options:")
+        print("  --jobs, -j N           Read data files with N threads")
+        print(f"  --expand-until DATE    Expand recurring events until DATE (default: {DEFAULT_EXPAND_DAYS} days ahead)")
+        print("  --if-stale             Keep the events bundle if the event files have not changed")
+        print("  --help, -h             Show this help message")
+    else:
+        main()
@@ -0,0 +1,43 @@
+"""
+Helpers for reading valued command line options in the data scripts.
+
+The scripts check boolean flags directly against ``sys.argv``; these helpers
+cover the options that take a value, accepting both ``--name value`` and
+``--name=value``.
+"""
+
+
+def get_option(argv, names, default=None):
+    """Return the value of the first option in ``names`` found in ``argv``."""
+    for i, arg in enumerate(argv):
+        if arg in names and i + 1 < len(argv):
+            return argv[i + 1]
+        for name in names:
+            if name.startswith('--') and arg.startswith(name + '='):
+                return arg.split('=', 1)[1]
+    return default
+
+
+def get_int_option(argv, names, default, minimum=None):
+    """Return an integer option, falling back to ``default`` if invalid."""
+    value = get_option(argv, names)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        print(f"Invalid {names[0]} value: {value}, using {default}")
+        return default
+    return max(number, minimum) if minimum is not None else number
+
+
+def get_float_option(argv, names, default):
+    """Return a float option, falling back to ``default`` if invalid."""
+    value = get_option(argv, names)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Invalid {names[0]} value: {value}, using {default}")
+        return default
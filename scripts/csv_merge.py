@@ -0,0 +1,108 @@
+"""
+External sort and merge join for large CSV exports.
+
+CSV files are sorted by a key column in bounded memory: rows are read in
+chunks, each chunk is sorted and spilled to a temporary file, and the sorted
+runs are merged lazily with heapq. Two sorted streams can then be joined in a
+single pass, which is how the comparison scripts handle Supabase exports that
+are too large to load into lists of dictionaries.
+"""
+
+import csv
+import heapq
+import itertools
+import os
+import tempfile
+from operator import itemgetter
+
+# Rows held in memory per sorted run before spilling to disk
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def _write_run(rows, tmp_dir, run_number):
+    """Write one sorted run of rows to a temporary CSV file."""
+    path = os.path.join(tmp_dir, f"run-{run_number:05d}.csv")
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerows(rows)
+    return path
+
+
+def _read_run(path):
+    """Read a spilled run back as lists of values."""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        yield from csv.reader(f)
+
+
+def sort_csv_by_key(csv_path, key='id', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the rows of a CSV file as dictionaries, sorted by ``key``.
+
+    Files with at most ``chunk_size`` rows are sorted in memory. Larger files
+    are split into sorted runs spilled to a temporary directory, which is
+    removed once the generator is exhausted or closed.
+    """
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        fieldnames = next(reader, None)
+        if not fieldnames:
+            return
+        key_index = fieldnames.index(key)
+        sort_key = itemgetter(key_index)
+
+        first = sorted(itertools.islice(reader, chunk_size), key=sort_key)
+        second = list(itertools.islice(reader, chunk_size))
+        if not second:
+            # Everything fits in one chunk: no need to touch the disk
+            for values in first:
+                yield dict(zip(fieldnames, values))
+            return
+
+        with tempfile.TemporaryDirectory(prefix="csv-sort-") as tmp_dir:
+            runs = [_write_run(first, tmp_dir, 0)]
+            del first
+            chunk = second
+            while chunk:
+                chunk.sort(key=sort_key)
+                runs.append(_write_run(chunk, tmp_dir, len(runs)))
+                chunk = list(itertools.islice(reader, chunk_size))
+
+            merged = heapq.merge(*(_read_run(path) for path in runs), key=sort_key)
+            for values in merged:
+                yield dict(zip(fieldnames, values))
+
+
+def _last_per_key(rows, key):
+    """Collapse runs of rows sharing a key, keeping the last one.
+
+    This mirrors building a ``{row[key]: row}`` lookup, where later rows
+    overwrite earlier ones.
+    """
+    for _, group in itertools.groupby(rows, key=itemgetter(key)):
+        row = None
+        for row in group:
+            pass
+        yield row
+
+
+def merge_join(left_rows, right_rows, key='id'):
+    """Full outer join of two streams already sorted by ``key``.
+
+    Yields ``(key_value, left_row, right_row)`` in key order; the row missing
+    from one side is None.
+    """
+    left = _last_per_key(left_rows, key)
+    right = _last_per_key(right_rows, key)
+    left_row = next(left, None)
+    right_row = next(right, None)
+
+    while left_row is not None or right_row is not None:
+        if right_row is None or (left_row is not None and left_row[key] < right_row[key]):
+            yield left_row[key], left_row, None
+            left_row = next(left, None)
+        elif left_row is None or right_row[key] < left_row[key]:
+            yield right_row[key], None, right_row
+            right_row = next(right, None)
+        else:
+            yield left_row[key], left_row, right_row
+            left_row = next(left, None)
+            right_row = next(right, None)
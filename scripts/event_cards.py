@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Monthly event cards rendered with Pillow.
+
+Python version of generate-event-cards.js: one PNG per month in
+data/cards/events-YYYY-MM.png with the same layout as ``createEventCard``.
+
+- Months are rendered in a process pool (``--jobs``).
+- The static layers are rasterized once per process and pasted into every
+  card: the header of each month, the event row background (info box on
+  the month color), the day boxes and the price badges.
+- Fonts and text measurements come from render_support's caches; event
+  names, venues and types are fitted to the info box (venues stop before
+  the price badge) instead of overflowing it as in the JS version.
+- Each month's events are hashed together with the render parameters and
+  recorded in a sidecar manifest (data/cards/.cards_cache.json); months
+  whose hash is unchanged are not rendered again (``--force`` re-renders).
+
+Requires Pillow (pip install pillow).
+
+Usage:
+    python3 scripts/event_cards.py                    # cards from data/events
+    python3 scripts/event_cards.py --from-db          # cards from the events table, like the JS script
+    python3 scripts/event_cards.py --month 2025-09 --force
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+import metrics
+import render_support
+from cli_options import get_int_option, get_option
+from event_dates import EVENT_TIMEZONE, parse_datetime
+from json_to_csv import iter_events
+
+# Same palette and names as generate-event-cards.js
+MONTH_COLORS = {
+    1: '#1e40af',  # January - Blue
+    2: '#dc2626',  # February - Red
+    3: '#16a34a',  # March - Green
+    4: '#ca8a04',  # April - Yellow
+    5: '#7c3aed',  # May - Purple
+    6: '#ea580c',  # June - Orange
+    7: '#0891b2',  # July - Cyan
+    8: '#2563eb',  # August - Blue
+    9: '#059669',  # September - Emerald
+    10: '#d97706',  # October - Amber
+    11: '#7c2d12',  # November - Brown
+    12: '#b91c1c'  # December - Red
+}
+MONTH_NAMES = {
+    1: 'JANUARY', 2: 'FEBRUARY', 3: 'MARCH', 4: 'APRIL',
+    5: 'MAY', 6: 'JUNE', 7: 'JULY', 8: 'AUGUST',
+    9: 'SEPTEMBER', 10: 'OCTOBER', 11: 'NOVEMBER', 12: 'DECEMBER'
+}
+# Indexed by datetime.weekday() (Monday = 0)
+DAY_NAMES = ('MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY', 'SUNDAY')
+
+DAY_BOX_COLOR = '#fbbf24'
+INFO_BOX_COLOR = '#f0f9ff'
+TEXT_COLOR = '#1f2937'
+MUTED_COLOR = '#6b7280'
+PRICE_COLOR = '#16a34a'
+
+CARD_WIDTH = 800
+HEADER_HEIGHT = 200
+EVENT_HEIGHT = 140  # 120 + 20 margin
+FOOTER_HEIGHT = 50
+# Right edge for text in the info box, and the space kept before the price
+TEXT_RIGHT = 730
+PRICE_GAP = 12
+
+# Font files to try, in order, before falling back to PIL's default font
+FONT_PATHS = {
+    'regular': ("/System/Library/Fonts/Supplemental/Arial.ttf", "arial.ttf",
+                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"),
+    'bold': ("/System/Library/Fonts/Supplemental/Arial Bold.ttf", "arialbd.ttf",
+             "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+}
+
+# Rounded boxes in the cached layers are drawn this many times larger and
+# scaled down, which smooths their corners like the canvas version
+SUPERSAMPLE = 4
+
+# Sidecar manifest of rendered cards, kept in the cards directory
+RENDER_CACHE_FILE = ".cards_cache.json"
+RENDER_CACHE_VERSION = 1
+
+# Everything besides the events that changes the rendered pixels; bump or
+# extend it whenever render_card() changes its output
+RENDER_PARAMS = {
+    "layout": [CARD_WIDTH, HEADER_HEIGHT, EVENT_HEIGHT, FOOTER_HEIGHT],
+    "colors": [MONTH_COLORS, DAY_BOX_COLOR, INFO_BOX_COLOR, TEXT_COLOR, MUTED_COLOR, PRICE_COLOR],
+    "fonts": FONT_PATHS,
+    "supersample": SUPERSAMPLE,
+    "fit_text": [TEXT_RIGHT, PRICE_GAP],
+}
+
+# Event fields drawn on a card (and hashed to detect changes)
+CARD_FIELDS = ('date', 'name', 'location', 'price', 'type')
+
+
+def load_font(style, size):
+    """Return the regular or bold font at ``size`` (cached by render_support)."""
+    return render_support.first_font(FONT_PATHS[style], size)
+
+
+def parse_date(value):
+    """Parse an event date as Pacific local time; DB timestamps are converted.
+
+    Raises ValueError for a missing or invalid date.
+    """
+    date = value if isinstance(value, datetime) else parse_datetime(str(value))
+    if date is None:
+        raise ValueError(f"Invalid date: {value!r}")
+    if date.tzinfo is not None:
+        date = date.astimezone(EVENT_TIMEZONE).replace(tzinfo=None)
+    return date
+
+
+def format_time(date):
+    """Format a time like 9PM or 7:30PM; midnight means no time was given."""
+    if date.hour == 0 and date.minute == 0:
+        return ''
+    period = 'PM' if date.hour >= 12 else 'AM'
+    hours = 12 if date.hour == 0 else date.hour - 12 if date.hour > 12 else date.hour
+    minutes = '' if date.minute == 0 else f":{date.minute:02d}"
+    return f"{hours}{minutes}{period}"
+
+
+def format_price(price):
+    """Truncate prices longer than 8 characters."""
+    if not price:
+        return ''
+    return price[:5] + '...' if len(price) > 8 else price
+
+
+def location_short(location):
+    """Return the venue name (before the first comma) in capitals."""
+    return (location or '').split(',')[0].strip().upper()
+
+
+def card_height(event_count):
+    return HEADER_HEIGHT + event_count * EVENT_HEIGHT + FOOTER_HEIGHT
+
+
+def _rounded_box(size, background, fill, box, radius):
+    """Return an image of ``size`` with a smooth rounded box drawn on ``background``."""
+    scale = SUPERSAMPLE
+    image = Image.new('RGB', (size[0] * scale, size[1] * scale), background)
+    x, y, width, height = (value * scale for value in box)
+    ImageDraw.Draw(image).rounded_rectangle((x, y, x + width - 1, y + height - 1), radius * scale, fill=fill)
+    return image.resize(size, Image.Resampling.LANCZOS)
+
+
+@lru_cache(maxsize=None)
+def header_layer(month, year):
+    """Return the month color header with the title and month (cached)."""
+    image = Image.new('RGB', (CARD_WIDTH, HEADER_HEIGHT), MONTH_COLORS[month])
+    draw = ImageDraw.Draw(image)
+    draw.text((400, 80), 'SD CASINO EVENTS', fill='white', font=load_font('bold', 48), anchor='ms')
+    draw.text((400, 130), f"{MONTH_NAMES[month]} {year}", fill='white', font=load_font('bold', 36), anchor='ms')
+    return image
+
+
+@lru_cache(maxsize=None)
+def row_layer(month):
+    """Return one event row: the info box on the month color (cached)."""
+    return _rounded_box((CARD_WIDTH, EVENT_HEIGHT), MONTH_COLORS[month], INFO_BOX_COLOR, (150, 10, 600, 100), 15)
+
+
+@lru_cache(maxsize=None)
+def day_box(month, day, weekday):
+    """Return the day box with the day number and day name (cached)."""
+    image = _rounded_box((100, 100), MONTH_COLORS[month], DAY_BOX_COLOR, (0, 0, 100, 100), 15)
+    draw = ImageDraw.Draw(image)
+    draw.text((50, 60), str(day), fill=TEXT_COLOR, font=load_font('bold', 48), anchor='ms')
+    draw.text((50, 80), DAY_NAMES[weekday], fill=TEXT_COLOR, font=load_font('bold', 16), anchor='ms')
+    return image
+
+
+@lru_cache(maxsize=1024)
+def price_badge(price):
+    """Return the green price box with its text, right edge at the image edge (cached)."""
+    # Measured with the 18px font, as the JS version measures before switching fonts
+    width = round(render_support.text_length(price, load_font('regular', 18)) + 16)
+    image = _rounded_box((width, 24), INFO_BOX_COLOR, PRICE_COLOR, (0, 0, width, 24), 6)
+    ImageDraw.Draw(image).text((width / 2, 16), price, fill='white', font=load_font('bold', 14), anchor='ms')
+    return image
+
+
+def draw_separator(draw, y):
+    """Draw the dotted line where the day box meets the info box."""
+    for start in range(y + 35, y + 85, 16):
+        draw.line((150, start, 150, min(start + 8, y + 85)), fill=MUTED_COLOR, width=3)
+
+
+def draw_event(image, draw, event, y, month):
+    """Draw one event row with its top at ``y``."""
+    date = parse_date(event['date'])
+    image.paste(day_box(month, date.day, date.weekday()), (50, y + 10))
+    draw_separator(draw, y)
+
+    bold = load_font('bold', 24)
+    name = render_support.fit_text((event.get('name') or '').upper(), bold, TEXT_RIGHT - 170)
+    draw.text((170, y + 40), name, fill=TEXT_COLOR, font=bold, anchor='ls')
+
+    # Venues stop short of the price badge instead of running under it
+    badge = price_badge(format_price(event['price'])) if event.get('price') else None
+    right = 720 - badge.width - PRICE_GAP if badge else TEXT_RIGHT
+    regular = load_font('regular', 18)
+    time_text = format_time(date)
+    x = 270 if time_text else 170
+    if time_text:
+        draw.text((170, y + 70), time_text, fill=TEXT_COLOR, font=regular, anchor='ls')
+    location = render_support.fit_text(location_short(event.get('location')), regular, right - x)
+    draw.text((x, y + 70), location, fill=TEXT_COLOR, font=regular, anchor='ls')
+
+    if badge:
+        image.paste(badge, (720 - badge.width, y + 58))
+
+    if event.get('type'):
+        small = load_font('regular', 16)
+        types = render_support.fit_text(' • '.join(event['type']).upper(), small, TEXT_RIGHT - 170)
+        draw.text((170, y + 95), types, fill=MUTED_COLOR, font=small, anchor='ls')
+
+
+def render_card(events, month, year):
+    """Render the card for one month's events (sorted by date)."""
+    image = Image.new('RGB', (CARD_WIDTH, card_height(len(events))), MONTH_COLORS[month])
+    image.paste(header_layer(month, year), (0, 0))
+    draw = ImageDraw.Draw(image)
+    y = HEADER_HEIGHT
+    for event in events:
+        image.paste(row_layer(month), (0, y))
+        draw_event(image, draw, event, y, month)
+        y += EVENT_HEIGHT
+    return image
+
+
+def render_month(job):
+    """Render and save one month's card (process pool worker)."""
+    year, month, events, path = job
+    image = render_card(events, month, year)
+    image.save(path, 'PNG')
+    return {'path': path, 'events': len(events), 'size': image.size, 'bytes': os.path.getsize(path)}
+
+
+def card_event(event):
+    """Return the fields of an event that are drawn on its card."""
+    card = {field: event.get(field) for field in CARD_FIELDS}
+    types = card['type']
+    if isinstance(types, str):
+        types = [tag.strip() for tag in types.strip('{}[]').replace('"', '').split(',') if tag.strip()]
+    card['type'] = list(types or [])
+    return card
+
+
+def group_events_by_month(events):
+    """Group approved events by (year, month), sorted by date within each month."""
+    grouped = {}
+    for event in events:
+        if event.get('status', 'approved') != 'approved':
+            continue
+        try:
+            date = parse_date(event['date'])
+        except (KeyError, TypeError, ValueError):
+            print(f"⚠️  Skipping {event.get('id', 'event')}: invalid date {event.get('date')!r}")
+            continue
+        grouped.setdefault((date.year, date.month), []).append((date, card_event(event)))
+    return {key: [event for _, event in sorted(items, key=lambda item: item[0])]
+            for key, items in sorted(grouped.items())}
+
+
+def resolved_fonts():
+    """Return the file and bytes digest of each style's loaded font (None for PIL's default).
+
+    The same FONT_PATHS resolve to different files on different machines.
+    """
+    return {style: render_support.font_fingerprint(load_font(style, 16)) for style in FONT_PATHS}
+
+
+def month_key(year, month, events):
+    """Return the content hash of a month's card: its events, render parameters and fonts."""
+    payload = json.dumps({'month': [year, month], 'events': events, 'params': RENDER_PARAMS,
+                          'fonts': resolved_fonts()}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_render_cache(cards_dir):
+    """Load the sidecar manifest of rendered cards, or an empty one."""
+    try:
+        with open(Path(cards_dir) / RENDER_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != RENDER_CACHE_VERSION:
+        return {}
+    return cache.get('cards', {})
+
+
+def save_render_cache(cards_dir, cards):
+    """Atomically write the sidecar manifest of rendered cards."""
+    cache_file = Path(cards_dir) / RENDER_CACHE_FILE
+    tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': RENDER_CACHE_VERSION, 'cards': cards}, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, cache_file)
+
+
+def render_cards(grouped, cards_dir, jobs=1, use_cache=True):
+    """Render the cards of changed months; return one summary per month, in order.
+
+    Months whose card exists with a matching content hash (see month_key())
+    are skipped and marked ``cached``.
+    """
+    cache = load_render_cache(cards_dir) if use_cache else {}
+    planned = []
+    for (year, month), events in grouped.items():
+        path = str(Path(cards_dir) / f"events-{year}-{month:02d}.png")
+        key = month_key(year, month, events)
+        record = cache.get(os.path.basename(path))
+        current = record is not None and record.get('key') == key and os.path.exists(path)
+        planned.append(((year, month, events, path), key, current))
+
+    stale = [job for job, _, current in planned if not current]
+    if jobs <= 1 or len(stale) <= 1:
+        rendered = [render_month(job) for job in stale]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(stale))) as pool:
+            rendered = list(pool.map(render_month, stale))
+    rendered = iter(rendered)
+
+    results = []
+    for (year, month, events, path), key, current in planned:
+        name = os.path.basename(path)
+        if current:
+            metrics.count('months_cached')
+            record = cache[name]
+            result = {'path': path, 'events': len(events), 'size': tuple(record['size']),
+                      'bytes': record['bytes'], 'cached': True}
+        else:
+            metrics.count('months_rendered')
+            result = dict(next(rendered), cached=False)
+            cache[name] = {'key': key, 'size': list(result['size']), 'bytes': result['bytes']}
+        results.append(dict(result, month=MONTH_NAMES[month], year=year))
+    if stale:
+        save_render_cache(cards_dir, cache)
+    return results
+
+
+def load_events(events_dir=None, backend_name=None, sqlite_path=None):
+    """Load events from the JSON files, or from the events table with a backend."""
+    if backend_name is not None:
+        from events_backend import get_backend
+        return get_backend(backend_name or None, sqlite_path=sqlite_path).fetch_all()
+    return list(iter_events(Path(events_dir), quiet=True))
+
+
+def main():
+    """Render the monthly event cards."""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    metrics.start('event_cards', project_root)
+
+    events_dir = Path(get_option(sys.argv, ('--events-dir',), project_root / "data" / "events"))
+    cards_dir = Path(get_option(sys.argv, ('--output-dir', '-o'), project_root / "data" / "cards"))
+    jobs = get_int_option(sys.argv, ('--jobs', '-j'), os.cpu_count() or 1, minimum=1)
+    use_cache = '--force' not in sys.argv and '-f' not in sys.argv
+    only_month = get_option(sys.argv, ('--month',))
+    from_db = '--from-db' in sys.argv
+
+    print("🎨 Generating event cards...")
+    try:
+        with metrics.stage('load'):
+            if from_db:
+                events = load_events(backend_name=get_option(sys.argv, ('--backend',), ''),
+                                     sqlite_path=get_option(sys.argv, ('--sqlite-path',)))
+            else:
+                events = load_events(events_dir)
+    except Exception as e:
+        print(f"❌ Error loading events: {e}")
+        sys.exit(1)
+    print(f"📁 Loaded {len(events)} events from {'the events table' if from_db else events_dir}")
+
+    grouped = group_events_by_month(events)
+    if only_month:
+        grouped = {key: value for key, value in grouped.items() if f"{key[0]}-{key[1]:02d}" == only_month}
+    if not grouped:
+        print("⚠️  No approved events found to generate cards")
+        return
+
+    cards_dir.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    with metrics.stage('render'):
+        results = render_cards(grouped, cards_dir, jobs, use_cache)
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        icon = "♻️ " if result['cached'] else "✅"
+        print(f"  {icon} {os.path.basename(result['path'])}: {result['month']} {result['year']}, "
+              f"{result['events']} events, {result['size'][0]}x{result['size'][1]}")
+    cached = sum(1 for result in results if result['cached'])
+    print(f"\n🎉 Generated {len(results) - cached} cards, {cached} unchanged, in {elapsed:.2f}s → {cards_dir}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python event_cards.py [OPTIONS]")
+        print("")
+        print("Options:")
+        print("  --events-dir DIR      Events directory (default: data/events)")
+        print("  --from-db             Load approved events from the events table instead")
+        print("  --backend NAME        Backend for --from-db: supabase, http or sqlite (default: EVENTS_BACKEND)")
+        print("  --sqlite-path PATH    SQLite file for --backend sqlite")
+        print("  --output-dir, -o DIR  Where to save cards (default: data/cards)")
+        print("  --month YYYY-MM       Only render this month")
+        print("  --jobs, -j N          Render months with N processes (default: CPU count)")
+        print("  --force, -f           Re-render cards even if their events are unchanged")
+        print("  --help, -h            Show this help message")
+    else:
+        main()
@@ -0,0 +1,182 @@
+"""
+Datetime normalization shared by the event data scripts.
+
+Supabase exports timestamps in UTC ("2025-08-02 21:00:00+00") while the JSON
+event files store Pacific local times ("2025-08-02T14:00:00"). The helpers
+here parse both shapes with one precompiled pattern and convert between them
+with the real America/Los_Angeles rules, so dates compare correctly on both
+sides of a daylight saving change. Timestamps written to the table always
+carry their offset (UTC), so every backend reads back the same instant.
+Parsing is memoized with a bounded LRU cache because the same timestamps
+repeat across every row of an export.
+"""
+
+import calendar
+import re
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = KeyError  # Its base class; never raised here
+
+# Timezone the JSON event files are written in
+EVENT_TIMEZONE_NAME = 'America/Los_Angeles'
+
+try:
+    EVENT_TIMEZONE = ZoneInfo(EVENT_TIMEZONE_NAME)
+except (TypeError, ZoneInfoNotFoundError):
+    # No tz database available: fall back to Pacific Daylight Time
+    print(f"⚠️  Timezone data for {EVENT_TIMEZONE_NAME} not found, using a fixed UTC-7 offset")
+    EVENT_TIMEZONE = timezone(timedelta(hours=-7), 'PDT')
+
+# Distinct timestamps kept per memoized function
+CACHE_SIZE = 8192
+
+# 2025-08-02, 2025-08-02T21:00, 2025-08-02 21:00:00.123+00, ...Z, ...+00:00
+DATETIME_PATTERN = re.compile(
+    r'^(?P<date>\d{4}-\d{2}-\d{2})'
+    r'(?:[T ](?P<time>\d{2}:\d{2}(?::\d{2})?)(?:\.\d+)?)?'
+    r'(?P<tz>Z|[+-]\d{2}(?::?\d{2})?)?$'
+)
+MONTH_PATTERN = re.compile(r'^(\d{4})-(\d{2})$')
+
+
+def _strip_legacy(dt_str):
+    """Strip timezone and fraction the way the scripts always have.
+
+    Only used for strings the pattern does not recognize.
+    """
+    dt_str = dt_str.replace(" ", "T").replace("+00", "").replace("Z", "")
+    if "." in dt_str:
+        dt_str = dt_str.split(".")[0]
+    return dt_str
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def split_datetime(dt_str):
+    """Split a timestamp into its local ISO text and UTC offset.
+
+    Returns ``(local, offset)`` where ``local`` is ``YYYY-MM-DD[THH:MM[:SS]]``
+    without fraction or zone and ``offset`` is a ``timezone`` or None when
+    the string carries no zone. Unrecognized strings are returned stripped,
+    with no offset.
+    """
+    match = DATETIME_PATTERN.match(dt_str.strip())
+    if not match:
+        return _strip_legacy(dt_str), None
+
+    local = match.group('date')
+    if match.group('time'):
+        local += 'T' + match.group('time')
+
+    tz = match.group('tz')
+    if tz is None:
+        return local, None
+    if tz == 'Z':
+        return local, timezone.utc
+
+    sign = -1 if tz[0] == '-' else 1
+    digits = tz[1:].replace(':', '')
+    minutes = int(digits[:2]) * 60 + (int(digits[2:]) if len(digits) > 2 else 0)
+    return local, timezone(sign * timedelta(minutes=minutes))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_datetime(dt_str):
+    """Parse a timestamp into a datetime, or None if it is empty or invalid.
+
+    Strings with a zone return an aware datetime; others return naive ones.
+    """
+    if not dt_str:
+        return None
+    local, offset = split_datetime(dt_str)
+    try:
+        dt = datetime.fromisoformat(local)
+    except ValueError:
+        return None
+    return dt.replace(tzinfo=offset) if offset else dt
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_datetime(dt_str, adjust_timezone=False):
+    """Normalize datetime strings for comparison.
+
+    Args:
+        dt_str: datetime string (or datetime, e.g. from an ``Event``)
+        adjust_timezone: if True, convert the value (a DB timestamp) to
+            Pacific local time, honoring daylight saving. Its own offset is
+            used; values without one are UTC, as the database stores them
+    """
+    if not dt_str:
+        return ""
+
+    if isinstance(dt_str, datetime):
+        if adjust_timezone:
+            aware = dt_str if dt_str.tzinfo else dt_str.replace(tzinfo=timezone.utc)
+            dt_str = aware.astimezone(EVENT_TIMEZONE)
+        return dt_str.replace(tzinfo=None).isoformat()
+
+    local, offset = split_datetime(dt_str)
+    if not adjust_timezone or not local:
+        return local
+
+    try:
+        dt = datetime.fromisoformat(local).replace(tzinfo=offset or timezone.utc)
+    except ValueError:
+        return local  # If parsing fails, return original
+    return dt.astimezone(EVENT_TIMEZONE).replace(tzinfo=None).isoformat()
+
+
+def to_utc(dt):
+    """Return an aware datetime in UTC; naive values are Pacific local time."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=EVENT_TIMEZONE)
+    return dt.astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def to_db_datetime(dt_str):
+    """Return a timestamp as UTC ISO text (with its offset) for insertion, or None.
+
+    Values without a zone are taken as Pacific local time, like the JSON
+    event files.
+    """
+    if not dt_str:
+        return None
+    if isinstance(dt_str, datetime):
+        return to_utc(dt_str).isoformat()
+    local, offset = split_datetime(dt_str)
+    try:
+        dt = datetime.fromisoformat(local)
+    except ValueError:
+        return None
+    return to_utc(dt.replace(tzinfo=offset) if offset else dt).isoformat()
+
+
+def event_month(event):
+    """Return the ``YYYY-MM`` month of an event, or None without a date."""
+    date = event.get('date') or ''
+    return date[:7] if len(date) >= 7 and date[4] == '-' else None
+
+
+def date_bound(value, end=False):
+    """Return a ``YYYY-MM-DD`` or ``YYYY-MM`` range bound as ``YYYY-MM-DD``.
+
+    A month stands for its first day, or its last one when ``end`` is set.
+    Raises ValueError for anything else.
+    """
+    if value is None:
+        return None
+    month = MONTH_PATTERN.match(value)
+    if month:
+        year, month = int(month.group(1)), int(month.group(2))
+        if not 1 <= month <= 12:
+            raise ValueError(f"Invalid month: {value}")
+        day = calendar.monthrange(year, month)[1] if end else 1
+        return date(year, month, day).isoformat()
+    if len(value) != 10:
+        raise ValueError(f"Expected YYYY-MM-DD or YYYY-MM, got {value}")
+    return date.fromisoformat(value).isoformat()
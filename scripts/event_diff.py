@@ -0,0 +1,303 @@
+"""
+Diff engine for comparing Supabase event exports with the JSON event files.
+
+Each row is normalized once into a compact tuple of per-field values and a
+digest of that tuple is computed up front. Matching rows are then skipped by
+comparing digests; only rows whose digests differ are compared field by field.
+"""
+
+import csv
+import hashlib
+import json
+from functools import partial
+
+import metrics
+from csv_merge import DEFAULT_CHUNK_SIZE, merge_join, sort_csv_by_key
+from event_dates import normalize_datetime
+from event_model import parse_array, parse_boolean
+
+
+def normalize_boolean(bool_str):
+    """Normalize boolean strings."""
+    if isinstance(bool_str, bool) or str(bool_str).lower() in ['true', '1', 'yes', 'false', '0', 'no', '']:
+        return str(parse_boolean(bool_str)).lower()
+    return str(bool_str).lower()
+
+
+def normalize_text(value):
+    """Normalize text fields, treating missing values as empty strings."""
+    return '' if value is None else str(value)
+
+
+def normalize_array(array_str):
+    """Normalize array strings (or lists) into a sorted tuple for comparison."""
+    return tuple(sorted(parse_array(array_str)))
+
+
+# (field, db normalizer, json normalizer, DB value is timezone adjusted)
+COMPARISON_FIELDS = (
+    ('name', normalize_text, normalize_text, False),
+    ('date', partial(normalize_datetime, adjust_timezone=True), normalize_datetime, True),
+    ('end_date', partial(normalize_datetime, adjust_timezone=True), normalize_datetime, True),
+    ('location', normalize_text, normalize_text, False),
+    ('maps_link', normalize_text, normalize_text, False),
+    ('type', normalize_array, normalize_array, False),
+    ('music', normalize_text, normalize_text, False),
+    ('price', normalize_text, normalize_text, False),
+    ('description', normalize_text, normalize_text, False),
+    ('contact', normalize_text, normalize_text, False),
+    ('featured', normalize_boolean, normalize_boolean, False),
+    ('status', normalize_text, normalize_text, False),
+    ('event_url', normalize_text, normalize_text, False),
+    ('event_url_text', normalize_text, normalize_text, False),
+)
+
+# Timestamp fields are only compared in verbose mode
+VERBOSE_FIELDS = (
+    ('created_at', normalize_datetime, normalize_datetime, False),
+    ('updated_at', normalize_datetime, normalize_datetime, False),
+)
+
+
+def get_comparison_fields(verbose=False):
+    """Return the field specs to compare, including timestamps if verbose."""
+    return COMPARISON_FIELDS + VERBOSE_FIELDS if verbose else COMPARISON_FIELDS
+
+
+def normalize_row(row, normalizers):
+    """Normalize a row into a tuple of field values, one per spec."""
+    return tuple(normalize(row.get(field, '')) for field, normalize in normalizers)
+
+
+def row_digest(values):
+    """Return a compact, stable digest of a normalized row."""
+    return hashlib.blake2b(repr(values).encode('utf-8'), digest_size=16).digest()
+
+
+def get_normalizers(side, fields):
+    """Return ``(field, normalizer)`` pairs for the DB or JSON side."""
+    column = 1 if side == 'db' else 2
+    return [(spec[0], spec[column]) for spec in fields]
+
+
+def index_rows(rows, side, fields):
+    """Normalize every row once and index it by event id.
+
+    ``side`` selects the DB (``'db'``) or JSON (``'json'``) normalizers.
+    Returns ``{id: (digest, values, name)}``.
+    """
+    normalizers = get_normalizers(side, fields)
+
+    index = {}
+    for row in rows:
+        values = normalize_row(row, normalizers)
+        index[row['id']] = (row_digest(values), values, row.get('name', 'No name'))
+    metrics.count('rows_normalized', len(index))
+    return index
+
+
+def report_value(value):
+    """Convert a normalized value back to a plain JSON-friendly value."""
+    return list(value) if isinstance(value, tuple) else value
+
+
+def diff_values(db_values, json_values, fields):
+    """List the field-level differences between two normalized rows."""
+    diffs = []
+    for spec, db_value, json_value in zip(fields, db_values, json_values):
+        if db_value != json_value:
+            diffs.append({
+                'field': spec[0],
+                'db_value': report_value(db_value),
+                'json_value': report_value(json_value),
+                'is_date': spec[3]
+            })
+    return diffs
+
+
+def diff_indexes(db_index, json_index, fields):
+    """Hash-join two row indexes into db-only, json-only and differs buckets."""
+    db_only = [{'id': event_id, 'name': db_index[event_id][2]}
+               for event_id in sorted(db_index.keys() - json_index.keys())]
+    json_only = [{'id': event_id, 'name': json_index[event_id][2]}
+                 for event_id in sorted(json_index.keys() - db_index.keys())]
+    common_ids = sorted(db_index.keys() & json_index.keys())
+
+    differences = []
+    for event_id in common_ids:
+        db_digest, db_values, _ = db_index[event_id]
+        json_digest, json_values, json_name = json_index[event_id]
+        if db_digest == json_digest:
+            continue
+        diffs = diff_values(db_values, json_values, fields)
+        if diffs:
+            differences.append({'id': event_id, 'name': json_name, 'diffs': diffs})
+    metrics.count('rows_compared', len(common_ids))
+
+    return {
+        'summary': {
+            'total_db': len(db_index),
+            'total_json': len(json_index),
+            'common': len(common_ids),
+            'db_only': len(db_only),
+            'json_only': len(json_only),
+            'differences': len(differences)
+        },
+        'db_only': db_only,
+        'json_only': json_only,
+        'differences': differences
+    }
+
+
+def diff_events(db_events, json_events, verbose=False):
+    """Compare DB export rows with JSON-to-CSV rows.
+
+    Returns a result dictionary with a ``summary`` of counts and the
+    ``db_only``, ``json_only`` and ``differences`` buckets.
+    """
+    fields = get_comparison_fields(verbose)
+    db_index = index_rows(db_events, 'db', fields)
+    json_index = index_rows(json_events, 'json', fields)
+    return diff_indexes(db_index, json_index, fields)
+
+
+def diff_sorted(db_rows, json_rows, verbose=False):
+    """Compare two row streams that are already sorted by id.
+
+    Performs a single merge pass, normalizing each pair of rows as it goes,
+    and returns the same result structure as ``diff_events``. Only the
+    buckets are kept in memory, never the full exports.
+    """
+    fields = get_comparison_fields(verbose)
+    db_normalizers = get_normalizers('db', fields)
+    json_normalizers = get_normalizers('json', fields)
+
+    db_only = []
+    json_only = []
+    differences = []
+    total_db = total_json = common = 0
+
+    for event_id, db_row, json_row in merge_join(db_rows, json_rows):
+        if json_row is None:
+            total_db += 1
+            db_only.append({'id': event_id, 'name': db_row.get('name', 'No name')})
+            continue
+        total_json += 1
+        if db_row is None:
+            json_only.append({'id': event_id, 'name': json_row.get('name', 'No name')})
+            continue
+        total_db += 1
+        common += 1
+
+        db_values = normalize_row(db_row, db_normalizers)
+        json_values = normalize_row(json_row, json_normalizers)
+        if db_values == json_values:
+            continue
+        diffs = diff_values(db_values, json_values, fields)
+        if diffs:
+            differences.append({'id': event_id, 'name': json_row.get('name', 'No name'), 'diffs': diffs})
+    metrics.count('rows_normalized', 2 * common)
+    metrics.count('rows_compared', common)
+
+    return {
+        'summary': {
+            'total_db': total_db,
+            'total_json': total_json,
+            'common': common,
+            'db_only': len(db_only),
+            'json_only': len(json_only),
+            'differences': len(differences)
+        },
+        'db_only': db_only,
+        'json_only': json_only,
+        'differences': differences
+    }
+
+
+def diff_csv_files(db_csv, json_csv, verbose=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compare two CSV exports in bounded memory via external sort and merge."""
+    return diff_sorted(
+        sort_csv_by_key(db_csv, 'id', chunk_size),
+        sort_csv_by_key(json_csv, 'id', chunk_size),
+        verbose
+    )
+
+
+def print_results(result, verbose=False):
+    """Print the comparison buckets and summary to the console."""
+    summary = result['summary']
+
+    # Events only in DB
+    if result['db_only']:
+        print(f"\n❌ Events in DB but NOT in JSON files: {summary['db_only']}")
+        for event in result['db_only']:
+            print(f"   - {event['id']}: {event['name']}")
+
+    # Events only in JSON
+    if result['json_only']:
+        print(f"\n❌ Events in JSON files but NOT in DB: {summary['json_only']}")
+        for event in result['json_only']:
+            print(f"   - {event['id']}: {event['name']}")
+
+    print(f"\n✅ Events in BOTH sources: {summary['common']}")
+
+    # Report differences
+    if result['differences']:
+        print(f"\n⚠️  Events with DIFFERENCES: {summary['differences']}")
+        for event in result['differences']:
+            print(f"\n   📅 {event['id']}: {event['name']}")
+            for diff in event['diffs']:
+                field_note = " (DB converted from UTC to Pacific Time)" if diff.get('is_date') else ""
+                print(f"      • {diff['field']}{field_note}:")
+                print(f"        DB:   {repr(diff['db_value'])}")
+                print(f"        JSON: {repr(diff['json_value'])}")
+    else:
+        print(f"\n✅ All {summary['common']} common events match perfectly!")
+
+    # Summary
+    print(f"\n" + "="*80)
+    print("SUMMARY")
+    print("="*80)
+    print(f"Total events in DB export:     {summary['total_db']}")
+    print(f"Total events in JSON files:    {summary['total_json']}")
+    print(f"Events in both sources:        {summary['common']}")
+    print(f"Events only in DB:             {summary['db_only']}")
+    print(f"Events only in JSON:           {summary['json_only']}")
+    print(f"Events with differences:       {summary['differences']}")
+
+    if not verbose:
+        print(f"\n💡 Note: created_at and updated_at are only compared in verbose mode")
+
+
+def format_report_value(value):
+    """Format a report value for a CSV cell."""
+    if isinstance(value, list):
+        return json.dumps(value)
+    return value
+
+
+def write_report(result, json_path, csv_path, metadata=None):
+    """Write the diff result as a JSON document and a flat CSV.
+
+    The CSV has one line per event-only entry and one line per differing
+    field, with columns ``id, name, status, field, db_value, json_value``.
+    """
+    report = dict(metadata or {})
+    report.update(result)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'name', 'status', 'field', 'db_value', 'json_value'])
+        for event in result['db_only']:
+            writer.writerow([event['id'], event['name'], 'db_only', '', '', ''])
+        for event in result['json_only']:
+            writer.writerow([event['id'], event['name'], 'json_only', '', '', ''])
+        for event in result['differences']:
+            for diff in event['diffs']:
+                writer.writerow([
+                    event['id'], event['name'], 'differs', diff['field'],
+                    format_report_value(diff['db_value']),
+                    format_report_value(diff['json_value'])
+                ])
@@ -0,0 +1,173 @@
+"""
+Typed event record shared by the event data scripts.
+
+An ``Event`` is a slots-based record holding each field once in its native
+type: dates as datetimes, ``type`` as a tuple of tags and ``featured`` as a
+bool. Codecs convert from the JSON event files, from CSV rows (Supabase
+exports and json_to_csv.py output) and to rows for the database, so the
+scripts stop re-deriving types from strings in their own ways.
+
+Events also support ``event['field']`` and ``event.get(field, default)`` so
+they can be passed to code written against plain dictionaries.
+"""
+
+from datetime import datetime, timezone
+
+import json_codec
+from event_dates import parse_datetime, to_db_datetime
+
+# Text fields, in the order used by the database and CSV files
+TEXT_FIELDS = (
+    'name', 'location', 'maps_link', 'music', 'price', 'description',
+    'contact', 'status', 'event_url', 'event_url_text'
+)
+DATE_FIELDS = ('date', 'end_date', 'created_at', 'updated_at')
+FLAG_FIELDS = ('featured', 'recurring')
+FIELDS = ('id',) + TEXT_FIELDS + DATE_FIELDS + ('type',) + FLAG_FIELDS
+
+
+def parse_boolean(bool_str):
+    """Parse boolean string."""
+    if isinstance(bool_str, bool):
+        return bool_str
+    return str(bool_str).lower() in ['true', '1', 'yes']
+
+
+def parse_array(array_str):
+    """Parse array string (lists from JSON files are returned as is)."""
+    if isinstance(array_str, (list, tuple)):
+        return list(array_str)
+    if not array_str:
+        return []
+
+    if array_str.startswith('[') and array_str.endswith(']'):
+        try:
+            return json_codec.loads(array_str)
+        except:
+            pass
+
+    if ';' in array_str:
+        return [item.strip() for item in array_str.split(';') if item.strip()]
+
+    return [array_str.strip()] if array_str.strip() else []
+
+
+def _parse_date(value):
+    """Parse a date field that may already be a datetime."""
+    if isinstance(value, datetime) or value is None:
+        return value
+    return parse_datetime(value)
+
+
+class Event:
+    """A single event with typed fields."""
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, id, name='', date=None, end_date=None, location='',
+                 maps_link='', type=(), music='', price='', description='',
+                 contact='', featured=False, recurring=False, status='',
+                 created_at=None, updated_at=None, event_url='',
+                 event_url_text='', extra=None):
+        self.id = id
+        self.name = name
+        self.date = date
+        self.end_date = end_date
+        self.location = location
+        self.maps_link = maps_link
+        self.type = type
+        self.music = music
+        self.price = price
+        self.description = description
+        self.contact = contact
+        self.featured = featured
+        self.recurring = recurring
+        self.status = status
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.event_url = event_url
+        self.event_url_text = event_url_text
+        self.extra = extra or None  # Unknown fields, kept for round trips
+
+    @classmethod
+    def _from_mapping(cls, data, parse_flag, parse_tags):
+        values = {field: data[field] for field in TEXT_FIELDS if field in data}
+        for field in DATE_FIELDS:
+            values[field] = _parse_date(data.get(field) or None)
+        values['type'] = tuple(parse_tags(data.get('type')))
+        for field in FLAG_FIELDS:
+            values[field] = parse_flag(data.get(field, False))
+        extra = {key: value for key, value in data.items() if key not in FIELDS}
+        return cls(data['id'], extra=extra, **values)
+
+    @classmethod
+    def from_json(cls, data):
+        """Build an event from a parsed event JSON file (or DB row)."""
+        return cls._from_mapping(data, bool, parse_array)
+
+    @classmethod
+    def from_csv(cls, row):
+        """Build an event from a CSV row, where every value is a string."""
+        return cls._from_mapping(row, parse_boolean, parse_array)
+
+    def to_db(self, status='pending'):
+        """Return a row for the events table.
+
+        The status defaults to 'pending' so inserted events are reviewed
+        manually; missing values are left out so DB defaults apply.
+        """
+        row = {
+            'id': self.id,
+            'name': self.name,
+            'date': to_db_datetime(self.date),
+            'end_date': to_db_datetime(self.end_date),
+            'location': self.location,
+            'maps_link': self.maps_link,
+            'type': list(self.type),
+            'music': self.music,
+            'price': self.price,
+            'description': self.description,
+            'contact': self.contact,
+            'featured': self.featured,
+            'status': status,
+            'created_at': to_db_datetime(self.created_at) or datetime.now(timezone.utc).isoformat(),
+            'event_url': self.event_url,
+            'event_url_text': self.event_url_text
+        }
+        return {k: v for k, v in row.items() if v is not None}
+
+    def to_json(self):
+        """Return the event as a JSON-serializable dictionary."""
+        data = {}
+        for field in FIELDS:
+            value = getattr(self, field)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, tuple):
+                value = list(value)
+            if value is not None:
+                data[field] = value
+        data.update(self.extra or {})
+        return data
+
+    def get(self, field, default=None):
+        """Return a field value, like ``dict.get``; unset (None) fields give ``default``."""
+        if field in FIELDS:
+            value = getattr(self, field)
+            return default if value is None else value
+        return self.extra.get(field, default) if self.extra else default
+
+    def __getitem__(self, field):
+        if field in FIELDS:
+            return getattr(self, field)
+        if not self.extra:
+            raise KeyError(field)
+        return self.extra[field]
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        return f"Event({self.id!r}, {self.name!r}, date={self.date!r})"
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Date-range and tag queries over the event archive.
+
+``EventQuery`` indexes the events in data/events once:
+
+- an interval tree on (``date``, ``end_date``) for "what's on between A
+  and B" queries, stored as a start-sorted array with a max-end value per
+  implicit tree node, so a query only visits overlapping branches
+- inverted indexes from ``type``, ``music`` and ``featured`` to event
+  positions, so tag filters are set intersections instead of scans
+- recurring series (see recurrence.py), kept as templates and expanded only
+  inside the queried window
+
+The built index is saved as a pickle snapshot of plain data (lists, dicts
+and sets, no classes, so it loads the same whether written by the command
+line or by an importing script) together with a signature of the source
+files (index.json plus each file's name, mtime and size). Later runs load
+the snapshot when the signature still matches and rebuild it otherwise.
+
+Usage:
+    python3 scripts/event_query.py --from 2025-12-01 --to 2025-12-31 --type timba
+    python3 scripts/event_query.py --month 2026-01 --featured
+"""
+
+import os
+import pickle
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from cli_options import get_option
+from json_to_csv import iter_events, source_signature
+from recurrence import event_bounds, event_rule, iter_occurrences, parse_window_date, series_span
+
+# Bump when the index layout changes so old snapshots are rebuilt
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FILE = "events_query.pickle"
+
+EPOCH = datetime(1970, 1, 1)
+# End key for series without COUNT or UNTIL
+OPEN_END = 2 ** 62
+
+
+def to_minutes(dt):
+    """Return a naive datetime as whole minutes since the epoch."""
+    return (dt - EPOCH) // timedelta(minutes=1)
+
+
+def tag_key(value):
+    """Normalize a tag value for the inverted indexes."""
+    return str(value).strip().lower()
+
+
+class IntervalTree:
+    """Static interval tree over ``(start, end, value)`` with integer bounds.
+
+    Intervals are sorted by start and viewed as an implicit balanced binary
+    tree (the middle of each range is its root); ``max_end[i]`` holds the
+    largest end in the subtree rooted at ``i``.
+    """
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self.starts = [start for start, _, _ in intervals]
+        self.ends = [end for _, end, _ in intervals]
+        self.values = [value for _, _, value in intervals]
+        self.max_end = list(self.ends)
+        self._build(0, len(intervals))
+
+    @classmethod
+    def from_arrays(cls, starts, ends, values, max_end):
+        """Rebuild a tree from its arrays (see ``arrays``) without sorting."""
+        tree = cls.__new__(cls)
+        tree.starts, tree.ends, tree.values, tree.max_end = starts, ends, values, max_end
+        return tree
+
+    def arrays(self):
+        """Return the tree's arrays as plain lists."""
+        return self.starts, self.ends, self.values, self.max_end
+
+    def _build(self, low, high):
+        if low >= high:
+            return -1
+        mid = (low + high) // 2
+        left = self._build(low, mid)
+        right = self._build(mid + 1, high)
+        for child in (left, right):
+            if child >= 0 and self.max_end[child] > self.max_end[mid]:
+                self.max_end[mid] = self.max_end[child]
+        return mid  # This subtree's root, for the parent's max
+
+    def overlapping(self, start, end):
+        """Return the values of intervals overlapping ``[start, end]``, by start."""
+        found = []
+        self._collect(0, len(self.starts), start, end, found)
+        return found
+
+    def _collect(self, low, high, start, end, found):
+        if low >= high:
+            return
+        mid = (low + high) // 2
+        if self.max_end[mid] < start:
+            return  # Nothing in this subtree ends late enough
+        self._collect(low, mid, start, end, found)
+        if self.starts[mid] > end:
+            return  # This node and its right subtree start too late
+        if self.ends[mid] >= start:
+            found.append(self.values[mid])
+        self._collect(mid + 1, high, start, end, found)
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class EventQuery:
+    """In-memory query index over the event archive."""
+
+    def __init__(self, events, signature=None):
+        self.signature = signature
+        self.events = []
+        self.series = []
+        intervals = []
+        self.tags = {'type': {}, 'music': {}, 'featured': {}}
+
+        for event in events:
+            try:
+                rule = event_rule(event)
+            except ValueError as e:
+                print(f"⚠️  Invalid recurrence for {event.get('id', '?')}, indexed as a single event: {e}")
+                rule = None
+            bounds = event_bounds(event)
+            if bounds is None:
+                continue
+
+            position = len(self.events)
+            self.events.append(event)
+            if rule is not None:
+                span_start, span_end = series_span(event, rule)
+                self.series.append(position)
+                end_key = to_minutes(span_end) if span_end else OPEN_END
+                intervals.append((to_minutes(span_start), end_key, position))
+            else:
+                intervals.append((to_minutes(bounds[0]), to_minutes(bounds[1]), position))
+
+            for dance_type in event.get('type') or []:
+                self.tags['type'].setdefault(tag_key(dance_type), set()).add(position)
+            if event.get('music'):
+                self.tags['music'].setdefault(tag_key(event['music']), set()).add(position)
+            self.tags['featured'].setdefault(bool(event.get('featured')), set()).add(position)
+
+        self.tree = IntervalTree(intervals)
+        self.series = set(self.series)
+
+    @classmethod
+    def build(cls, events_dir):
+        """Build the index from the event files."""
+        signature = source_signature(events_dir, f"v{SNAPSHOT_VERSION}")
+        return cls(iter_events(events_dir, quiet=True), signature)
+
+    @classmethod
+    def load(cls, events_dir, snapshot_path=None, rebuild=False):
+        """Load the snapshot if it matches the event files, else rebuild it.
+
+        Returns ``(query, status)`` with status ``'snapshot'`` or ``'built'``.
+        """
+        events_dir = Path(events_dir)
+        snapshot_path = Path(snapshot_path or events_dir.parent.parent / SNAPSHOT_FILE)
+        signature = source_signature(events_dir, f"v{SNAPSHOT_VERSION}")
+
+        if not rebuild and snapshot_path.exists():
+            try:
+                with open(snapshot_path, 'rb') as f:
+                    snapshot = pickle.load(f)
+                if isinstance(snapshot, dict) and snapshot.get('signature') == signature:
+                    return cls.from_snapshot(snapshot), 'snapshot'
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, KeyError) as e:
+                print(f"Ignoring unreadable snapshot {snapshot_path}: {e}")
+
+        query = cls(iter_events(events_dir, quiet=True), signature)
+        query.save(snapshot_path)
+        return query, 'built'
+
+    def snapshot(self):
+        """Return the index as plain data for pickling."""
+        return {
+            'version': SNAPSHOT_VERSION,
+            'signature': self.signature,
+            'events': self.events,
+            'series': self.series,
+            'tags': self.tags,
+            'tree': self.tree.arrays()
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Rebuild the index from ``snapshot()`` data without re-indexing."""
+        query = cls((), snapshot['signature'])
+        query.events = snapshot['events']
+        query.series = snapshot['series']
+        query.tags = snapshot['tags']
+        query.tree = IntervalTree.from_arrays(*snapshot['tree'])
+        return query
+
+    def save(self, snapshot_path):
+        """Atomically write the index snapshot."""
+        tmp_path = Path(str(snapshot_path) + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self.snapshot(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+
+    def _tag_filter(self, event_type=None, music=None, featured=None):
+        """Return the set of positions matching every given tag, or None."""
+        selected = None
+        for index, value in (('type', event_type), ('music', music), ('featured', featured)):
+            if value is None:
+                continue
+            key = value if index == 'featured' else tag_key(value)
+            positions = self.tags[index].get(key, set())
+            selected = positions if selected is None else selected & positions
+        return selected
+
+    def between(self, start, end, event_type=None, music=None, featured=None):
+        """Return events (and series occurrences) overlapping ``[start, end]``.
+
+        ``start``/``end`` are naive local datetimes; tag filters are optional.
+        Results are sorted by date.
+        """
+        selected = self._tag_filter(event_type, music, featured)
+        results = []
+        for position in self.tree.overlapping(to_minutes(start), to_minutes(end)):
+            if selected is not None and position not in selected:
+                continue
+            event = self.events[position]
+            if position in self.series:
+                results.extend(iter_occurrences(event, start, end))
+            else:
+                results.append(event)
+        results.sort(key=lambda event: (event['date'], event['id']))
+        return results
+
+    def month(self, year, month, **filters):
+        """Return the events overlapping one calendar month."""
+        start = datetime(year, month, 1)
+        end = datetime(year + month // 12, month % 12 + 1, 1) - timedelta(microseconds=1)
+        return self.between(start, end, **filters)
+
+    def with_tags(self, event_type=None, music=None, featured=None):
+        """Return the events matching the tags, in date order (no expansion)."""
+        selected = self._tag_filter(event_type, music, featured)
+        positions = range(len(self.events)) if selected is None else sorted(selected)
+        return sorted((self.events[i] for i in positions), key=lambda event: (event['date'], event['id']))
+
+    def __len__(self):
+        return len(self.events)
+
+
+def main():
+    """Query the event archive from the command line."""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    events_dir = project_root / "data" / "events"
+
+    rebuild = '--rebuild' in sys.argv
+    month = get_option(sys.argv, ('--month', '-m'))
+    event_type = get_option(sys.argv, ('--type', '-t'))
+    music = get_option(sys.argv, ('--music',))
+    featured = True if '--featured' in sys.argv else None
+    try:
+        if month:
+            year, month_number = (int(part) for part in month.split('-'))
+            start = datetime(year, month_number, 1)
+            end = datetime(year + month_number // 12, month_number % 12 + 1, 1) - timedelta(microseconds=1)
+        else:
+            start = parse_window_date(get_option(sys.argv, ('--from',), '1970-01-01'))
+            end = parse_window_date(get_option(sys.argv, ('--to',), (datetime.now() + timedelta(days=365)).date().isoformat()), end=True)
+    except ValueError as e:
+        print(f"❌ Invalid date: {e}")
+        return
+
+    load_start = time.perf_counter()
+    query, status = EventQuery.load(events_dir, rebuild=rebuild)
+    load_ms = (time.perf_counter() - load_start) * 1000
+    print(f"📚 {len(query)} events indexed ({len(query.series)} recurring), "
+          f"{'loaded from snapshot' if status == 'snapshot' else 'built from data/events'} in {load_ms:.1f}ms")
+
+    query_start = time.perf_counter()
+    results = query.between(start, end, event_type=event_type, music=music, featured=featured)
+    query_ms = (time.perf_counter() - query_start) * 1000
+
+    print(f"🔎 {start:%Y-%m-%d} → {end:%Y-%m-%d}: {len(results)} events in {query_ms:.3f}ms")
+    for event in results:
+        tags = ', '.join(event.get('type') or [])
+        star = " ⭐" if event.get('featured') else ""
+        print(f"  • {event['date'][:16]}  {event['id']}: {event.get('name', '')} [{tags}]{star}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python event_query.py [OPTIONS]")
+        print("")
+        print("Options:")
+        print("  --from YYYY-MM-DD   Start of the date range (default: everything)")
+        print("  --to YYYY-MM-DD     End of the date range (default: a year from now)")
+        print("  --month, -m YYYY-MM Query one calendar month")
+        print("  --type, -t TYPE     Only events of this dance type (e.g. timba)")
+        print("  --music VALUE       Only events with this music (e.g. DJ, Live)")
+        print("  --featured          Only featured events")
+        print(f"  --rebuild           Rebuild the {SNAPSHOT_FILE} snapshot")
+        print("  --help, -h          Show this help message")
+    else:
+        main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Month-sharded, compressed archive of the event files.
+
+Builds data/shards/ from data/events/: one gzip-compressed JSON Lines file
+per month (``events-YYYY-MM.jsonl.gz``, plus ``.jsonl.br`` when the brotli
+package is installed) and a small ``manifest.json`` listing each shard with
+its event count, date range and field names. Readers only open the shards
+whose date range overlaps the one they need and stream events line by line.
+
+Usage:
+    python3 scripts/event_shards.py              # build the shards
+    python3 scripts/event_shards.py --from 2025-10-01 --to 2025-11-30
+    python3 scripts/event_shards.py --from 2025-10 --to 2025-11
+"""
+
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import json_codec
+import metrics
+from cli_options import get_int_option, get_option
+from event_dates import date_bound, event_month
+from json_to_csv import iter_events, list_event_files, order_fields
+
+try:
+    import brotli
+except ImportError:  # Optional: only the gzip shards are written without it
+    brotli = None
+
+# Bump when the shard layout changes so readers can detect it
+SHARD_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+# Shard name for events without a parsable date
+UNDATED = "undated"
+
+
+def shard_name(month):
+    """Return the base file name (without compression suffix) of a shard."""
+    return f"events-{month}.jsonl"
+
+
+def event_range(event):
+    """Return the ``(start, end)`` dates (``YYYY-MM-DD``) an event covers."""
+    start = (event.get('date') or '')[:10]
+    end = (event.get('end_date') or '')[:10] or start
+    return start, max(start, end)
+
+
+def write_atomic(path, data):
+    """Write bytes to ``path`` through a temporary file."""
+    tmp_path = Path(str(path) + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_shards(events_dir, shard_dir, jobs=1):
+    """Write one compressed shard per month plus the manifest; return it."""
+    months = {}
+    for event in iter_events(events_dir, quiet=True, jobs=jobs):
+        month = event_month(event) or UNDATED
+        months.setdefault(month, []).append(event)
+
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    shards = []
+    for month in sorted(months):
+        events = sorted(months[month], key=lambda event: (event.get('date') or '', event.get('id', '')))
+        lines = "".join(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + "\n" for event in events)
+        raw = lines.encode('utf-8')
+
+        name = shard_name(month)
+        # mtime=0 keeps the output byte-identical for unchanged months
+        write_atomic(shard_dir / f"{name}.gz", gzip.compress(raw, compresslevel=9, mtime=0))
+        files = {'gzip': f"{name}.gz"}
+        if brotli is not None:
+            write_atomic(shard_dir / f"{name}.br", brotli.compress(raw, quality=11))
+            files['brotli'] = f"{name}.br"
+
+        ranges = [event_range(event) for event in events]
+        fields = set()
+        for event in events:
+            fields.update(event)
+        shards.append({
+            'month': month,
+            'files': files,
+            'count': len(events),
+            'start': min(start for start, _ in ranges) if month != UNDATED else None,
+            'end': max(end for _, end in ranges) if month != UNDATED else None,
+            'fields': order_fields(fields),
+            'bytes': len(raw),
+            'gzip_bytes': (shard_dir / files['gzip']).stat().st_size
+        })
+        print(f"  🗜️  {files['gzip']}: {len(events)} events, "
+              f"{len(raw)} → {shards[-1]['gzip_bytes']} bytes")
+
+    # Remove shards of months that no longer have events
+    current = {name for shard in shards for name in shard['files'].values()}
+    for stale in list(shard_dir.glob("events-*.jsonl.gz")) + list(shard_dir.glob("events-*.jsonl.br")):
+        if stale.name not in current:
+            stale.unlink()
+            print(f"  🗑️  Removed {stale.name}")
+
+    manifest = {
+        'version': SHARD_VERSION,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'count': sum(shard['count'] for shard in shards),
+        'shards': shards
+    }
+    write_atomic(shard_dir / MANIFEST_FILE, json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def load_manifest(shard_dir):
+    """Load the shard manifest, raising FileNotFoundError if not built."""
+    with open(Path(shard_dir) / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SHARD_VERSION:
+        raise ValueError(f"Unsupported shard manifest version {manifest.get('version')} in {shard_dir}")
+    return manifest
+
+
+def select_shards(manifest, start=None, end=None):
+    """Return the shards whose date range overlaps ``[start, end]``.
+
+    ``start`` and ``end`` are ``YYYY-MM-DD`` strings (or None for open
+    ends). Undated events are only included when no range is given.
+    """
+    if start is None and end is None:
+        return list(manifest['shards'])
+    return [
+        shard for shard in manifest['shards']
+        if shard['start'] is not None
+        and (end is None or shard['start'] <= end)
+        and (start is None or shard['end'] >= start)
+    ]
+
+
+def iter_shard_events(shard_dir, start=None, end=None, manifest=None):
+    """Yield events overlapping ``[start, end]``, streaming the shards.
+
+    Only the shards whose range overlaps are opened, and each is read one
+    line (one event) at a time.
+    """
+    manifest = manifest or load_manifest(shard_dir)
+    for shard in select_shards(manifest, start, end):
+        with gzip.open(Path(shard_dir) / shard['files']['gzip'], 'rb') as f:
+            for line in f:
+                event = json_codec.loads(line)
+                if start is None and end is None:
+                    yield event
+                    continue
+                event_start, event_end = event_range(event)
+                if (end is None or event_start <= end) and (start is None or event_end >= start):
+                    yield event
+
+
+def shard_fields(manifest, start=None, end=None):
+    """Return the ordered union of field names in the selected shards."""
+    fields = set()
+    for shard in select_shards(manifest, start, end):
+        fields.update(shard['fields'])
+    return order_fields(fields)
+
+
+def main():
+    """Build the shards, or list the events in a date range."""
+    jobs = get_int_option(sys.argv[1:], ('--jobs', '-j'), 1, minimum=1)
+    try:
+        # A month covers all of its days: --to 2025-11 ends on 2025-11-30
+        start = date_bound(get_option(sys.argv, ('--from',)))
+        end = date_bound(get_option(sys.argv, ('--to',)), end=True)
+    except ValueError as e:
+        print(f"❌ Invalid date: {e}")
+        return
+
+    # Get the script directory and navigate to the project root
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    events_dir = project_root / "data" / "events"
+    shard_dir = Path(get_option(sys.argv, ('--shard-dir',), project_root / "data" / "shards"))
+    metrics.start('event_shards', project_root)
+
+    if start or end:
+        try:
+            manifest = load_manifest(shard_dir)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ Cannot read shards: {e}")
+            print("   Build them first with: python3 scripts/event_shards.py")
+            return
+        shards = select_shards(manifest, start, end)
+        print(f"🔎 Events from {start or 'the beginning'} to {end or 'the end'} "
+              f"({len(shards)} of {len(manifest['shards'])} shards opened)")
+        with metrics.stage('query'):
+            for event in iter_shard_events(shard_dir, start, end, manifest):
+                print(f"  • {event.get('date', '')[:16]}  {event['id']}: {event.get('name', '')}")
+        return
+
+    print("🗜️  Building month shards...")
+    print(f"📁 Events: {events_dir} ({len(list_event_files(events_dir))} files)")
+    print(f"📁 Shards: {shard_dir}")
+    if brotli is None:
+        print("ℹ️  brotli not installed, writing gzip shards only (pip install brotli)")
+    with metrics.stage('build'):
+        manifest = build_shards(events_dir, shard_dir, jobs)
+    print(f"\n✅ {manifest['count']} events in {len(manifest['shards'])} shards")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python event_shards.py [OPTIONS]")
+        print("")
+        print("Options:")
+        print("  --from YYYY-MM[-DD] List events from this date or month (reads only overlapping shards)")
+        print("  --to YYYY-MM[-DD]   List events up to this date or the end of this month")
+        print("  --shard-dir DIR     Shard directory (default: data/shards)")
+        print("  --jobs, -j N        Read event files with N threads when building")
+        print("  --help, -h          Show this help message")
+    else:
+        main()
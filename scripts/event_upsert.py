@@ -0,0 +1,193 @@
+"""
+Upsert stage shared by insert-missing-events.py and sync-events.py.
+
+Transforms events into rows for the ``events`` table and upserts them in
+batches through an ``events_backend`` backend, with optional concurrency,
+retries with exponential backoff and per-event failure reporting.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import metrics
+from event_model import Event
+
+# Check for debug mode
+DEBUG = os.getenv('DEBUG', '').lower() in ['true', '1', 'yes', 'on']
+
+# Upsert tuning defaults (overridable from the command line)
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_RETRIES = 3
+RETRY_BASE_DELAY = 0.5  # seconds, doubled on every retry
+
+# Client errors that are worth retrying (timeout, rate limit)
+TRANSIENT_STATUSES = (408, 429)
+
+
+def transform_event_for_db(event):
+    """Transform JSON event data (a dict or ``Event``) for database insertion."""
+    if not isinstance(event, Event):
+        # CSV parsing also accepts the native values of a JSON event
+        event = Event.from_csv(event)
+
+    # Always set to pending for manual review
+    transformed = event.to_db(status='pending')
+
+    print(f"    🛠️  Transformed event {transformed}")
+    return transformed
+
+
+def make_chunks(rows, batch_size):
+    """Split rows into upsert batches with uniform keys.
+
+    PostgREST needs every object in a bulk request to have the same keys,
+    so missing fields are sent as null. Rows repeating an id keep only the
+    last occurrence, since one statement cannot upsert the same row twice.
+    """
+    unique_rows = list({row['id']: row for row in rows}.values())
+    chunks = []
+    for i in range(0, len(unique_rows), batch_size):
+        chunk = unique_rows[i:i + batch_size]
+        keys = set().union(*chunk)
+        chunks.append([{key: row.get(key) for key in keys} for row in chunk])
+    return chunks
+
+
+def is_row_rejection(error):
+    """Return True if the database rejected the data (a 4xx), not the request failing."""
+    status = getattr(error, 'status', None)
+    if isinstance(status, int):
+        return 400 <= status < 500 and status not in TRANSIENT_STATUSES
+    # supabase-py's APIError carries the PostgreSQL error code instead:
+    # class 22 is a data exception, class 23 an integrity constraint violation
+    code = getattr(error, 'code', None)
+    return isinstance(code, str) and code[:2] in ('22', '23')
+
+
+def upsert_rows(backend, rows, max_retries=DEFAULT_RETRIES):
+    """Upsert rows in one request, retrying with exponential backoff.
+
+    Returns the ids of the rows the database returned. Raises the last error
+    if every attempt fails; rejected rows are not retried.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            metrics.count('upsert_requests')
+            return {row.get('id') for row in backend.upsert(rows)}
+        except Exception as e:
+            if attempt == max_retries or is_row_rejection(e):
+                raise
+            metrics.count('retries')
+            delay = RETRY_BASE_DELAY * (2 ** attempt)
+            if DEBUG:
+                print(f"    🐛 DEBUG - Retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def upsert_chunk(backend, chunk, max_retries=DEFAULT_RETRIES):
+    """Upsert one chunk of rows and attribute any failures to single rows.
+
+    A chunk is sent as a single request. If the database rejects it (a
+    4xx), each row is sent once on its own so that one bad row doesn't hide
+    the others. Connection errors and 5xx responses fail the whole chunk
+    once retries run out. Returns ``(inserted_ids, failures)`` where
+    failures is a list of ``(id, error message)``.
+    """
+    try:
+        returned_ids = upsert_rows(backend, chunk, max_retries)
+    except Exception as e:
+        if len(chunk) == 1 or not is_row_rejection(e):
+            return [], [(row['id'], str(e)) for row in chunk]
+        if DEBUG:
+            print(f"    🐛 DEBUG - Chunk of {len(chunk)} rejected ({e}), sending row by row")
+        inserted, failures = [], []
+        for row in chunk:
+            row_inserted, row_failures = upsert_chunk(backend, [row], max_retries=0)
+            inserted.extend(row_inserted)
+            failures.extend(row_failures)
+        return inserted, failures
+
+    inserted = [row['id'] for row in chunk if row['id'] in returned_ids]
+    failures = [(row['id'], 'No data returned') for row in chunk if row['id'] not in returned_ids]
+    return inserted, failures
+
+
+def insert_events(backend, events, dry_run=False,
+                  batch_size=DEFAULT_BATCH_SIZE, workers=1,
+                  max_retries=DEFAULT_RETRIES):
+    """Upsert events into the events table backend in batches.
+
+    Events are sent ``batch_size`` rows per request; with ``workers > 1``
+    up to that many requests are in flight at once. Failed requests are
+    retried with exponential backoff and failures are reported per event.
+    """
+    if not events:
+        print("ℹ️  No events to insert")
+        return
+    
+    print(f"📝 {'DRY RUN: Would insert' if dry_run else 'Inserting'} {len(events)} events...")
+    
+    if DEBUG:
+        print("🐛 DEBUG mode enabled - detailed error information will be shown")
+    
+    rows = []
+    failures = []
+    with metrics.stage('transform'):
+        for i, event in enumerate(events, 1):
+            try:
+                # Transform event data
+                db_event = transform_event_for_db(event)
+            
+                print(f"  {i}/{len(events)}: {event['id']} - {event.get('name', 'No name')[:50]}...")
+            
+                if dry_run:
+                    if DEBUG:
+                        print(f"    🔍 Would insert: {json.dumps(db_event, indent=2, default=str)}")
+                    else:
+                        print(f"    🔍 Would insert event with status: pending")
+                rows.append(db_event)
+            except Exception as e:
+                failures.append((event['id'], str(e)))
+                print(f"    ❌ Error preparing event {event['id']}: {e}")
+                if DEBUG:
+                    import traceback
+                    print(f"    🐛 DEBUG - Full traceback:")
+                    print(f"    🐛 {traceback.format_exc()}")
+                    print(f"    🐛 DEBUG - Event data: {json.dumps(event.to_json() if isinstance(event, Event) else event, indent=2, default=str)}")
+    
+    metrics.count('rows_transformed', len(rows))
+    
+    if dry_run:
+        print(f"\n📈 Results:")
+        print(f"  ✅ Successfully would insert: {len(rows)}")
+        print(f"  ❌ Errors: {len(failures)}")
+        return
+    
+    chunks = make_chunks(rows, batch_size)
+    print(f"\n📦 Upserting {len(rows)} rows in {len(chunks)} batches of up to {batch_size} ({workers} concurrent)")
+    
+    success_count = 0
+    start = time.perf_counter()
+    with metrics.stage('upsert'), ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = {executor.submit(upsert_chunk, backend, chunk, max_retries): n
+                   for n, chunk in enumerate(chunks, 1)}
+        for future in as_completed(futures):
+            n = futures[future]
+            inserted, chunk_failures = future.result()
+            success_count += len(inserted)
+            failures.extend(chunk_failures)
+            status = "✅" if not chunk_failures else "⚠️ "
+            print(f"  {status} Batch {n}/{len(chunks)}: {len(inserted)} inserted, {len(chunk_failures)} failed")
+    elapsed = time.perf_counter() - start
+    metrics.count('rows_upserted', success_count)
+    metrics.count('upsert_failures', len(failures))
+    
+    print(f"\n📈 Results:")
+    print(f"  ✅ Successfully inserted: {success_count}")
+    print(f"  ❌ Errors: {len(failures)}")
+    for event_id, error in failures:
+        print(f"    ❌ {event_id}: {error}")
+    if elapsed > 0:
+        print(f"  ⏱️  {elapsed:.2f}s, {success_count / elapsed:.1f} rows/second")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+JSON parsing for the data scripts, with an optional fast path.
+
+``loads`` uses orjson when it is installed (``pip install orjson``) and the
+standard library otherwise; ``load_file`` reads a file as bytes and parses
+them directly, skipping the text-mode decode. Both parsers raise
+``json.JSONDecodeError`` (orjson's error is a subclass), so callers handle
+errors the same way whichever codec is active. Set ``JSON_CODEC=json`` to
+force the standard library.
+
+Usage:
+    python3 scripts/json_codec.py --bench              # time the codecs on data/events
+    python3 scripts/json_codec.py --bench --events-dir /tmp/synthetic/data/events
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from cli_options import get_int_option, get_option
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library parser is used without it
+    orjson = None
+
+CODEC = 'orjson' if orjson is not None and os.getenv('JSON_CODEC', '').lower() != 'json' else 'json'
+
+# ``loads(bytes | str)``: bound directly so the fast path has no wrapper call
+loads = orjson.loads if CODEC == 'orjson' else json.loads
+
+
+def load_file(path):
+    """Read a JSON file as bytes and parse it."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def _load_all(paths, read_mode, parse):
+    for path in paths:
+        with open(path, read_mode, **({'encoding': 'utf-8'} if read_mode == 'r' else {})) as f:
+            parse(f.read())
+
+
+def benchmark(paths, repeat=5):
+    """Time each available way of loading ``paths``; return ``{name: seconds}``.
+
+    "read + parse" methods open and parse every file; "parse only" methods
+    parse contents already in memory, isolating the parser from file I/O.
+    Methods are interleaved across ``repeat`` passes and the fastest pass of
+    each is kept, so drift in machine load affects them all alike.
+    """
+    contents = [Path(path).read_bytes() for path in paths]  # Also warms the OS cache
+    texts = [data.decode('utf-8') for data in contents]
+
+    methods = [
+        ('json.loads text file', lambda: _load_all(paths, 'r', json.loads)),
+        ('json.loads bytes file', lambda: _load_all(paths, 'rb', json.loads)),
+        ('json.loads str (parse)', lambda: [json.loads(text) for text in texts]),
+        ('json.loads bytes (parse)', lambda: [json.loads(data) for data in contents]),
+    ]
+    if orjson is not None:
+        methods[2:2] = [('orjson.loads bytes file', lambda: _load_all(paths, 'rb', orjson.loads))]
+        methods.append(('orjson.loads bytes (parse)', lambda: [orjson.loads(data) for data in contents]))
+
+    results = {}
+    for _ in range(repeat):
+        for name, run in methods:
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            results[name] = min(results.get(name, elapsed), elapsed)
+    return results
+
+
+def main():
+    """Run the codec microbenchmark on an events directory."""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    events_dir = Path(get_option(sys.argv, ('--events-dir',), project_root / "data" / "events"))
+    repeat = get_int_option(sys.argv, ('--repeat', '-r'), 5, minimum=1)
+
+    if '--bench' not in sys.argv:
+        print(f"JSON codec: {CODEC}" + ("" if orjson is not None else " (pip install orjson for the fast path)"))
+        return
+
+    paths = sorted(events_dir.glob("*.json"))
+    if not paths:
+        print(f"❌ No JSON files in {events_dir}")
+        return
+    total_bytes = sum(path.stat().st_size for path in paths)
+    print(f"⏱️  Loading {len(paths)} files ({total_bytes / 1024:.0f} KiB) from {events_dir}, best of {repeat}")
+    if orjson is None:
+        print("ℹ️  orjson not installed, only the standard library is timed (pip install orjson)")
+
+    results = benchmark(paths, repeat)
+    for name, seconds in results.items():
+        # Each group is compared with the stdlib text baseline of that group
+        baseline = results['json.loads str (parse)' if name.endswith('(parse)') else 'json.loads text file']
+        rate = len(paths) / seconds if seconds else 0
+        print(f"  {name:<28} {seconds * 1000:>9.2f}ms  {rate:>12,.0f} files/s  {baseline / seconds:>5.2f}x")
+    print(f"\n✅ Active codec: {CODEC}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python json_codec.py [OPTIONS]")
+        print("")
+        print("Options:")
+        print("  --bench             Time stdlib text/bytes and orjson loading, with and without file I/O")
+        print("  --events-dir DIR    Directory of JSON files to load (default: data/events)")
+        print("  --repeat, -r N      Passes per method, the fastest is kept (default: 5)")
+        print("  --help, -h          Show this help message")
+        print("")
+        print("Environment variables:")
+        print("  JSON_CODEC=json     Use the standard library even if orjson is installed")
+    else:
+        main()
@@ -5,50 +5,147 @@ Script to convert all event JSON files in data/events to CSV format.
 
 import json
 import csv
+import hashlib
 import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
 
+import json_codec
+import metrics
+from cli_options import get_int_option, get_option
+from event_dates import date_bound
+from recurrence import expand_events, parse_window_date
 
-def load_event_files(events_dir):
-    """Load all event JSON files from the events directory."""
-    events = []
-    
-    # Get list of event files from index.json
+# Bump when the cached row format changes so stale caches are rebuilt
+CACHE_VERSION = 1
+
+
+def list_event_files(events_dir):
+    """Return the event filenames listed in the index.json manifest."""
     index_file = events_dir / "index.json"
     if index_file.exists():
-        with open(index_file, 'r', encoding='utf-8') as f:
-            index_data = json.load(f)
-            event_files = index_data.get('files', [])
-    else:
-        # Fallback: get all JSON files except index.json
-        event_files = [f.name for f in events_dir.glob("*.json") if f.name != "index.json"]
-    
-    # Load each event file
-    for filename in event_files:
-        file_path = events_dir / filename
-        if file_path.exists():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    event_data = json.load(f)
-                    events.append(event_data)
-                    print(f"Loaded: {filename}")
-            except json.JSONDecodeError as e:
-                print(f"Error loading {filename}: {e}")
-            except Exception as e:
-                print(f"Unexpected error loading {filename}: {e}")
-        else:
-            print(f"File not found: {filename}")
-    
-    return events
+        return json_codec.load_file(index_file).get('files', [])
+
+    # Fallback: get all JSON files except index.json
+    return [f.name for f in events_dir.glob("*.json") if f.name != "index.json"]
+
+
+def source_signature(events_dir, prefix=''):
+    """Return a digest of index.json and each event file's name, mtime and size.
+
+    Cheap to recompute (one stat per file), so outputs built from the event
+    files can store it and tell when they are out of date.
+    """
+    digest = hashlib.sha256(prefix.encode())
+    index_file = events_dir / "index.json"
+    if index_file.exists():
+        digest.update(index_file.read_bytes())
+    for filename in list_event_files(events_dir):
+        try:
+            stat = (events_dir / filename).stat()
+        except FileNotFoundError:
+            continue
+        digest.update(f"{filename}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+def read_event_file(events_dir, filename):
+    """Read and parse one event file.
+
+    Returns ``(event, error)``; exactly one of them is None. The error is the
+    message the loader prints for that file.
+    """
+    file_path = events_dir / filename
+    if not file_path.exists():
+        metrics.count('file_errors')
+        return None, f"File not found: {filename}"
+    try:
+        event = json_codec.load_file(file_path)
+    except json.JSONDecodeError as e:
+        metrics.count('file_errors')
+        return None, f"Error loading {filename}: {e}"
+    except Exception as e:
+        metrics.count('file_errors')
+        return None, f"Unexpected error loading {filename}: {e}"
+    metrics.count('files_read')
+    return event, None
+
+
+def iter_ordered(func, items, jobs=1):
+    """Yield ``func(item)`` for each item, in input order.
+
+    With ``jobs > 1`` calls run on a thread pool. At most a few items per
+    worker are in flight ahead of the consumer, so ordering is preserved and
+    memory stays bounded.
+    """
+    if jobs <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    window = jobs * 4
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_event_results(events_dir, event_files, jobs=1):
+    """Yield ``(filename, event, error)`` for each file, in manifest order."""
+    def read(filename):
+        return (filename,) + read_event_file(events_dir, filename)
+
+    return iter_ordered(read, event_files, jobs)
+
+
+def iter_events(events_dir, event_files=None, quiet=False, jobs=1, report_errors=True):
+    """Yield event dictionaries one file at a time, in manifest order.
+
+    Only a bounded number of events is held in memory at a time, so this can
+    be consumed by a writer that emits rows as it goes. Errors are reported
+    per file (unless ``report_errors`` is false) and the offending file is
+    skipped.
+    """
+    if event_files is None:
+        event_files = list_event_files(events_dir)
+
+    for filename, event_data, error in iter_event_results(events_dir, event_files, jobs):
+        if error:
+            if report_errors:
+                print(error)
+            continue
+        if not quiet:
+            print(f"Loaded: {filename}")
+        yield event_data
+
+
+def load_event_files(events_dir):
+    """Load all event JSON files from the events directory."""
+    return list(iter_events(events_dir))
 
 
 def get_all_fields(events):
-    """Get all unique fields from all events to create comprehensive CSV headers."""
+    """Get all unique fields from all events to create comprehensive CSV headers.
+
+    ``events`` may be any iterable, including the generator returned by
+    ``iter_events``; only the set of field names is kept.
+    """
     all_fields = set()
     for event in events:
         all_fields.update(event.keys())
-    
+
+    return order_fields(all_fields)
+
+
+def order_fields(all_fields):
+    """Order field names: preferred fields first, then the rest alphabetically."""
+    all_fields = set(all_fields)
     # Define preferred order for common fields
     preferred_order = [
         'id', 'name', 'date', 'end_date', 'location', 'maps_link', 
@@ -88,6 +185,11 @@ def format_field_value(value, field_name=None):
         return str(value)
 
 
+def format_row(event, fieldnames):
+    """Create a CSV row with formatted values for the given event."""
+    return {field: format_field_value(event.get(field), field) for field in fieldnames}
+
+
 def convert_to_csv(events, output_file):
     """Convert events list to CSV file."""
     if not events:
@@ -106,48 +208,270 @@ def convert_to_csv(events, output_file):
         
         # Write event data
         for event in events:
-            # Create row with formatted values
-            row = {}
-            for field in fieldnames:
-                row[field] = format_field_value(event.get(field), field)
-            
-            writer.writerow(row)
+            writer.writerow(format_row(event, fieldnames))
     
     print(f"Successfully converted {len(events)} events to {output_file}")
     print(f"CSV columns: {', '.join(fieldnames)}")
 
 
+def stream_to_csv(events_dir, output_file, jobs=1, window=None):
+    """Convert event files to CSV in two streaming passes.
+
+    The schema pass walks the manifest collecting field names only; the row
+    pass re-reads each file and writes its row immediately, so memory stays
+    bounded by the largest single event rather than the whole archive.
+    ``jobs`` reads files concurrently while keeping manifest order.
+    With a ``(start, end)`` ``window``, recurring events are replaced by
+    their occurrences in that window (see recurrence.py).
+    Returns the number of rows written.
+    """
+    event_files = list_event_files(events_dir)
+
+    def events(schema_pass=False):
+        events = iter_events(events_dir, event_files, quiet=schema_pass, jobs=jobs,
+                             report_errors=not schema_pass)
+        return expand_events(events, *window) if window else events
+
+    # Schema pass: only the union of keys is kept; load errors are reported
+    # once, by the row pass
+    fieldnames = get_all_fields(events(schema_pass=True))
+    if not fieldnames:
+        print("No events to convert.")
+        return 0
+
+    # Row pass: write each row as soon as its file is parsed
+    count = 0
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+
+        for event in events():
+            writer.writerow(format_row(event, fieldnames))
+            count += 1
+
+    print(f"Successfully converted {count} events to {output_file}")
+    print(f"CSV columns: {', '.join(fieldnames)}")
+    return count
+
+
+def shards_to_csv(shard_dir, output_file, start=None, end=None):
+    """Convert events from the month shards (see event_shards.py) to CSV.
+
+    The shard manifest already lists each shard's field names, so no schema
+    pass is needed: only shards overlapping ``[start, end]`` are opened and
+    their events are streamed straight to CSV, ordered by date.
+    Returns the number of rows written.
+    """
+    from event_shards import iter_shard_events, load_manifest, shard_fields
+
+    manifest = load_manifest(shard_dir)
+    fieldnames = shard_fields(manifest, start, end)
+    if not fieldnames:
+        print("No events to convert.")
+        return 0
+
+    count = 0
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+
+        for event in iter_shard_events(shard_dir, start, end, manifest):
+            writer.writerow(format_row(event, fieldnames))
+            count += 1
+
+    print(f"Successfully converted {count} events to {output_file}")
+    print(f"CSV columns: {', '.join(fieldnames)}")
+    return count
+
+
+def load_cache(cache_file):
+    """Load the incremental export cache, or an empty one if unusable."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache.get('files', {})
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, AttributeError) as e:
+        print(f"Ignoring unreadable cache {cache_file}: {e}")
+    return {}
+
+
+def save_cache(cache_file, entries):
+    """Atomically write the incremental export cache."""
+    tmp_file = Path(str(cache_file) + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'files': entries}, f)
+    os.replace(tmp_file, cache_file)
+
+
+def refresh_cache_entry(events_dir, filename, entry):
+    """Bring one cache entry up to date with its event file.
+
+    Returns ``(entry, status, error)`` where status is ``'cached'`` when the
+    stored row was reused and ``'parsed'`` when the file had to be re-read.
+    Files whose mtime and size are unchanged are not opened at all; files
+    that were touched but have identical content only pay for a hash.
+    """
+    file_path = events_dir / filename
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return None, None, f"File not found: {filename}"
+
+    if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+        return entry, 'cached', None
+
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except Exception as e:
+        return None, None, f"Unexpected error loading {filename}: {e}"
+
+    digest = hashlib.sha256(data).hexdigest()
+    if entry and entry['sha256'] == digest:
+        return dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size), 'cached', None
+
+    try:
+        event = json_codec.loads(data)
+    except json.JSONDecodeError as e:
+        return None, None, f"Error loading {filename}: {e}"
+    except Exception as e:
+        return None, None, f"Unexpected error loading {filename}: {e}"
+
+    row = {field: format_field_value(value, field) for field, value in event.items()}
+    return {
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': digest,
+        'row': row,
+    }, 'parsed', None
+
+
+def incremental_to_csv(events_dir, output_file, cache_file, jobs=1):
+    """Convert event files to CSV, re-parsing only files that changed.
+
+    The sidecar cache maps each event filename to its mtime, size, content
+    hash and rendered CSV row. Entries for files no longer listed in
+    index.json are dropped. Returns the number of rows written.
+    """
+    event_files = list_event_files(events_dir)
+    cached = load_cache(cache_file)
+
+    def refresh(filename):
+        return (filename,) + refresh_cache_entry(events_dir, filename, cached.get(filename))
+
+    entries = {}
+    rows = []
+    parsed = 0
+    for filename, entry, status, error in iter_ordered(refresh, event_files, jobs):
+        if error:
+            print(error)
+            continue
+        if status == 'parsed':
+            parsed += 1
+            print(f"Loaded: {filename}")
+        metrics.count('files_parsed' if status == 'parsed' else 'files_cached')
+        entries[filename] = entry
+        rows.append(entry['row'])
+
+    dropped = len(set(cached) - set(entries))
+    save_cache(cache_file, entries)
+
+    if not rows:
+        print("No events to convert.")
+        return 0
+
+    all_fields = set()
+    for row in rows:
+        all_fields.update(row.keys())
+    fieldnames = order_fields(all_fields)
+
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"Re-parsed {parsed} changed files, reused {len(rows) - parsed} cached rows, dropped {dropped} removed files")
+    print(f"Successfully converted {len(rows)} events to {output_file}")
+    print(f"CSV columns: {', '.join(fieldnames)}")
+    return len(rows)
+
+
 def main():
     """Main function to execute the conversion."""
+    jobs = get_int_option(sys.argv[1:], ('--jobs', '-j'), 1, minimum=1)
+    incremental = '--incremental' in sys.argv or '-i' in sys.argv
+    shards = '--shards' in sys.argv
+    try:
+        start = date_bound(get_option(sys.argv, ('--from',)))
+        end = date_bound(get_option(sys.argv, ('--to',)), end=True)
+    except ValueError as e:
+        print(f"Error: invalid --from/--to date: {e}")
+        return
+    expand_from = get_option(sys.argv, ('--expand-from',))
+    expand_until = get_option(sys.argv, ('--expand-until',))
+
     # Get the script directory and navigate to the project root
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
     events_dir = project_root / "data" / "events"
+    metrics.start('json_to_csv', project_root)
     
     print(f"Looking for events in: {events_dir}")
+    if jobs > 1:
+        print(f"Reading event files with {jobs} parallel jobs")
     
     if not events_dir.exists():
         print(f"Error: Events directory not found at {events_dir}")
         return
     
-    # Load all event files
-    events = load_event_files(events_dir)
-    
-    if not events:
-        print("No events found to convert.")
-        return
-    
     # Generate output filename
     output_file = project_root / "events_json.csv"
     
-    # Convert to CSV
-    convert_to_csv(events, output_file)
+    if shards:
+        # Read the month shards, opening only those in the date range
+        shard_dir = project_root / "data" / "shards"
+        print(f"Shard mode: reading {shard_dir}" + (f" from {start or 'start'} to {end or 'end'}" if start or end else ""))
+        try:
+            with metrics.stage('convert'):
+                count = shards_to_csv(shard_dir, output_file, start, end)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: cannot read shards ({e}); build them with: python3 scripts/event_shards.py")
+            return
+    elif expand_until:
+        # Expand recurring events into their occurrences up to a date
+        try:
+            window = (parse_window_date(expand_from), parse_window_date(expand_until, end=True))
+        except ValueError as e:
+            print(f"Error: invalid expansion window: {e}")
+            return
+        print(f"Expanding recurring events from {expand_from or 'their first date'} until {expand_until}")
+        if incremental:
+            print("Note: --incremental is ignored when expanding recurring events")
+        with metrics.stage('convert'):
+            count = stream_to_csv(events_dir, output_file, jobs=jobs, window=window)
+    elif incremental:
+        # Only re-parse files that changed since the last export
+        cache_file = Path(str(output_file) + ".cache.json")
+        print(f"Incremental mode: using cache {cache_file}")
+        with metrics.stage('convert'):
+            count = incremental_to_csv(events_dir, output_file, cache_file, jobs=jobs)
+    else:
+        # Stream events straight to CSV
+        with metrics.stage('convert'):
+            count = stream_to_csv(events_dir, output_file, jobs=jobs)
+    metrics.count('rows_written', count or 0)
+    
+    if not count:
+        print("No events found to convert.")
+        return
     
     print(f"\nConversion complete!")
     print(f"Output file: {output_file}")
-    print(f"Total events converted: {len(events)}")
+    print(f"Total events converted: {count}")
 
 
 if __name__ == "__main__":
     main()
-    main()
@@ -0,0 +1,190 @@
+"""
+Stage timers, counters and opt-in profiling for the data scripts.
+
+Scripts call ``metrics.start(name, output_dir)`` at the top of ``main()``,
+wrap their phases in ``with metrics.stage('load_json'):`` and bump counters
+with ``metrics.count('files_read')``; the shared modules count the work they
+do (files read, rows compared, rows upserted, retries...). Recording is
+always on and cheap. At exit the JSON summary is written to
+metrics_<script>.json in the output directory (overwritten on every run); the
+environment variables below change that, like ``DEBUG``:
+
+    METRICS=true        print the JSON summary to stderr instead
+    METRICS=FILE        write the JSON summary to FILE instead
+    METRICS=false       don't emit a summary
+    PROFILE=cpu         profile with cProfile: the stats are saved to
+                        profile_<script>_<timestamp>.prof and the top
+                        functions are printed at exit
+    PROFILE=memory      trace allocations with tracemalloc: peak traced
+                        memory and the top allocation sites are reported
+    PROFILE=all         both
+
+cProfile only sees the main thread, so time spent in worker threads (e.g.
+concurrent upserts) shows up as waiting in the main thread.
+"""
+
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+TRUE_VALUES = ['true', '1', 'yes', 'on']
+FALSE_VALUES = ['', 'false', '0', 'no', 'off']
+OFF_VALUES = ['false', '0', 'no', 'off']
+
+METRICS = os.getenv('METRICS', '')
+PROFILE = os.getenv('PROFILE', '').lower()
+
+# Number of functions / allocation sites reported by the profilers
+PROFILE_TOP = 15
+
+_lock = threading.Lock()
+_counters = {}
+_stages = {}
+_run = {'script': None, 'output_dir': '.', 'started': time.perf_counter(),
+        'started_at': datetime.now(), 'profiler': None, 'finished': False}
+
+
+def profile_modes(value=None):
+    """Return the set of profilers (``cpu``, ``memory``) selected by PROFILE."""
+    value = PROFILE if value is None else value.lower()
+    if value in FALSE_VALUES:
+        return set()
+    if value in TRUE_VALUES or value == 'all':
+        return {'cpu', 'memory'}
+    return {mode.strip() for mode in value.split(',')} & {'cpu', 'memory'}
+
+
+def start(script, output_dir='.'):
+    """Start a script run: reset the clock, start profilers, report at exit."""
+    _run.update(script=script, output_dir=str(output_dir), started=time.perf_counter(),
+                started_at=datetime.now(), finished=False)
+    modes = profile_modes()
+    if 'memory' in modes and not tracemalloc.is_tracing():
+        tracemalloc.start(10)
+    if 'cpu' in modes:
+        _run['profiler'] = cProfile.Profile()
+        _run['profiler'].enable()
+    atexit.register(finish)
+
+
+@contextmanager
+def stage(name):
+    """Time a block of work; repeated stages add up."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            seconds, calls = _stages.get(name, (0.0, 0))
+            _stages[name] = (seconds + elapsed, calls + 1)
+
+
+def count(name, amount=1):
+    """Add ``amount`` to a counter (safe to call from worker threads)."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def peak_rss_mb():
+    """Return this process's peak resident set size in MiB, if known."""
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == 'darwin' else 1024  # macOS reports bytes, Linux KiB
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024), 1)
+
+
+def summary():
+    """Return the metrics recorded so far as a JSON-serializable dictionary."""
+    with _lock:
+        stages = {name: {'seconds': round(seconds, 4), 'calls': calls}
+                  for name, (seconds, calls) in _stages.items()}
+        counters = dict(_counters)
+    return {
+        'script': _run['script'],
+        'argv': sys.argv[1:],
+        'started_at': _run['started_at'].isoformat(timespec='seconds'),
+        'elapsed_seconds': round(time.perf_counter() - _run['started'], 4),
+        'stages': stages,
+        'counters': counters,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def _summary_path():
+    return os.path.join(_run['output_dir'], f"metrics_{_run['script'] or 'script'}.json")
+
+
+def _profile_path(kind):
+    timestamp = _run['started_at'].strftime("%Y%m%d_%H%M%S")
+    return os.path.join(_run['output_dir'], f"profile_{_run['script'] or 'script'}_{timestamp}.{kind}")
+
+
+def _finish_cpu_profile(report):
+    profiler = _run['profiler']
+    profiler.disable()
+    _run['profiler'] = None
+    path = _profile_path('prof')
+    profiler.dump_stats(path)
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP)
+    print(f"\n🔬 CPU profile saved to {path} (top {PROFILE_TOP} by cumulative time):", file=sys.stderr)
+    print(out.getvalue().rstrip(), file=sys.stderr)
+    report['profile_cpu'] = path
+
+
+def _finish_memory_profile(report):
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    top = [
+        {'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+         'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+        for stat in snapshot.statistics('lineno')[:PROFILE_TOP]
+    ]
+    print(f"\n🧠 Traced memory: peak {peak / (1024 * 1024):.1f} MiB, "
+          f"current {current / (1024 * 1024):.1f} MiB; top allocation sites:", file=sys.stderr)
+    for entry in top:
+        print(f"  {entry['size_kb']:>10.1f} KiB  {entry['count']:>8}  {entry['location']}", file=sys.stderr)
+    report['memory'] = {'peak_mb': round(peak / (1024 * 1024), 1),
+                        'current_mb': round(current / (1024 * 1024), 1), 'top': top}
+
+
+def finish():
+    """Stop the profilers and emit the summary selected by METRICS (once)."""
+    if _run['finished']:
+        return
+    _run['finished'] = True
+
+    report = summary()
+    # Snapshot memory before the CPU profile report allocates its own
+    if tracemalloc.is_tracing():
+        _finish_memory_profile(report)
+    if _run['profiler'] is not None:
+        _finish_cpu_profile(report)
+
+    target = METRICS.strip()
+    if target.lower() in OFF_VALUES:
+        return
+    if target.lower() in TRUE_VALUES:
+        print(json.dumps(report, indent=2), file=sys.stderr)
+        return
+    if not target:
+        target = _summary_path()
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
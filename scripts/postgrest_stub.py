@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Supabase REST (PostgREST) events endpoint.
+
+Keeps rows in memory and implements just enough of PostgREST for the sync
+scripts: bulk upserts (POST with on_conflict=id) and selects (GET with
+order/limit/offset). It can add per-request latency and fail a fraction of
+requests, which makes it useful for testing retries and benchmarking upsert
+throughput offline.
+
+Usage:
+    python3 scripts/postgrest_stub.py [--port 54321] [--latency-ms 50] [--fail-rate 0.1]
+
+Then point the scripts at it:
+    SUPABASE_URL=http://127.0.0.1:54321 python3 scripts/insert-missing-events.py --backend http --force
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from cli_options import get_float_option, get_int_option
+
+DEFAULT_PORT = 54321
+
+
+class StubState:
+    """In-memory tables and request counters shared by all handlers."""
+
+    def __init__(self, latency=0.0, fail_rate=0.0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.tables = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rows_upserted = 0
+        self.failures = 0
+
+    def upsert(self, table, rows, key='id'):
+        """Insert or merge rows by key and return them."""
+        with self.lock:
+            store = self.tables.setdefault(table, {})
+            for row in rows:
+                store[row[key]] = {**store.get(row[key], {}), **row}
+            self.rows_upserted += len(rows)
+            return [store[row[key]] for row in rows]
+
+    def select(self, table):
+        """Return all rows of a table."""
+        with self.lock:
+            return list(self.tables.get(table, {}).values())
+
+
+def make_handler(state):
+    """Build a request handler class bound to ``state``."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+        def _table(self):
+            path = urlparse(self.path).path
+            prefix = '/rest/v1/'
+            return path[len(prefix):] if path.startswith(prefix) else None
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _begin(self):
+            """Count the request, apply latency and injected failures."""
+            with state.lock:
+                state.requests += 1
+            if state.latency:
+                time.sleep(state.latency)
+            if state.fail_rate and random.random() < state.fail_rate:
+                with state.lock:
+                    state.failures += 1
+                self._send_json(503, {'message': 'Injected failure'})
+                return False
+            return True
+
+        def do_GET(self):
+            table = self._table()
+            if table is None:
+                self._send_json(404, {'message': 'Not found'})
+                return
+            if not self._begin():
+                return
+            params = parse_qs(urlparse(self.path).query)
+            rows = state.select(table)
+            if 'order' in params:
+                column = params['order'][0].split('.')[0]
+                rows.sort(key=lambda row: str(row.get(column, '')))
+            offset = int(params.get('offset', ['0'])[0])
+            limit = int(params['limit'][0]) if 'limit' in params else None
+            rows = rows[offset:offset + limit] if limit is not None else rows[offset:]
+            self._send_json(200, rows)
+
+        def do_POST(self):
+            table = self._table()
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length)
+            if table is None:
+                self._send_json(404, {'message': 'Not found'})
+                return
+            if not self._begin():
+                return
+
+            try:
+                payload = json.loads(body or b'[]')
+            except json.JSONDecodeError as e:
+                self._send_json(400, {'message': f'Invalid JSON: {e}'})
+                return
+            rows = payload if isinstance(payload, list) else [payload]
+
+            key = parse_qs(urlparse(self.path).query).get('on_conflict', ['id'])[0]
+            missing = [row for row in rows if row.get(key) in (None, '')]
+            if missing:
+                # PostgREST rejects the whole statement, not just the bad rows
+                self._send_json(400, {'message': f'null value in column "{key}"'})
+                return
+
+            returned = state.upsert(table, rows, key)
+            if 'return=minimal' in self.headers.get('Prefer', ''):
+                self.send_response(201)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            else:
+                self._send_json(201, returned)
+
+    return StubHandler
+
+
+def serve(port=DEFAULT_PORT, latency=0.0, fail_rate=0.0):
+    """Start the stub server in a background thread and return it."""
+    state = StubState(latency, fail_rate)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    """Run the stub until interrupted."""
+    port = get_int_option(sys.argv, ('--port', '-p'), DEFAULT_PORT)
+    latency = get_float_option(sys.argv, ('--latency-ms',), 0.0) / 1000
+    fail_rate = get_float_option(sys.argv, ('--fail-rate',), 0.0)
+
+    server = serve(port, latency, fail_rate)
+    print(f"🧪 PostgREST stub listening on http://127.0.0.1:{port}")
+    print(f"   Latency: {latency * 1000:.0f}ms, failure rate: {fail_rate:.0%}")
+    print("   Press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        state = server.state
+        print(f"\n📈 Stub stats: {state.requests} requests, {state.rows_upserted} rows upserted, "
+              f"{state.failures} injected failures")
+
+
+if __name__ == "__main__":
+    main()
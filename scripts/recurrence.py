@@ -0,0 +1,330 @@
+"""
+Recurring event expansion for the event data scripts.
+
+A recurring event is stored once, as a template event whose ``date`` is the
+first occurrence and whose ``recurrence`` field holds an RRULE-style rule:
+
+    "recurrence": "FREQ=WEEKLY;BYDAY=FR"
+    "recurrence": "FREQ=WEEKLY;INTERVAL=2;UNTIL=20260131"
+    "recurrence": "FREQ=MONTHLY;BYDAY=1SA,-1SA;COUNT=12"
+
+Supported parts: FREQ (WEEKLY or MONTHLY), INTERVAL, BYDAY (weekday codes,
+with an ordinal for monthly rules), BYMONTHDAY, COUNT and UNTIL. The
+``recurring`` values saved by the submission form ("weekly", "biweekly",
+"monthly") are understood too; a plain ``recurring: true`` is not expanded,
+since those events were historically copied in as separate files.
+
+Occurrences are generated lazily and only inside a requested window, so
+open-ended series are never materialized. Each occurrence is a copy of the
+template with ``date``/``end_date`` moved, an id of ``{id}-YYMMDD`` and a
+``series_id`` pointing back at the template.
+"""
+
+import calendar
+import math
+from datetime import date, datetime, time, timedelta
+
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+FREQUENCIES = ('WEEKLY', 'MONTHLY')
+
+# The Gregorian calendar repeats every 400 years: a monthly rule matching no
+# day in that many months (times its interval) never matches
+CALENDAR_CYCLE_MONTHS = 400 * 12
+
+# Rules for the frequencies offered by the submission form
+FORM_RULES = {
+    'weekly': 'FREQ=WEEKLY',
+    'biweekly': 'FREQ=WEEKLY;INTERVAL=2',
+    'monthly': 'FREQ=MONTHLY',
+}
+
+
+class RecurrenceRule:
+    """A parsed recurrence rule."""
+
+    __slots__ = ('freq', 'interval', 'byday', 'bymonthday', 'count', 'until')
+
+    def __init__(self, freq, interval=1, byday=(), bymonthday=(), count=None, until=None):
+        self.freq = freq
+        self.interval = interval
+        self.byday = byday            # ((ordinal or None, weekday 0-6), ...)
+        self.bymonthday = bymonthday  # (day, ...), negative counts from month end
+        self.count = count
+        self.until = until            # inclusive datetime, or None
+
+    @property
+    def bounded(self):
+        """True if the series ends on its own (COUNT or UNTIL)."""
+        return self.count is not None or self.until is not None
+
+    def __repr__(self):
+        return (f"RecurrenceRule({self.freq}, interval={self.interval}, byday={self.byday}, "
+                f"bymonthday={self.bymonthday}, count={self.count}, until={self.until})")
+
+
+def parse_until(value):
+    """Parse an UNTIL value (``YYYYMMDD[THHMMSS[Z]]`` or ISO) as inclusive."""
+    value = value.rstrip('Z')
+    for fmt in ('%Y%m%dT%H%M%S', '%Y%m%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        # A bare date includes the whole day
+        return parsed if 'T' in value else datetime.combine(parsed.date(), time.max)
+    raise ValueError(f"Invalid UNTIL value: {value}")
+
+
+def parse_byday(value, freq):
+    """Parse BYDAY entries like ``FR``, ``1SA`` or ``-1SU``."""
+    days = []
+    for item in value.split(','):
+        item = item.strip().upper()
+        code, ordinal = item[-2:], item[:-2]
+        if code not in WEEKDAYS:
+            raise ValueError(f"Invalid BYDAY value: {item}")
+        if ordinal and freq != 'MONTHLY':
+            raise ValueError(f"BYDAY ordinals are only supported for monthly rules: {item}")
+        number = int(ordinal) if ordinal else None
+        if number is not None and not (1 <= abs(number) <= 5):
+            raise ValueError(f"Invalid BYDAY ordinal: {item}")
+        days.append((number, WEEKDAYS.index(code)))
+    return tuple(days)
+
+
+def parse_rule(text):
+    """Parse an RRULE string (an optional ``RRULE:`` prefix is allowed)."""
+    text = text.strip()
+    if text.upper().startswith('RRULE:'):
+        text = text[6:]
+
+    parts = {}
+    for part in text.split(';'):
+        if not part.strip():
+            continue
+        key, sep, value = part.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid rule part: {part}")
+        parts[key.strip().upper()] = value.strip()
+
+    freq = parts.pop('FREQ', '').upper()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unsupported FREQ '{freq}', expected one of: {', '.join(FREQUENCIES)}")
+
+    rule = RecurrenceRule(freq)
+    if 'INTERVAL' in parts:
+        rule.interval = int(parts.pop('INTERVAL'))
+        if rule.interval < 1:
+            raise ValueError("INTERVAL must be at least 1")
+    if 'BYDAY' in parts:
+        rule.byday = parse_byday(parts.pop('BYDAY'), freq)
+    if 'BYMONTHDAY' in parts:
+        if freq != 'MONTHLY':
+            raise ValueError("BYMONTHDAY is only supported for monthly rules")
+        rule.bymonthday = tuple(int(day) for day in parts.pop('BYMONTHDAY').split(','))
+    if 'COUNT' in parts:
+        rule.count = int(parts.pop('COUNT'))
+    if 'UNTIL' in parts:
+        rule.until = parse_until(parts.pop('UNTIL'))
+    if parts:
+        raise ValueError(f"Unsupported rule parts: {', '.join(sorted(parts))}")
+    return rule
+
+
+def event_rule(event):
+    """Return the event's RecurrenceRule, or None if it does not repeat."""
+    text = event.get('recurrence')
+    if not text:
+        recurring = event.get('recurring')
+        text = FORM_RULES.get(recurring.lower()) if isinstance(recurring, str) else None
+    return parse_rule(text) if text else None
+
+
+def _weekly_dates(rule, dtstart, first):
+    """Yield candidate dates of a weekly rule, starting with ``first``'s week."""
+    weekdays = sorted({weekday for _, weekday in rule.byday}) or [dtstart.weekday()]
+    week = first - timedelta(days=first.weekday())
+    step = timedelta(weeks=rule.interval)
+    while True:
+        for weekday in weekdays:
+            yield week + timedelta(days=weekday)
+        week += step
+
+
+def _month_days(rule, year, month, dtstart):
+    """Return the sorted days of one month matching a monthly rule."""
+    days_in_month = calendar.monthrange(year, month)[1]
+    days = set()
+    for day in rule.bymonthday:
+        day = day if day > 0 else days_in_month + day + 1
+        if 1 <= day <= days_in_month:
+            days.add(day)
+    for ordinal, weekday in rule.byday:
+        matching = [day for day in range(1, days_in_month + 1) if date(year, month, day).weekday() == weekday]
+        if ordinal is None:
+            days.update(matching)
+        elif abs(ordinal) <= len(matching):
+            days.add(matching[ordinal - 1] if ordinal > 0 else matching[ordinal])
+    if not rule.byday and not rule.bymonthday and dtstart.day <= days_in_month:
+        days.add(dtstart.day)  # Same day as the first occurrence; skipped if missing
+    return sorted(days)
+
+
+def _monthly_dates(rule, dtstart, first, last=None):
+    """Yield candidate dates of a monthly rule, starting with ``first``'s month.
+
+    Stops after the month containing ``last``, or once a whole calendar
+    cycle of months has no matching day (e.g. BYMONTHDAY=30 every February).
+    """
+    year, month = first.year, first.month
+    cycle = CALENDAR_CYCLE_MONTHS * rule.interval // math.gcd(CALENDAR_CYCLE_MONTHS, rule.interval)
+    empty_months = 0
+    while empty_months < cycle and (last is None or date(year, month, 1) <= last):
+        days = _month_days(rule, year, month, dtstart)
+        for day in days:
+            yield date(year, month, day)
+        empty_months = 0 if days else empty_months + rule.interval
+        month += rule.interval
+        year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+
+
+def iter_starts(rule, dtstart, window_start=None, window_end=None):
+    """Lazily yield occurrence start datetimes of a rule.
+
+    Starts at ``dtstart`` (the first occurrence) and stops at COUNT, UNTIL
+    or ``window_end``, whichever comes first. Without COUNT the generator
+    jumps straight to the period containing ``window_start``.
+    """
+    if window_end is None and not rule.bounded:
+        raise ValueError("An open-ended series needs a window end")
+
+    first = dtstart.date()
+    if rule.count is None and window_start is not None and window_start.date() > first:
+        # Skip whole periods before the window; COUNT needs every occurrence
+        if rule.freq == 'WEEKLY':
+            weeks = (window_start.date() - first).days // 7
+            first += timedelta(weeks=weeks - weeks % rule.interval)
+        else:
+            months = (window_start.year - first.year) * 12 + window_start.month - first.month
+            months -= months % rule.interval
+            month = first.month - 1 + months
+            first = date(first.year + month // 12, month % 12 + 1, 1)
+
+    if rule.freq == 'WEEKLY':
+        candidates = _weekly_dates(rule, dtstart.date(), first)
+    else:
+        ends = [end.date() for end in (rule.until, window_end) if end is not None]
+        candidates = _monthly_dates(rule, dtstart.date(), first, min(ends) if ends else None)
+    emitted = 0
+    for day in candidates:
+        start = datetime.combine(day, dtstart.time())
+        if start < dtstart:
+            continue
+        if rule.until is not None and start > rule.until:
+            return
+        if window_end is not None and start > window_end:
+            return
+        if rule.count is not None:
+            if emitted >= rule.count:
+                return
+            emitted += 1
+        yield start
+
+
+def occurrence_id(series_id, start):
+    """Return the id of an occurrence: ``{series id}-YYMMDD``."""
+    return f"{series_id}-{start:%y%m%d}"
+
+
+def make_occurrence(event, start, duration):
+    """Copy a template event into one occurrence starting at ``start``."""
+    occurrence = {key: value for key, value in event.items() if key != 'recurrence'}
+    occurrence['id'] = occurrence_id(event['id'], start)
+    occurrence['series_id'] = event['id']
+    occurrence['date'] = start.isoformat()
+    if duration is not None:
+        occurrence['end_date'] = (start + duration).isoformat()
+    return occurrence
+
+
+def event_bounds(event):
+    """Return the ``(start, end)`` datetimes of a single event, or None."""
+    try:
+        start = datetime.fromisoformat(event['date'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    try:
+        end = datetime.fromisoformat(event['end_date']) if event.get('end_date') else start
+    except ValueError:
+        end = start
+    return start, max(start, end)
+
+
+def iter_occurrences(event, window_start=None, window_end=None, rule=None):
+    """Yield the occurrences of a recurring event that overlap the window.
+
+    ``window_start``/``window_end`` are naive local datetimes (either may be
+    None if the rule itself is bounded). Occurrences are generated lazily.
+    """
+    rule = rule or event_rule(event)
+    bounds = event_bounds(event)
+    if rule is None or bounds is None:
+        return
+    dtstart, dtend = bounds
+    duration = dtend - dtstart if event.get('end_date') else None
+
+    # An occurrence starting before the window may still run into it
+    scan_start = window_start - (duration or timedelta(0)) if window_start else None
+    for start in iter_starts(rule, dtstart, scan_start, window_end):
+        end = start + (duration or timedelta(0))
+        if window_start is not None and end < window_start:
+            continue
+        yield make_occurrence(event, start, duration)
+
+
+def series_span(event, rule=None):
+    """Return the ``(start, end)`` a series can cover; end is None if open."""
+    rule = rule or event_rule(event)
+    bounds = event_bounds(event)
+    if rule is None or bounds is None:
+        return None
+    dtstart, dtend = bounds
+    duration = dtend - dtstart
+    if rule.until is not None:
+        return dtstart, rule.until + duration
+    if rule.count is not None:
+        last = dtstart
+        for last in iter_starts(rule, dtstart):
+            pass
+        return dtstart, last + duration
+    return dtstart, None
+
+
+def expand_events(events, window_start=None, window_end=None):
+    """Yield events with every recurring template replaced by its occurrences.
+
+    Non-recurring events, and events with an invalid rule (reported), pass
+    through unchanged. Open-ended series need a ``window_end``; occurrences
+    outside the window are not generated.
+    """
+    for event in events:
+        try:
+            rule = event_rule(event)
+        except ValueError as e:
+            print(f"⚠️  Invalid recurrence for {event.get('id', '?')}, not expanded: {e}")
+            rule = None
+        if rule is None:
+            yield event
+        else:
+            yield from iter_occurrences(event, window_start, window_end, rule)
+
+
+def parse_window_date(value, end=False):
+    """Parse a ``YYYY-MM-DD`` window bound; ``end`` makes it cover the day."""
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) <= 10:
+        return datetime.combine(parsed.date(), time.max)
+    return parsed
+
@@ -0,0 +1,110 @@
+"""
+Shared font and text-measurement caches for the Pillow renderers.
+
+QR_code.py and event_cards.py draw the same few fonts and, across a batch,
+the same strings (titles, venues, prices) over and over. Loading a
+TrueType font parses the font file, and measuring a string renders its
+glyphs, so both are cached per process here:
+
+    load_font(path, size)            one loaded font per (path, size), LRU
+    first_font(paths, size)          the first of several candidate files that loads
+    font_source(font)                the file a font was loaded from
+    font_fingerprint(font)           that file and the sha256 of its bytes, for cache keys
+    text_bbox(text, font)            same box as ``draw.textbbox((0, 0), text, font=font)``
+    text_width(text, font)           width of that box
+    text_length(text, font)          advance width, like canvas ``measureText``
+    fit_text(text, font, max_width)  the text, or its longest prefix plus "..." that fits
+
+Fonts are cached objects, so they double as cache keys for the
+measurements. ``cache_info()`` reports hits and misses.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+
+from PIL import ImageFont
+
+FONT_CACHE_SIZE = 64
+MEASURE_CACHE_SIZE = 4096
+ELLIPSIS = '...'
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def load_font(path, size):
+    """Load a TrueType font; raises OSError if the file cannot be loaded."""
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def first_font(paths, size):
+    """Return the first font in ``paths`` (a tuple) that loads, else PIL's default."""
+    for path in paths:
+        try:
+            return load_font(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def font_source(font):
+    """Return the file ``font`` was loaded from, or None for PIL's default font."""
+    path = getattr(font, 'path', None)
+    return str(path) if isinstance(path, (str, bytes, os.PathLike)) else None
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def _file_digest(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None  # e.g. a bare name FreeType found in the system font directories
+
+
+def font_fingerprint(font):
+    """Return ``[path, sha256]`` of the file ``font`` was loaded from, or None for PIL's default."""
+    path = font_source(font)
+    return [path, _file_digest(path)] if path else None
+
+
+@lru_cache(maxsize=MEASURE_CACHE_SIZE)
+def text_bbox(text, font):
+    """Return the bounding box of ``text`` drawn at (0, 0)."""
+    return font.getbbox(text)
+
+
+def text_width(text, font):
+    """Return the width of the bounding box of ``text``."""
+    left, _, right, _ = text_bbox(text, font)
+    return right - left
+
+
+@lru_cache(maxsize=MEASURE_CACHE_SIZE)
+def text_length(text, font):
+    """Return the advance width of ``text`` (where the next character would start)."""
+    return font.getlength(text)
+
+
+@lru_cache(maxsize=MEASURE_CACHE_SIZE)
+def fit_text(text, font, max_width, ellipsis=ELLIPSIS):
+    """Return ``text`` if it fits in ``max_width``, else its longest prefix + ellipsis that does."""
+    if text_length(text, font) <= max_width:
+        return text
+    # Binary search on the prefix length (widths grow with it); the
+    # prefixes are measured directly so they do not crowd the caches
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if font.getlength(text[:middle].rstrip() + ellipsis) <= max_width:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low].rstrip() + ellipsis
+
+
+def cache_info():
+    """Return ``{cache name: functools cache info}`` for the caches above."""
+    return {name: function.cache_info() for name, function in (
+        ('load_font', load_font), ('first_font', first_font), ('text_bbox', text_bbox),
+        ('text_length', text_length), ('fit_text', fit_text))}
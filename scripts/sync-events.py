@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Script to sync JSON event files to the events database in a single process.
+
+Replaces the json_to_csv.py -> compare-csv.py -> insert-missing-events.py
+hand-off: the JSON events are loaded once with their native types, diffed
+against the DB (a Supabase CSV export or the live table), and the missing
+(and optionally changed) events go straight to the batched upsert stage
+without being written to or re-parsed from CSV.
+"""
+
+import csv
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import metrics
+from cli_options import get_int_option, get_option
+from event_diff import diff_events, print_results, write_report
+from event_upsert import DEBUG, DEFAULT_BATCH_SIZE, DEFAULT_RETRIES, insert_events
+from event_model import Event
+from events_backend import BACKENDS, get_backend
+from json_to_csv import iter_events
+
+
+def load_db_rows(db_csv, backend):
+    """Load DB rows from the CSV export, or from the backend if no CSV."""
+    if db_csv:
+        with open(db_csv, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        print(f"Loaded {len(rows)} events from {db_csv}")
+    else:
+        rows = backend.fetch_all()
+        print(f"Loaded {len(rows)} events from {backend.describe()}")
+    return rows
+
+
+def select_events(json_events, result, include_changed=False):
+    """Pick the JSON events to upsert from a diff result."""
+    ids = {event['id'] for event in result['json_only']}
+    if include_changed:
+        ids.update(event['id'] for event in result['differences'])
+    return [event for event in json_events if event['id'] in ids]
+
+
+def main():
+    """Main function."""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    events_dir = project_root / "data" / "events"
+    metrics.start('sync-events', project_root)
+
+    # Parse command line arguments
+    dry_run = '--dry-run' in sys.argv or '-d' in sys.argv
+    force = '--force' in sys.argv or '-f' in sys.argv
+    verbose = '--verbose' in sys.argv or '-v' in sys.argv
+    from_db = '--from-db' in sys.argv
+    include_changed = '--include-changed' in sys.argv
+    report = '--report' in sys.argv
+    jobs = get_int_option(sys.argv, ('--jobs', '-j'), 1, minimum=1)
+    batch_size = get_int_option(sys.argv, ('--batch-size', '-b'), DEFAULT_BATCH_SIZE, minimum=1)
+    workers = get_int_option(sys.argv, ('--workers', '-w'), 1, minimum=1)
+    max_retries = get_int_option(sys.argv, ('--retries',), DEFAULT_RETRIES, minimum=0)
+    backend_name = get_option(sys.argv, ('--backend',))
+    sqlite_path = get_option(sys.argv, ('--sqlite-path',))
+    db_csv = None if from_db else Path(get_option(sys.argv, ('--db-csv',), project_root / "events_rows.csv"))
+
+    print("🔄 Event Sync")
+    print("=" * 50)
+
+    if dry_run:
+        print("🔍 DRY RUN MODE: No actual insertions will be made")
+
+    if db_csv and not db_csv.exists():
+        print(f"❌ Error: DB export file not found: {db_csv}")
+        print("    Export the events table from Supabase or use --from-db")
+        return
+
+    # Load the JSON events once, as typed records
+    print(f"📁 JSON events: {events_dir}")
+    with metrics.stage('load_json'):
+        json_events = [Event.from_json(event) for event in iter_events(events_dir, quiet=not verbose, jobs=jobs)]
+    print(f"Loaded {len(json_events)} events from JSON files")
+
+    # One backend (and connection pool) for both reading and upserting
+    try:
+        backend = get_backend(backend_name, sqlite_path=sqlite_path, pool_size=workers)
+    except Exception as e:
+        print(f"❌ Error connecting to {backend_name or 'backend'}: {e}")
+        return
+
+    try:
+        with metrics.stage('load_db'):
+            db_events = load_db_rows(db_csv, backend)
+
+        # Diff in memory: no CSV round trip for the JSON side
+        with metrics.stage('diff'):
+            result = diff_events(db_events, json_events, verbose)
+        print_results(result, verbose)
+
+        if report:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            report_json = project_root / f"comparison_report_{timestamp}.json"
+            report_csv = project_root / f"comparison_report_{timestamp}.csv"
+            write_report(result, report_json, report_csv, {
+                'generated_at': datetime.now().isoformat(),
+                'db_file': str(db_csv) if db_csv else backend.describe(),
+                'json_file': str(events_dir),
+                'verbose': verbose
+            })
+            print(f"\n📄 Detailed report saved to: {report_json}")
+
+        to_upsert = select_events(json_events, result, include_changed)
+        if not to_upsert:
+            print("\n✅ Nothing to sync - database is up to date!")
+            return
+
+        print(f"\n📋 Events to {'upsert' if include_changed else 'insert'}:")
+        for event in to_upsert:
+            print(f"  • {event['id']}: {event.get('name', 'No name')}")
+
+        # Confirm insertion (unless force flag is used)
+        if not dry_run and not force:
+            response = input(f"\n❓ Upsert {len(to_upsert)} events into {backend.describe()}? (y/N): ")
+            if response.lower() != 'y':
+                print("🚫 Operation cancelled")
+                return
+
+        insert_events(backend, to_upsert, dry_run,
+                      batch_size=batch_size, workers=workers,
+                      max_retries=max_retries)
+
+        print(f"\n🎉 {'Dry run completed' if dry_run else 'Sync completed'}!")
+    finally:
+        if DEBUG:
+            print(f"🐛 DEBUG - Backend: {backend.describe()}")
+        backend.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python sync-events.py [OPTIONS]")
+        print("")
+        print("Options:")
+        print("  --dry-run, -d      Show what would be upserted without making changes")
+        print("  --force, -f        Skip confirmation prompt")
+        print("  --verbose, -v      Show loaded files and compare created_at/updated_at")
+        print("  --from-db          Diff against the live events table instead of events_rows.csv")
+        print("  --db-csv PATH      DB export to diff against (default: events_rows.csv)")
+        print("  --include-changed  Also upsert events whose fields differ (they return to 'pending')")
+        print("  --report           Write comparison_report_*.json/.csv")
+        print("  --jobs, -j N       Read event files with N threads")
+        print(f"  --batch-size, -b N Rows per upsert request (default: {DEFAULT_BATCH_SIZE})")
+        print("  --workers, -w N    Concurrent upsert requests (default: 1)")
+        print(f"  --retries N        Retries per request with exponential backoff (default: {DEFAULT_RETRIES})")
+        print(f"  --backend NAME     Events table backend: {', '.join(BACKENDS)} (default: supabase)")
+        print("  --sqlite-path P    SQLite database file for the sqlite backend")
+        print("  --help, -h         Show this help message")
+        print("")
+        print("Environment variables: DEBUG, SUPABASE_URL, SUPABASE_ANON_KEY, EVENTS_BACKEND, METRICS, PROFILE")
+    else:
+        main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Synthetic event archives for benchmarking the data scripts.
+
+Generates events with the same schema as data/events (type arrays,
+multi-line descriptions, Pacific local dates, UTC timestamps) and writes
+them as a project tree:
+
+    data/events/event-*.json   one file per event, plus index.json
+    events_rows.csv            a matching Supabase export in UTC, missing a
+                               share of the events and with some edited, so
+                               the compare and insert stages have work to do
+
+The output is deterministic for a given count and seed.
+
+Usage:
+    python3 scripts/synthetic_events.py --count 10000 --output /tmp/bench
+"""
+
+import csv
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from cli_options import get_float_option, get_int_option, get_option
+
+PACIFIC = ZoneInfo("America/Los_Angeles")
+
+# Column order of the Supabase CSV export
+DB_COLUMNS = [
+    'id', 'name', 'date', 'end_date', 'location', 'maps_link', 'type', 'music',
+    'price', 'description', 'contact', 'featured', 'status', 'created_at',
+    'event_url', 'event_url_text', 'recurring', 'updated_at'
+]
+
+DANCE_TYPES = ['salsa', 'timba', 'rueda', 'bachata', 'merengue', 'cumbia', 'son', 'rumba']
+MUSIC = ['DJ', 'DJ', 'DJ', 'Live', 'DJ & Live']
+PRICES = ['Free', '$10', '$15', '$20', '$25', '$15 / $25', '$30 at the door']
+VENUES = [
+    'El Flow', 'Más Movimiento Latin Dance Company', 'Cafe Sevilla',
+    'The Casbah', 'Balboa Park Club', 'Tango del Rey', 'Havana Social Club'
+]
+NAME_WORDS = [
+    'Havana', 'Nights', 'Timba', 'Social', 'Rueda', 'Fiesta', 'Casino',
+    'Caliente', 'Noche', 'Cubana', 'Salsa', 'Sabor', 'Tropical', 'Gala'
+]
+SENTENCES = [
+    "A 1hr Rueda de Casino workshop will be taught at 8:30pm.",
+    "The cost of the workshop includes entrance to the social.",
+    "Live band from 10pm until close, DJ sets in between.",
+    "Beginners welcome — no partner needed.",
+    "Free parking behind the building; street parking after 6pm.",
+    "Dress code: Cuban chic. Guayaberas encouraged!",
+    "There will also be a bachata room with a separate DJ.",
+]
+
+# Share of events left out of (and edited in) the DB export
+DEFAULT_MISSING_RATE = 0.1
+DEFAULT_CHANGED_RATE = 0.05
+DEFAULT_SEED = 42
+
+START_DATE = datetime(2023, 1, 6, 20, 0)
+
+
+def make_event(rng, index):
+    """Return one synthetic event dictionary."""
+    start = START_DATE + timedelta(days=rng.randrange(0, 365 * 4), minutes=30 * rng.randrange(0, 6))
+    duration = timedelta(hours=rng.choice([3, 4, 4, 5, 6]), minutes=rng.choice([0, 30]))
+    created = datetime(2023, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.randrange(0, 86400 * 365 * 3))
+    updated = created + timedelta(seconds=rng.randrange(0, 86400 * 30))
+    venue = rng.choice(VENUES)
+    lines = rng.sample(SENTENCES, rng.randint(1, 4))
+
+    event = {
+        'id': f"event-{start:%y%m%d}-{index:07d}",
+        'name': " ".join(rng.sample(NAME_WORDS, rng.randint(2, 4))),
+        'date': start.isoformat(),
+        'location': f"{venue}, {rng.randint(100, 9999)} University Ave, San Diego, CA",
+        'maps_link': f"https://maps.app.goo.gl/{rng.getrandbits(64):016x}",
+        'type': rng.sample(DANCE_TYPES, rng.randint(1, 3)),
+        'music': rng.choice(MUSIC),
+        'price': rng.choice(PRICES),
+        'description': " \n".join(lines),
+        'contact': f"({rng.randint(200, 999)}) 555-{rng.randint(0, 9999):04d}, Insta: @{venue.split()[0]}Dance",
+        'featured': rng.random() < 0.05,
+        'recurring': False,
+        'status': 'approved' if rng.random() < 0.9 else 'pending',
+        'created_at': created.isoformat(timespec='milliseconds'),
+        'updated_at': updated.isoformat(timespec='milliseconds'),
+        'end_date': (start + duration).isoformat()
+    }
+    if rng.random() < 0.3:
+        event['event_url'] = f"https://tickets.example.com/e/{rng.getrandbits(48):012x}"
+        event['event_url_text'] = 'Buy Tickets'
+    return event
+
+
+def iter_synthetic_events(count, seed=DEFAULT_SEED):
+    """Yield ``count`` synthetic events, deterministic for ``seed``."""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield make_event(rng, index)
+
+
+def to_db_timestamp(value):
+    """Format a Pacific local ISO date like the Supabase export (UTC, ``+00``)."""
+    local = datetime.fromisoformat(value).replace(tzinfo=PACIFIC)
+    return local.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S+00')
+
+
+def to_db_row(event):
+    """Return the Supabase CSV export row for an event."""
+    row = {column: event.get(column, '') for column in DB_COLUMNS}
+    row['date'] = to_db_timestamp(event['date'])
+    row['end_date'] = to_db_timestamp(event['end_date'])
+    row['type'] = json.dumps(event['type'], separators=(',', ':'))
+    row['featured'] = 'true' if event['featured'] else 'false'
+    row['recurring'] = 'true' if event['recurring'] else 'false'
+    return row
+
+
+def write_archive(root, count, seed=DEFAULT_SEED, missing_rate=DEFAULT_MISSING_RATE,
+                  changed_rate=DEFAULT_CHANGED_RATE):
+    """Write a synthetic project tree under ``root``; return a summary."""
+    root = Path(root)
+    events_dir = root / "data" / "events"
+    events_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed + 1)  # Separate stream for the DB export choices
+
+    filenames = []
+    missing = changed = 0
+    with open(root / "events_rows.csv", 'w', newline='', encoding='utf-8') as db_file:
+        writer = csv.DictWriter(db_file, fieldnames=DB_COLUMNS)
+        writer.writeheader()
+        for event in iter_synthetic_events(count, seed):
+            filename = f"{event['id']}.json"
+            with open(events_dir / filename, 'w', encoding='utf-8') as f:
+                json.dump(event, f, indent=2, ensure_ascii=False)
+            filenames.append(filename)
+
+            roll = rng.random()
+            if roll < missing_rate:
+                missing += 1
+                continue
+            row = to_db_row(event)
+            if roll < missing_rate + changed_rate:
+                changed += 1
+                row['price'] = 'Free' if row['price'] != 'Free' else '$10'
+            writer.writerow(row)
+
+    index = {
+        'files': filenames,
+        'last_updated': datetime.now(timezone.utc).isoformat(),
+        'total_events': len(filenames)
+    }
+    with open(events_dir / "index.json", 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+
+    return {'count': count, 'seed': seed, 'missing': missing, 'changed': changed}
+
+
+def main():
+    """Write a synthetic archive from the command line."""
+    count = get_int_option(sys.argv, ('--count', '-n'), 10000, minimum=1)
+    seed = get_int_option(sys.argv, ('--seed',), DEFAULT_SEED)
+    missing_rate = get_float_option(sys.argv, ('--missing-rate',), DEFAULT_MISSING_RATE)
+    changed_rate = get_float_option(sys.argv, ('--changed-rate',), DEFAULT_CHANGED_RATE)
+    output = get_option(sys.argv, ('--output', '-o'))
+    if not output:
+        print("❌ --output DIR is required (the synthetic project root)")
+        return
+
+    print(f"🧪 Writing {count} synthetic events to {output}...")
+    summary = write_archive(output, count, seed, missing_rate, changed_rate)
+    print(f"✅ {summary['count']} events, {summary['missing']} missing from and "
+          f"{summary['changed']} changed in events_rows.csv")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("Usage: python synthetic_events.py --output DIR [OPTIONS]")
+        print("")
+        print("Options:")
+        print("  --output, -o DIR      Project root to write data/events and events_rows.csv to")
+        print("  --count, -n N         Number of events (default: 10000)")
+        print(f"  --seed N              Random seed (default: {DEFAULT_SEED})")
+        print(f"  --missing-rate R      Share of events left out of the DB export (default: {DEFAULT_MISSING_RATE})")
+        print(f"  --changed-rate R      Share of events edited in the DB export (default: {DEFAULT_CHANGED_RATE})")
+        print("  --help, -h            Show this help message")
+    else:
+        main()